@@ -0,0 +1,262 @@
+"""Memory benchmark: peak traced allocations and peak RSS for read, clean, write and check
+functions over ladder of synthetic notebook sizes.
+Every measure runs at fresh process, result is peak memory per byte of notebook.
+
+    python benchmarks/bench_memory.py                  # print report
+    python benchmarks/bench_memory.py --check          # fail if ratio increased over baseline
+    python benchmarks/bench_memory.py --save           # write new baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover  # windows, no RSS measure
+    resource = None  # type: ignore
+
+from nbmetaclean.check import check_nb_ec, check_nb_errors, check_nb_warnings
+from nbmetaclean.clean import CleanConfig, clean_nb
+from nbmetaclean.helpers import nb_to_json, read_nb, write_nb
+from nbmetaclean.nb_types import Nb
+
+
+BASELINE = Path(__file__).parent / "memory_baseline.json"
+SIZES_MB = (1, 4, 16)
+PAYLOAD = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk" * 64  # ~4KB
+
+
+def make_nb(size: int) -> Nb:
+    """Synthetic notebook about `size` bytes: executed code cells with image and stream
+    outputs, cell and notebook metadata."""
+    cells: List[Dict[str, Any]] = []
+    current = 0
+    num = 0
+    while current < size:
+        num += 1
+        cell = {
+            "cell_type": "code",
+            "execution_count": num,
+            "id": f"cell-{num}",
+            "metadata": {"tags": ["bench"], "collapsed": False, "scrolled": True},
+            "outputs": [
+                {
+                    "output_type": "stream",
+                    "name": "stdout",
+                    "text": [f"line {i}\n" for i in range(20)],
+                },
+                {
+                    "output_type": "execute_result",
+                    "execution_count": num,
+                    "metadata": {"image/png": {"width": 100}},
+                    "data": {"image/png": PAYLOAD, "text/plain": ["<Figure>"]},
+                },
+            ],
+            "source": [f"x_{num} = {num}\n", "plot(x)"],
+        }
+        cells.append(cell)
+        current += len(PAYLOAD) + 400
+    return {
+        "cells": cells,
+        "metadata": {
+            "kernelspec": {"display_name": "Python 3", "name": "python3"},
+            "language_info": {"name": "python", "version": "3.11.0"},
+            "widgets": {"state": {}},
+        },
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def setup(name: str, path: Path, out_path: Path) -> Tuple[Callable[[], Any], int]:
+    """Prepare function to measure, return it and notebook size."""
+    size = path.stat().st_size
+    if name == "read_nb":
+        return lambda: read_nb(path), size
+    nb = read_nb(path)
+    if name == "clean_nb":
+        cfg = CleanConfig(clear_cell_metadata=True)
+        return lambda: clean_nb(nb, cfg), size
+    if name == "write_nb":
+        return lambda: write_nb(nb, out_path), size
+    if name == "check_nb_ec":
+        return lambda: check_nb_ec(nb), size
+    if name == "check_nb_errors":
+        return lambda: check_nb_errors(nb), size
+    if name == "check_nb_warnings":
+        return lambda: check_nb_warnings(nb), size
+    raise ValueError(f"Unknown function: {name}")
+
+
+FUNCTIONS = (
+    "read_nb",
+    "clean_nb",
+    "write_nb",
+    "check_nb_ec",
+    "check_nb_errors",
+    "check_nb_warnings",
+)
+
+
+def _proc_status(key: str) -> int:
+    with open("/proc/self/status", "r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.startswith(key):
+                return int(line.split()[1]) * 1024
+    raise ValueError(key)
+
+
+def _max_rss() -> int:
+    """Peak RSS of current process, bytes.
+    On Linux peak is reset before measure, ru_maxrss survives fork + exec of parent."""
+    try:
+        return _proc_status("VmHWM:")
+    except (OSError, ValueError):
+        pass
+    if resource is None:  # pragma: no cover
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _reset_rss_peak() -> int:
+    """Reset peak RSS to current RSS if possible, return current RSS."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as fh:
+            fh.write("5")
+        return _proc_status("VmRSS:")
+    except (OSError, ValueError):
+        return _max_rss()
+
+
+def _measure(name: str, path: str, out_path: str, traced: bool, queue: Any) -> None:
+    """Run at fresh process: peak traced allocations or peak RSS growth for function.
+    Measured separately, tracemalloc overhead is not counted at RSS."""
+    func, size = setup(name, Path(path), Path(out_path))
+    if traced:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        rss_before = _reset_rss_peak()
+        func()
+        peak = max(_max_rss() - rss_before, 0)
+    queue.put((size, peak))
+
+
+def _run_measure(
+    name: str, path: Path, out_path: Path, traced: bool
+) -> Tuple[int, int]:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(
+        target=_measure, args=(name, str(path), str(out_path), traced, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def measure(name: str, path: Path, out_path: Path) -> Tuple[int, int, int]:
+    """Measure function at fresh processes, return notebook size, traced peak, RSS peak."""
+    size, traced = _run_measure(name, path, out_path, traced=True)
+    _, rss = _run_measure(name, path, out_path, traced=False)
+    return size, traced, rss
+
+
+def run(sizes_mb: Tuple[int, ...]) -> Dict[str, Dict[str, Any]]:
+    """Run benchmark, return results by function: ratios at largest size and ladder."""
+    results: Dict[str, Dict[str, Any]] = {name: {"ladder": []} for name in FUNCTIONS}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in sizes_mb:
+            path = Path(tmp_dir) / f"nb_{size_mb}.ipynb"
+            path.write_text(nb_to_json(make_nb(size_mb * 2**20)), encoding="utf-8")
+            for name in FUNCTIONS:
+                size, traced, rss = measure(name, path, Path(tmp_dir) / "out.ipynb")
+                results[name]["ladder"].append(
+                    {"size": size, "traced_peak": traced, "rss_peak": rss}
+                )
+                results[name]["traced_ratio"] = round(traced / size, 3)
+                results[name]["rss_ratio"] = round(rss / size, 3)
+    return results
+
+
+def check(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+    rss_tolerance: float,
+) -> List[str]:
+    """Compare ratios with baseline, return list of regressions.
+    Small absolute slack (0.05) keeps near zero ratios from failing on noise."""
+    failed = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key, tol in (("traced_ratio", tolerance), ("rss_ratio", rss_tolerance)):
+            limit = baseline[name][key] * (1 + tol) + 0.05
+            if result[key] > limit:
+                failed.append(
+                    f"{name}: {key} {result[key]} > {limit:.3f} (baseline {baseline[name][key]})"
+                )
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory benchmark for nbmetaclean.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES_MB,
+        help=f"Notebook sizes, MB, default {SIZES_MB}.",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Fail if ratio increased over baseline."
+    )
+    parser.add_argument("--save", action="store_true", help="Save results as baseline.")
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINE, help="Baseline file."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed increase of traced peak ratio, default 0.2.",
+    )
+    parser.add_argument(
+        "--rss_tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed increase of RSS peak ratio, default 0.5.",
+    )
+    cfg = parser.parse_args()
+
+    results = run(tuple(cfg.sizes))
+    print(f"{'function':<20}{'traced / nb bytes':>20}{'RSS / nb bytes':>18}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['traced_ratio']:>20}{result['rss_ratio']:>18}")
+
+    if cfg.save:
+        cfg.baseline.write_text(json.dumps(results, indent=1) + "\n", encoding="utf-8")
+    if cfg.check:
+        baseline = json.loads(cfg.baseline.read_text(encoding="utf-8"))
+        failed = check(results, baseline, cfg.tolerance, cfg.rss_tolerance)
+        for line in failed:
+            print(line)
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
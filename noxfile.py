@@ -10,3 +10,11 @@ def tests(session: nox.Session) -> None:
     args = session.posargs or ["--cov"]
     session.install("-e", ".[test]")
     session.run("pytest", *args)
+
+
+@nox.session(python="3.11")
+def bench_memory(session: nox.Session) -> None:
+    """Memory benchmark, fail if peak memory per notebook byte increased over baseline."""
+    args = session.posargs or ["--check"]
+    session.install("-e", ".")
+    session.run("python", "benchmarks/bench_memory.py", *args)
@@ -22,6 +22,7 @@ DEV_REQUIRED = load_requirements(REQUIREMENTS_DEV_FILENAME)
 EXTRAS = {
     "test": TEST_REQUIRED,
     "dev": DEV_REQUIRED + TEST_REQUIRED,
+    "numpy": ["numpy"],
 }
 
 
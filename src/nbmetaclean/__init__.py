@@ -1,6 +1,6 @@
-from .check import check_nb_ec, check_nb_errors
-from .clean import clean_nb_file, CleanConfig, clean_nb
-from .helpers import read_nb, write_nb, get_nb_names, get_nb_names_from_list
+from __future__ import annotations
+
+from importlib import import_module
 
 
 __all__ = [
@@ -9,8 +9,44 @@ __all__ = [
     "check_nb_ec",
     "check_nb_errors",
     "clean_nb",
+    "clean_nb_bytes",
     "clean_nb_file",
+    "clean_nb_model",
     "CleanConfig",
+    "CleanPlan",
+    "compile_config",
+    "is_clean",
     "read_nb",
     "write_nb",
 ]
+
+# Imported on first access, so command line entry points (`nbmetaclean.cli`)
+# can forward run to server before modules are imported.
+_SUBMODULES = {
+    "check_nb_ec": "check",
+    "check_nb_errors": "check",
+    "clean_nb": "clean",
+    "clean_nb_bytes": "clean",
+    "clean_nb_file": "clean",
+    "clean_nb_model": "clean",
+    "CleanConfig": "clean",
+    "CleanPlan": "clean",
+    "compile_config": "clean",
+    "is_clean": "clean",
+    "get_nb_names": "helpers",
+    "get_nb_names_from_list": "helpers",
+    "read_nb": "helpers",
+    "write_nb": "helpers",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_SUBMODULES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
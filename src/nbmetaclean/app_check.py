@@ -1,13 +1,47 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import asdict
+from functools import partial
 from pathlib import Path
 import sys
+from contextlib import nullcontext
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterable, Optional
 
-from nbmetaclean.check import check_nb_ec, check_nb_errors, check_nb_warnings
-from nbmetaclean.helpers import get_nb_names_from_list, read_nb
+from nbmetaclean.check import (
+    CheckFactory,
+    CleanCheck,
+    EcCheck,
+    ErrorsCheck,
+    WarningsCheck,
+    check_nb_ec,
+    check_nb_errors,
+    check_nb_warnings,
+    check_unique,
+    get_check,
+    run_checks,
+)
+from nbmetaclean.clean_options import add_clean_options, clean_config_from_args
+from nbmetaclean.helpers import (
+    NbNamesStream,
+    get_nb_names_from_list,
+    plugin_id,
+    read_nb_with_reason,
+    read_paths_from,
+)
+from nbmetaclean.nb_types import Nb
+from nbmetaclean.progress import Progress, file_size
+from nbmetaclean.reader import ReadResult, parse_nb, read_bytes
+from nbmetaclean.verdicts import DEFAULT_MAX_SIZE
 from nbmetaclean.version import __version__
 
+if TYPE_CHECKING:  # pragma: no cover
+    from nbmetaclean.clean import CleanConfig
+    from nbmetaclean.metrics import RunMetrics
+
+# clean, transforms, archives, git history, caches and metrics imported on use
+
 
 parser = argparse.ArgumentParser(
     prog="nbcheck",
@@ -44,6 +78,69 @@ parser.add_argument(
     action="store_true",
     help="Ignore notebooks with all code cells without execution_count.",
 )
+parser.add_argument(
+    "--clean",
+    action="store_true",
+    help="Check notebooks are clean: nbmetaclean with same clean options would not change them. "
+    "Checked without changing notebooks, stops at first field to clean.",
+)
+add_clean_options(parser)
+parser.add_argument(
+    "--check",
+    action="append",
+    metavar="NAME",
+    help="Run registered check by name, can be used multiple times. "
+    "Checks from `nbmetaclean.checks` entry points are loaded when selected.",
+)
+parser.add_argument(
+    "--archives",
+    action="store_true",
+    help="Check notebooks inside zip and tar archives.",
+)
+parser.add_argument(
+    "--git_history",
+    metavar="REV_RANGE",
+    help="Check notebooks changed at commits from git revision range, like `main..HEAD`. "
+    "Can not be used with --archives.",
+)
+parser.add_argument(
+    "--files_from",
+    "--files-from",
+    metavar="FILE",
+    help="Read paths from file, `-` for stdin, newline or NUL separated. "
+    "Paths are read while notebooks are checked.",
+)
+parser.add_argument(
+    "--discovery_cache",
+    metavar="FILE",
+    help="Cache directories listings at file, list only changed directories at next run.",
+)
+parser.add_argument(
+    "--verdict_cache",
+    metavar="FILE",
+    help="Cache checks verdicts at SQLite file, keyed by notebook content and checks options. "
+    "Not changed notebooks are only hashed, not parsed.",
+)
+parser.add_argument(
+    "--verdict_cache_size",
+    type=int,
+    default=DEFAULT_MAX_SIZE // 2**20,
+    metavar="MB",
+    help="Verdict cache size limit, least recently used entries evicted, MB. "
+    "Defaults to %(default)s.",
+)
+parser.add_argument(
+    "--progress",
+    action="store_true",
+    help="Show progress: notebooks done, notebooks and MB per second, ETA. "
+    "Printed to stderr, as log lines if not terminal.",
+)
+parser.add_argument(
+    "--metrics",
+    metavar="FILE",
+    help="Write run metrics at Prometheus textfile format: notebooks, bytes read, "
+    "phases durations, check failures by type.",
+)
 parser.add_argument(
     "-V",
     "--verbose",
@@ -61,11 +158,16 @@ parser.add_argument(
 def print_error(
     nbs: list[Path],
     message: str,
+    reasons: dict[Path, str] | None = None,
 ) -> None:
-    """Print error message."""
+    """Print error message. `reasons` - failure reason by notebook, printed after name."""
     print(f"{len(nbs)} notebooks with {message}:")
+    reasons = reasons or {}
     for nb in nbs:
-        print("- ", nb)
+        if nb in reasons:
+            print("- ", f"{nb}: {reasons[nb]}")
+        else:
+            print("- ", nb)
 
 
 def print_results(
@@ -73,61 +175,353 @@ def print_results(
     nb_errors: list[Path],
     nb_warnings: list[Path],
     read_error: list[Path],
+    other: dict[str, list[Path]] | None = None,
+    reasons: dict[Path, str] | None = None,
 ) -> None:
-    """Print results."""
+    """Print results. `other` - failed notebooks for registered checks by check name,
+    `reasons` - read failure reasons by notebook."""
     if wrong_ec:
         print_error(wrong_ec, "wrong execution_count")
     if nb_errors:
         print_error(nb_errors, "errors in outputs")
     if nb_warnings:
         print_error(nb_warnings, "warnings in outputs")
+    for name, nbs in (other or {}).items():
+        if nbs:
+            print_error(nbs, get_check(name).message or f"failed {name} check")
     if read_error:
-        print_error(read_error, "read error")
+        print_error(read_error, "read error", reasons)
+
+
+# check names at metrics for builtin checks
+METRICS_CHECK_NAMES = {
+    EcCheck.name: "wrong_ec",
+    ErrorsCheck.name: "errors",
+    WarningsCheck.name: "warnings",
+    CleanCheck.name: "not_clean",
+}
+
+HISTORY_MESSAGES = {
+    "wrong_ec": "wrong execution_count",
+    "errors": "errors in outputs",
+    "warnings": "warnings in outputs",
+    "not_clean": "not clean",
+    "read_error": "read error",
+}
+
+
+def selected_checks(
+    cfg: argparse.Namespace, clean_config: Optional[CleanConfig] = None
+) -> list[tuple[str, CheckFactory]]:
+    """Return selected checks names and factories, clean check if `clean_config` set.
+
+    Raises:
+        KeyError: If check not found.
+        ValueError: If check selected more than once, like `--ec --check ec`.
+    """
+    checks: list[tuple[str, CheckFactory]] = []
+    if cfg.ec:
+        checks.append(
+            (
+                EcCheck.name,
+                partial(EcCheck, strict=not cfg.not_strict, no_exec=cfg.no_exec),
+            )
+        )
+    if cfg.err:
+        checks.append((ErrorsCheck.name, ErrorsCheck))
+    if cfg.warn:
+        checks.append((WarningsCheck.name, WarningsCheck))
+    if clean_config is not None:
+        from nbmetaclean.clean import compile_config
+
+        checks.append(
+            (CleanCheck.name, partial(CleanCheck, compile_config(clean_config)))
+        )
+    for name in cfg.check or []:
+        checks.append((name, get_check(name)))
+    check_unique(factory for _, factory in checks)
+    return checks
+
+
+def verdict_options(
+    cfg: argparse.Namespace, clean_config: Optional[CleanConfig] = None
+) -> dict[str, Any]:
+    """Checks options for verdict cache key: selected checks and their settings.
+    Registered checks and transforms are keyed by qualified name and version,
+    so verdicts are not reused after plugin is changed or upgraded."""
+    from nbmetaclean.transform import get_transform
 
+    return {
+        "version": __version__,
+        "ec": cfg.ec,
+        "err": cfg.err,
+        "warn": cfg.warn,
+        "strict": not cfg.not_strict,
+        "no_exec": cfg.no_exec,
+        "check": [plugin_id(get_check(name)) for name in cfg.check or []],
+        "clean": asdict(clean_config) if clean_config is not None else None,
+        "transforms": [
+            plugin_id(get_transform(name))
+            for name in (clean_config.transforms if clean_config is not None else ())
+        ],
+    }
 
-def app_check() -> None:
+
+def _registered_check(factory: CheckFactory, nb: Nb) -> bool:
+    return all(run_checks(nb, [factory]).values())
+
+
+def _history_message(name: str) -> str:
+    if name in HISTORY_MESSAGES:
+        return HISTORY_MESSAGES[name]
+    return get_check(name).message or name
+
+
+def check_history(
+    cfg: argparse.Namespace, clean_config: Optional[CleanConfig] = None
+) -> None:
+    """Check notebooks across git history, print failed notebooks by commit.
+    Registered checks selected by `--check` run with builtin ones."""
+    from nbmetaclean.git_history import history_pathspec, scan_history
+
+    checks: dict[str, Callable[[Nb], bool]] = {}
+    if cfg.ec:
+        checks["wrong_ec"] = partial(
+            check_nb_ec, strict=not cfg.not_strict, no_exec=cfg.no_exec
+        )
+    if cfg.err:
+        checks["errors"] = check_nb_errors
+    if cfg.warn:
+        checks["warnings"] = check_nb_warnings
+    for name in cfg.check or []:
+        checks[name] = partial(_registered_check, get_check(name))
+    path_list = cfg.path if isinstance(cfg.path, list) else [cfg.path]
+    try:
+        results = scan_history(
+            cfg.git_history,
+            checks,
+            clean_cfg=clean_config,
+            pathspec=history_pathspec(path_list),
+        )
+    except (OSError, RuntimeError) as ex:
+        print(f"Git history scan failed: {ex}")
+        sys.exit(1)
+    if cfg.verbose:
+        print(f"Checked {len(results)} notebook changes.")
+    failed = [result for result in results if result.failed]
+    commit = ""
+    for result in failed:
+        if result.commit != commit:
+            commit = result.commit
+            print(f"commit {commit}:")
+        messages = ", ".join(
+            f"{_history_message(name)}: {result.reason}"
+            if name == "read_error" and result.reason
+            else _history_message(name)
+            for name in result.failed
+        )
+        print(f"- {result.path}: {messages}")
+    if failed:
+        sys.exit(1)
+
+
+def app_check(argv: Optional[list[str]] = None) -> None:
     """Check notebooks for correct sequence of execution_count and errors in outputs."""
-    cfg = parser.parse_args()
+    cfg = parser.parse_args(argv)
 
     if cfg.version:
         print(f"nbcheck from nbmetaclean, version: {__version__}")
         sys.exit(0)
 
-    if not cfg.ec and not cfg.err and not cfg.warn:
+    if not cfg.ec and not cfg.err and not cfg.warn and not cfg.clean and not cfg.check:
         print(
             "No checks are selected. Please select at least one check: "
             "--ec (for execution_count) or "
             "--err (for errors in outputs) or "
-            "--warn (for warnings in outputs)."
+            "--warn (for warnings in outputs). "
+            "Notebooks to clean can be found by --clean. "
+            "Registered checks can be selected by --check NAME."
         )
         sys.exit(1)
 
-    nb_files = get_nb_names_from_list(cfg.path)
+    try:
+        clean_config = clean_config_from_args(cfg) if cfg.clean else None
+    except KeyError as ex:
+        print(f"Transform not found: {ex}")
+        sys.exit(1)
+
+    try:
+        checks = selected_checks(cfg, clean_config)
+    except KeyError as ex:
+        print(f"Check not found: {ex}")
+        sys.exit(1)
+    except ValueError as ex:
+        print(ex)
+        sys.exit(1)
+
+    if cfg.git_history:
+        if cfg.archives:
+            print("Option --archives can not be used with --git_history.")
+            sys.exit(1)
+        check_history(cfg, clean_config)
+        return
+
+    metrics: Optional[RunMetrics] = None
+    if cfg.metrics:
+        from nbmetaclean.metrics import RunMetrics
+
+        metrics = RunMetrics("nbcheck")
+
+    def phase(name: str) -> ContextManager[None]:
+        return metrics.phase(name) if metrics is not None else nullcontext()
+
+    cache = None
+    if cfg.discovery_cache:
+        from nbmetaclean.dircache import DirCache
+
+        cache = DirCache(cfg.discovery_cache)
+    nb_files: Iterable[Path]
+    nb_stream: Optional[NbNamesStream] = None
+    if cfg.files_from:  # notebooks found while checked, paths read as needed
+        if cfg.files_from != "-" and not Path(cfg.files_from).is_file():
+            print(f"{cfg.files_from} not exists!")
+            sys.exit(1)
+        path_list = [] if cfg.path == "." else cfg.path
+        nb_files = nb_stream = NbNamesStream(
+            chain(path_list, read_paths_from(cfg.files_from)),
+            archives=cfg.archives,
+            cache=cache,
+        )
+    else:
+        with phase("discovery"):
+            nb_files = get_nb_names_from_list(
+                cfg.path, archives=cfg.archives, cache=cache
+            )
+        if cache is not None:
+            cache.save()
     read_error: list[Path] = []
-    if cfg.verbose:
-        print(f"Checking {len(nb_files)} notebooks.")
+    reasons: dict[Path, str] = {}
+    if cfg.verbose and nb_stream is None:
+        print(f"Checking {len(nb_files)} notebooks.")  # type: ignore[arg-type]
 
-    wrong_ec: list[Path] = []
-    nb_errors: list[Path] = []
-    nb_warnings: list[Path] = []
-    for nb_name in nb_files:
-        nb = read_nb(nb_name)
+    failed: dict[str, list[Path]] = {name: [] for name, _ in checks}
+    factories = [factory for _, factory in checks]
+
+    verdict_cache = None
+    if cfg.verdict_cache:
+        from nbmetaclean.verdicts import VerdictCache
+
+        verdict_cache = VerdictCache(
+            cfg.verdict_cache,
+            verdict_options(cfg, clean_config),
+            cfg.verdict_cache_size * 2**20,
+        )
+
+    def check_nb(nb_name: Path, result: ReadResult) -> Optional[dict[str, bool]]:
+        nb, reason = result
         if nb is None:
             read_error.append(nb_name)
-            continue
+            reasons[nb_name] = reason or ""
+            return None
+        with phase("check"):
+            results = run_checks(nb, factories)
+        add_results(nb_name, results)
+        return results
 
-        if cfg.ec and not check_nb_ec(nb, not cfg.not_strict, cfg.no_exec):
-            wrong_ec.append(nb_name)
+    def add_results(nb_name: Path, results: dict[str, bool]) -> None:
+        for name, result in results.items():
+            if not result:
+                failed[name].append(nb_name)
 
-        if cfg.err and not check_nb_errors(nb):
-            nb_errors.append(nb_name)
+    def check_data(nb_name: Path, data: bytes) -> None:
+        """Check notebook content, verdicts from cache if content checked before."""
+        if metrics is not None:
+            metrics.notebooks["scanned"] += 1
+        if verdict_cache is None:
+            with phase("parse"):
+                result = parse_nb(data)
+            check_nb(nb_name, result)
+            return
+        key = verdict_cache.key(data)
+        results = verdict_cache.get(key)
+        if results is not None:
+            add_results(nb_name, results)
+            return
+        with phase("parse"):
+            result = parse_nb(data)
+        results = check_nb(nb_name, result)
+        if results is not None:
+            verdict_cache.put(key, results)
+
+    progress = (
+        Progress(len(nb_files) if nb_stream is None else None)  # type: ignore[arg-type]
+        if cfg.progress
+        else None
+    )
+    if cfg.archives:
+        from nbmetaclean.archive import is_archive, iter_archive_members
+    for nb_name in nb_files:
+        if progress is not None or metrics is not None:
+            size = file_size(nb_name)
+            if progress is not None:
+                progress.update(bytes_read=size)
+            if metrics is not None:
+                metrics.bytes["read"] += size
+        if cfg.archives and is_archive(nb_name):
+            try:
+                for member, member_data in iter_archive_members(nb_name):
+                    check_data(nb_name / member, member_data)
+            except Exception:
+                if metrics is not None:  # archive counted as notebook with error
+                    metrics.notebooks["scanned"] += 1
+                read_error.append(nb_name)
+                reasons[nb_name] = "archive error"
+            continue
+        data, _ = read_bytes(nb_name)
+        if (
+            data is None
+        ):  # read error or notebook inside archive, like `nbs.zip/nb.ipynb`
+            if metrics is not None:
+                metrics.notebooks["scanned"] += 1
+            with phase("parse"):
+                result = read_nb_with_reason(nb_name)
+            check_nb(nb_name, result)
+            continue
+        check_data(nb_name, data)
+    if progress is not None:
+        progress.close()
+    if verdict_cache is not None:
+        verdict_cache.close()
+        if cfg.verbose:
+            print(
+                f"Verdict cache: {verdict_cache.hits} hits, {verdict_cache.misses} misses."
+            )
+    if nb_stream is not None:
+        if cfg.verbose:
+            print(f"Checked {nb_stream.count} notebooks.")
+        if metrics is not None:
+            metrics.observe("discovery", nb_stream.seconds)
+        if cache is not None:
+            cache.save()
 
-        if cfg.warn and not check_nb_warnings(nb):
-            nb_warnings.append(nb_name)
+    if metrics is not None:
+        metrics.notebooks["errored"] += len(read_error)
+        metrics.check_failures["read_error"] += len(read_error)
+        for name, nbs in failed.items():
+            metrics.check_failures[METRICS_CHECK_NAMES.get(name, name)] += len(nbs)
+        metrics.write(cfg.metrics)
 
-    print_results(wrong_ec, nb_errors, nb_warnings, read_error)
+    failed_any = bool(read_error) or any(failed.values())
+    print_results(
+        failed.pop(EcCheck.name, []),
+        failed.pop(ErrorsCheck.name, []),
+        failed.pop(WarningsCheck.name, []),
+        read_error,
+        failed,
+        reasons,
+    )
 
-    if wrong_ec or nb_errors or nb_warnings or read_error:
+    if failed_any:
         sys.exit(1)
 
 
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
-from typing import Union
+from typing import Iterable, Optional
 
-from nbmetaclean.clean import CleanConfig, TupleStr, clean_nb_file
-from nbmetaclean.helpers import get_nb_names_from_list
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.clean_options import add_clean_options, clean_config_from_args
+from nbmetaclean.dircache import DirCache
+from nbmetaclean.helpers import NbNamesStream, get_nb_names_from_list, read_paths_from
+from nbmetaclean.metrics import RunMetrics
+from nbmetaclean.progress import Progress
+from nbmetaclean.stats import CleanStats
+from nbmetaclean.store import rehydrate_nb_file
 from nbmetaclean.version import __version__
 
 
 parser = argparse.ArgumentParser(
     prog="nbmetaclean",
     description="Clean metadata and execution_count from Jupyter notebooks.",
+    epilog="Run `nbmetaclean index -h` for notebooks inventory index commands, "
+    "`nbmetaclean dataset -h` for notebooks datasets (JSONL, SQLite), "
+    "`nbmetaclean server -h` for warm server.",
 )
 parser.add_argument(
     "path",
@@ -26,50 +38,95 @@ parser.add_argument(
     action="store_true",
     help="Silent mode.",
 )
-parser.add_argument(
-    "--not_ec",
-    action="store_false",
-    help="Do not clear execution_count.",
-)
 parser.add_argument(
     "--not-pt",
     action="store_true",
     help="Do not preserve timestamp.",
 )
+add_clean_options(parser)
 parser.add_argument(
-    "--dont_clear_nb_metadata",
+    "--clean_hidden_nbs",
     action="store_true",
-    help="Do not clear notebook metadata.",
+    help="Clean hidden notebooks.",
 )
 parser.add_argument(
-    "--clear_cell_metadata",
+    "--archives",
     action="store_true",
-    help="Clear cell metadata.",
+    help="Clean notebooks inside zip and tar archives.",
 )
 parser.add_argument(
-    "--clear_outputs",
+    "--rehydrate",
     action="store_true",
-    help="Clear outputs.",
+    help="Restore payloads from store, set by `--store`.",
 )
 parser.add_argument(
-    "--nb_metadata_preserve_mask",
-    nargs="+",
-    help="Preserve mask for notebook metadata.",
+    "--lock",
+    action="store_true",
+    help="Hold advisory lock on notebook while cleaning, for concurrent runs.",
 )
 parser.add_argument(
-    "--cell_metadata_preserve_mask",
-    nargs="+",
-    help="Preserve mask for cell metadata.",
+    "--lock_timeout",
+    type=float,
+    help="Seconds to wait for lock, by default wait until released. Implies `--lock`.",
 )
 parser.add_argument(
-    "--dont_merge_masks",
+    "--skip_locked",
     action="store_true",
-    help="Do not merge masks.",
+    help="Skip notebooks locked by other process, do not report as errors. Implies `--lock`.",
 )
 parser.add_argument(
-    "--clean_hidden_nbs",
+    "--max_nb_bytes",
+    type=int,
+    help="Skip notebooks larger than this size, bytes.",
+)
+parser.add_argument(
+    "--max_nb_seconds",
+    type=float,
+    help="Time limit to read and clean one notebook, seconds.",
+)
+parser.add_argument(
+    "--max_nb_memory",
+    type=int,
+    help="Memory limit for worker process reading and cleaning notebooks, MB.",
+)
+parser.add_argument(
+    "--dedupe_content",
     action="store_true",
-    help="Clean hidden notebooks.",
+    help="Parse and clean byte-identical notebooks once, write result to every copy.",
+)
+parser.add_argument(
+    "--journal",
+    metavar="FILE",
+    help="Journal processed notebooks with stat and outcome at file.",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="Resume interrupted run: skip notebooks journaled and not changed since. "
+    "Report includes journaled notebooks.",
+)
+parser.add_argument(
+    "--progress",
+    action="store_true",
+    help="Show progress: notebooks done, notebooks and MB per second, ETA. "
+    "Printed to stderr, as log lines if not terminal.",
+)
+parser.add_argument(
+    "--metrics",
+    metavar="FILE",
+    help="Write run metrics at Prometheus textfile format: notebooks by outcome, "
+    "bytes read and written, phases durations.",
+)
+parser.add_argument(
+    "--stats",
+    action="store_true",
+    help="Print stats: size before and after, cleared execution counts, "
+    "dropped metadata keys and removed outputs, per notebook and in aggregate.",
+)
+parser.add_argument(
+    "--stats_json",
+    metavar="FILE",
+    help="Write stats to json file.",
 )
 parser.add_argument(
     "-D",
@@ -77,6 +134,18 @@ parser.add_argument(
     action="store_true",
     help="perform a trial run, don't write results",
 )
+parser.add_argument(
+    "--files_from",
+    "--files-from",
+    metavar="FILE",
+    help="Read paths from file, `-` for stdin, newline or NUL separated. "
+    "Paths are read while notebooks are cleaned.",
+)
+parser.add_argument(
+    "--discovery_cache",
+    metavar="FILE",
+    help="Cache directories listings at file, list only changed directories at next run.",
+)
 parser.add_argument(
     "-V",
     "--verbose",
@@ -91,18 +160,14 @@ parser.add_argument(
 )
 
 
-def process_mask(mask: Union[list[str], None]) -> Union[tuple[TupleStr, ...], None]:
-    if mask is None:
-        return None
-    return tuple(tuple(item.split(".")) for item in mask)
-
-
 def print_result(
     cleaned: list[Path],
     errors: list[Path],
     clean_config: CleanConfig,
     path: list[str],
     num_nbs: int,
+    skipped: Optional[list[Path]] = None,
+    reasons: Optional[dict[Path, str]] = None,
 ) -> None:
     if clean_config.verbose:
         print(
@@ -118,48 +183,164 @@ def print_result(
                 print("- ", nb)
     if errors:
         print(f"with errors: {len(errors)}")
+        reasons = reasons or {}
         for nb in errors:
+            if nb in reasons:
+                print("- ", f"{nb}: {reasons[nb]}")
+            else:
+                print("- ", nb)
+    if skipped:
+        print(f"skipped (limit exceeded): {len(skipped)}")
+        for nb in skipped:
             print("- ", nb)
 
 
-def app_clean() -> None:
+def app_clean(argv: Optional[list[str]] = None) -> None:
     """Clean metadata and execution_count from Jupyter notebook."""
-    cfg = parser.parse_args()
+    if argv is None:
+        argv = sys.argv[1:]
+    # subcommands imported on use
+    if argv[:1] == ["index"]:
+        from nbmetaclean.app_index import app_index
+
+        app_index(argv[1:])
+        return
+    if argv[:1] == ["dataset"]:
+        from nbmetaclean.app_dataset import app_dataset
+
+        app_dataset(argv[1:])
+        return
+    if argv[:1] == ["server"]:
+        from nbmetaclean.app_server import app_server
+
+        app_server(argv[1:])
+        return
+    cfg = parser.parse_args(argv)
 
     if cfg.version:
         print(f"nbmetaclean version: {__version__}")
         sys.exit(0)
 
-    clean_config = CleanConfig(
-        clear_nb_metadata=not cfg.dont_clear_nb_metadata,
-        clear_cell_metadata=cfg.clear_cell_metadata,
-        clear_execution_count=cfg.not_ec,
-        clear_outputs=cfg.clear_outputs,
-        preserve_timestamp=not cfg.not_pt,
-        silent=cfg.silent,
-        nb_metadata_preserve_mask=process_mask(cfg.nb_metadata_preserve_mask),
-        cell_metadata_preserve_mask=process_mask(cfg.cell_metadata_preserve_mask),
-        mask_merge=not cfg.dont_merge_masks,
-        dry_run=cfg.dry_run,
-        verbose=cfg.verbose if not cfg.silent else False,
-    )
+    try:
+        clean_config = clean_config_from_args(
+            cfg,
+            preserve_timestamp=not cfg.not_pt,
+            silent=cfg.silent,
+            dry_run=cfg.dry_run,
+            verbose=cfg.verbose if not cfg.silent else False,
+            lock=cfg.lock or cfg.lock_timeout is not None or cfg.skip_locked,
+            lock_timeout=cfg.lock_timeout
+            if cfg.lock_timeout is not None or not cfg.skip_locked
+            else 0,
+            skip_locked=cfg.skip_locked,
+            max_nb_bytes=cfg.max_nb_bytes,
+            max_nb_seconds=cfg.max_nb_seconds,
+            max_nb_memory=cfg.max_nb_memory * 2**20 if cfg.max_nb_memory else None,
+            dedupe_content=cfg.dedupe_content,
+            journal_path=Path(cfg.journal) if cfg.journal else None,
+            resume=cfg.resume,
+        )
+    except KeyError as ex:
+        print(f"Transform not found: {ex}")
+        sys.exit(1)
+    if cfg.resume and clean_config.journal_path is None:
+        print("Set journal file with `--journal` to resume.")
+        sys.exit(1)
     path_list: list[str] = cfg.path if isinstance(cfg.path, list) else [cfg.path]
-    nb_files = get_nb_names_from_list(path_list, hidden=cfg.clean_hidden_nbs)
+    if cfg.files_from and cfg.path == ".":  # only paths from file
+        path_list = []
+    metrics = RunMetrics("nbmetaclean") if cfg.metrics else None
+    cache = DirCache(cfg.discovery_cache) if cfg.discovery_cache else None
+    nb_files: Iterable[Path]
+    nb_stream: Optional[NbNamesStream] = None
+    if cfg.files_from and cfg.files_from != "-" and not Path(cfg.files_from).is_file():
+        print(f"{cfg.files_from} not exists!")
+        sys.exit(1)
+    if cfg.files_from:  # notebooks found while cleaned, paths read as needed
+        nb_files = nb_stream = NbNamesStream(
+            chain(path_list, read_paths_from(cfg.files_from)),
+            hidden=cfg.clean_hidden_nbs,
+            archives=cfg.archives,
+            cache=cache,
+        )
+    else:
+        with metrics.phase("discovery") if metrics is not None else nullcontext():
+            nb_files = get_nb_names_from_list(
+                path_list,
+                hidden=cfg.clean_hidden_nbs,
+                archives=cfg.archives,
+                cache=cache,
+            )
+        if cache is not None:
+            cache.save()
 
-    cleaned, errors = clean_nb_file(
-        nb_files,
-        clean_config,
-    )
+    skipped: list[Path] = []
+    reasons: dict[Path, str] = {}
+    stats = CleanStats() if cfg.stats or cfg.stats_json else None
+    if cfg.rehydrate:
+        if clean_config.store_path is None:
+            print("Set store directory with `--store` to rehydrate notebooks.")
+            sys.exit(1)
+        cleaned, errors = rehydrate_nb_file(
+            nb_files,
+            clean_config.store_path,
+            preserve_timestamp=clean_config.preserve_timestamp,
+            dry_run=clean_config.dry_run,
+        )
+    else:
+        progress = (
+            Progress(len(nb_files) if nb_stream is None else None)  # type: ignore[arg-type]
+            if cfg.progress
+            else None
+        )
+        cleaned, errors = clean_nb_file(
+            nb_files,
+            clean_config,
+            skipped,
+            stats,
+            reasons,
+            progress,
+            metrics,
+            hidden=cfg.clean_hidden_nbs,
+        )
+        if progress is not None:
+            progress.close()
+    if nb_stream is not None:
+        num_nbs = nb_stream.count
+        if metrics is not None:
+            metrics.observe("discovery", nb_stream.seconds)
+        if cache is not None:
+            cache.save()
+    else:
+        num_nbs = len(nb_files)  # type: ignore[arg-type]
+    if metrics is not None:
+        metrics.write(cfg.metrics)
     # print(cfg)
-    if cfg.path == ".":  # if running without arguments add some info.
-        if not nb_files:
+    if (
+        cfg.path == "." and not cfg.files_from
+    ):  # if running without arguments add some info.
+        if not num_nbs:
             print("No notebooks found at current directory.")
             sys.exit(0)
-        elif not cfg.silent and not cleaned and not errors:
-            print(f"Checked: {len(nb_files)} notebooks. All notebooks are clean.")
+        elif not cfg.silent and not cleaned and not errors and not skipped:
+            print(f"Checked: {num_nbs} notebooks. All notebooks are clean.")
 
     if not cfg.silent:
-        print_result(cleaned, errors, clean_config, path_list, len(nb_files))
+        print_result(
+            cleaned,
+            errors,
+            clean_config,
+            path_list + ([cfg.files_from] if cfg.files_from else []),
+            num_nbs,
+            skipped,
+            reasons,
+        )
+    if stats is not None:
+        if cfg.stats and not cfg.silent:
+            print("\n".join(stats.report()))
+        if cfg.stats_json:
+            with open(cfg.stats_json, "w", encoding="utf-8") as fh:
+                json.dump(stats.to_dict(), fh, indent=1)
 
 
 if __name__ == "__main__":  # pragma: no cover
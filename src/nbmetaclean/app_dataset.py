@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from functools import partial
+from typing import Optional
+
+from nbmetaclean.check import (
+    CheckFactory,
+    EcCheck,
+    ErrorsCheck,
+    WarningsCheck,
+    check_unique,
+    get_check,
+)
+from nbmetaclean.clean_options import add_clean_options, clean_config_from_args
+from nbmetaclean.dataset import process_dataset
+
+
+parser = argparse.ArgumentParser(
+    prog="nbmetaclean dataset",
+    description="Clean and check notebooks stored as records at JSONL file or SQLite table.",
+)
+parser.add_argument("source", help="JSONL file or SQLite database (.sqlite, .db).")
+parser.add_argument("output", help="Output file, same format as source.")
+parser.add_argument(
+    "--field",
+    default="notebook",
+    help="Record field (column) with notebook, default `notebook`.",
+)
+parser.add_argument(
+    "--table",
+    default="notebooks",
+    help="SQLite table, default `notebooks`.",
+)
+parser.add_argument(
+    "--no_clean",
+    action="store_true",
+    help="Do not clean notebooks, only check.",
+)
+add_clean_options(parser)
+parser.add_argument("--ec", action="store_true", help="Check execution_count.")
+parser.add_argument("--err", action="store_true", help="Check errors in outputs.")
+parser.add_argument("--warn", action="store_true", help="Check warnings in outputs.")
+parser.add_argument(
+    "--not_strict",
+    action="store_true",
+    help="Not strict mode for execution_count check.",
+)
+parser.add_argument(
+    "--no_exec",
+    action="store_true",
+    help="Ignore notebooks with all code cells without execution_count.",
+)
+parser.add_argument(
+    "--check",
+    action="append",
+    metavar="NAME",
+    help="Run registered check by name, can be used multiple times.",
+)
+parser.add_argument(
+    "--checks_field",
+    default="nbcheck",
+    help="Record field for checks results, default `nbcheck`.",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=0,
+    help="Number of worker processes, default 0 - process at main process.",
+)
+parser.add_argument(
+    "--batch_size",
+    type=int,
+    default=100,
+    help="Records per batch, default 100.",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="Continue from record offset saved at previous run.",
+)
+
+
+def app_dataset(argv: Optional[list[str]] = None) -> None:
+    """Clean and check notebooks at dataset."""
+    cfg = parser.parse_args(argv)
+
+    checks: list[CheckFactory] = []
+    if cfg.ec:
+        checks.append(partial(EcCheck, strict=not cfg.not_strict, no_exec=cfg.no_exec))
+    if cfg.err:
+        checks.append(ErrorsCheck)
+    if cfg.warn:
+        checks.append(WarningsCheck)
+    try:
+        checks.extend(get_check(name) for name in cfg.check or [])
+        check_unique(checks)
+    except KeyError as ex:
+        print(f"Check not found: {ex}")
+        sys.exit(1)
+    except ValueError as ex:
+        print(ex)
+        sys.exit(1)
+
+    try:
+        clean_cfg = None if cfg.no_clean else clean_config_from_args(cfg)
+    except KeyError as ex:
+        print(f"Transform not found: {ex}")
+        sys.exit(1)
+    result = process_dataset(
+        cfg.source,
+        cfg.output,
+        nb_field=cfg.field,
+        clean_cfg=clean_cfg,
+        checks=checks,
+        table=cfg.table,
+        checks_field=cfg.checks_field,
+        workers=cfg.workers,
+        batch_size=cfg.batch_size,
+        resume=cfg.resume,
+    )
+    print(
+        f"records: {result.records}, cleaned: {result.cleaned}, "
+        f"with errors: {len(result.errors)}, offset: {result.offset}"
+    )
+    for name, num in sorted(result.failed.items()):
+        print(f"failed {name} check: {num}")
+    for offset, reason in result.errors.items():
+        print(f"- record {offset}: {reason}")
+    if result.errors or result.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    app_dataset()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Optional
+
+from nbmetaclean.helpers import get_nb_names_from_list
+from nbmetaclean.index import (
+    DEFAULT_INDEX,
+    load_index,
+    query,
+    refresh_index,
+    save_index,
+    summary,
+)
+
+
+parser = argparse.ArgumentParser(
+    prog="nbmetaclean index",
+    description="Keep inventory index of Jupyter notebooks, refreshed incrementally.",
+)
+parser.add_argument(
+    "--index",
+    default=DEFAULT_INDEX,
+    help=f"Index file, default `{DEFAULT_INDEX}`.",
+)
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+refresh_parser = subparsers.add_parser(
+    "refresh",
+    help="Refresh index, parse only notebooks changed since last refresh.",
+)
+refresh_parser.add_argument(
+    "path",
+    default=".",
+    nargs="*",
+    help="Path for nb or folder with notebooks.",
+)
+refresh_parser.add_argument(
+    "--hidden",
+    action="store_true",
+    help="Index hidden notebooks.",
+)
+
+summary_parser = subparsers.add_parser("summary", help="Print summary for index.")
+summary_parser.add_argument(
+    "--by",
+    choices=["dir", "kernel", "ec"],
+    help="Group by directory, kernelspec name or execution_count state.",
+)
+
+query_parser = subparsers.add_parser("query", help="Print notebooks matching filters.")
+query_parser.add_argument("--kernel", help="Kernelspec name.")
+query_parser.add_argument("--metadata_key", help="Notebook metadata key.")
+query_parser.add_argument(
+    "--ec",
+    choices=["none", "all", "partial"],
+    help="execution_count state.",
+)
+query_parser.add_argument(
+    "--min_output_bytes",
+    type=int,
+    help="Minimal size of outputs.",
+)
+
+
+def app_index(argv: Optional[list[str]] = None) -> None:
+    """Keep inventory index of notebooks."""
+    cfg = parser.parse_args(argv)
+    records = load_index(cfg.index)
+
+    if cfg.command == "refresh":
+        path_list: list[str] = cfg.path if isinstance(cfg.path, list) else [cfg.path]
+        nb_files = get_nb_names_from_list(path_list, hidden=cfg.hidden)
+        records, parsed = refresh_index(nb_files, records, path_list)
+        save_index(records, cfg.index)
+        print(f"indexed: {len(records)} notebooks, parsed: {parsed}")
+
+    elif cfg.command == "summary":
+        print(json.dumps(summary(records.values(), cfg.by), indent=1))
+
+    else:
+        result = query(
+            records.values(),
+            kernel=cfg.kernel,
+            metadata_key=cfg.metadata_key,
+            ec=cfg.ec,
+            min_output_bytes=cfg.min_output_bytes,
+        )
+        for record in result:
+            print(record["path"])
+        if not result:
+            sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    app_index()
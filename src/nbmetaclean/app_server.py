@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+from nbmetaclean.client import request, socket_path
+from nbmetaclean.server import serve
+
+
+parser = argparse.ArgumentParser(
+    prog="nbmetaclean server",
+    description="Run server at Unix socket, `nbmetaclean` and `nbcheck` forward runs to it "
+    "when it is running.",
+)
+parser.add_argument(
+    "--socket",
+    help="Socket path, default `NBMETACLEAN_SOCKET`, at `XDG_RUNTIME_DIR` or per user directory at temp directory.",
+)
+parser.add_argument(
+    "--status",
+    action="store_true",
+    help="Check if server is running.",
+)
+parser.add_argument(
+    "--stop",
+    action="store_true",
+    help="Stop running server.",
+)
+
+
+def app_server(argv: Optional[list[str]] = None) -> None:
+    """Run, stop or check nbmetaclean server."""
+    cfg = parser.parse_args(argv)
+    path = cfg.socket or socket_path()
+
+    if cfg.status or cfg.stop:
+        response = request({"cmd": "ping"}, path)
+        if response is None:
+            print(f"Server is not running at {path}.")
+            sys.exit(1)
+        if cfg.stop:
+            request({"cmd": "shutdown"}, path)
+            print(f"Server stopped at {path}.")
+        else:
+            print(f"Server version {response['version']} is running at {path}.")
+        return
+
+    try:
+        serve(path, ready=lambda: print(f"Server listening at {path}.", flush=True))
+    except RuntimeError as ex:
+        print(f"Server not started: {ex}.")
+        sys.exit(1)
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    app_server()
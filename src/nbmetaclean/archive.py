@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import copy
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterator, Optional, Tuple
+
+from .nb_types import Nb, PathOrStr
+from .reader import parse_nb
+
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "is_archive",
+    "is_archive_member_nb",
+    "iter_archive_members",
+    "iter_archive_nbs",
+    "read_archive_member",
+    "read_archive_member_bytes",
+    "split_archive_path",
+    "transform_archive",
+    "write_archive_member",
+]
+
+# suffix -> tarfile compression, "zip" for zip archives.
+ARCHIVE_SUFFIXES = {
+    ".zip": "zip",
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tar.xz": "xz",
+}
+
+MemberFunc = Callable[[str, bytes], Optional[bytes]]
+
+
+def archive_format(path: PathOrStr) -> Optional[str]:
+    """Return archive format for `path` by suffix: "zip", tar compression or None."""
+    name = Path(path).name.lower()
+    for suffix, fmt in ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def _open_tar(path: PathOrStr, mode: str) -> tarfile.TarFile:
+    """Open tar archive, `mode` with compression built from archive format.
+    Name passed as str, stream mode writes it to gzip header."""
+    return tarfile.open(os.fspath(path), mode)  # type: ignore[call-overload]  # mode is not literal
+
+
+def is_archive(path: PathOrStr) -> bool:
+    """Check if `path` is a zip or tar archive by suffix."""
+    return archive_format(path) is not None
+
+
+def is_archive_member_nb(name: str, hidden: bool = False) -> bool:
+    """Check if archive member `name` is a notebook, skip hidden and checkpoints."""
+    member = PurePosixPath(name)
+    if member.suffix != ".ipynb":
+        return False
+    for part in member.parts[:-1]:
+        if "checkpoint" in part or (part.startswith(".") and not hidden):
+            return False
+    return hidden or not member.name.startswith(".")
+
+
+def split_archive_path(path: PathOrStr) -> Optional[Tuple[Path, str]]:
+    """Split `path` like `bundle.zip/dir/nb.ipynb` to archive path and member name.
+    Return None if no parent of `path` is an existing archive file.
+    """
+    nb_path = Path(path)
+    for parent in nb_path.parents:
+        if is_archive(parent) and parent.is_file():
+            return parent, nb_path.relative_to(parent).as_posix()
+    return None
+
+
+def _loads(data: bytes) -> Nb | None:
+    return parse_nb(data).nb
+
+
+def iter_archive_members(
+    path: PathOrStr,
+    hidden: bool = False,
+) -> Iterator[tuple[str, bytes]]:
+    """Iterate over notebooks at archive, yield member name and raw content."""
+    fmt = archive_format(path)
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and is_archive_member_nb(info.filename, hidden):
+                    yield info.filename, zf.read(info)
+    else:
+        with _open_tar(path, f"r|{fmt}") as tf:
+            for member in tf:
+                if member.isfile() and is_archive_member_nb(member.name, hidden):
+                    fh = tf.extractfile(member)
+                    yield member.name, fh.read() if fh else b""
+
+
+def iter_archive_nbs(
+    path: PathOrStr,
+    hidden: bool = False,
+) -> Iterator[tuple[str, Nb | None]]:
+    """Iterate over notebooks at archive, yield member name and notebook.
+    Notebook is None if member is not a valid notebook.
+    """
+    for name, data in iter_archive_members(path, hidden):
+        yield name, _loads(data)
+
+
+def read_archive_member_bytes(path: PathOrStr, member: str) -> bytes | None:
+    """Read raw content of `member` from archive at `path`, None if no such member."""
+    fmt = archive_format(path)
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as zf:
+            if member not in zf.namelist():
+                return None
+            return zf.read(member)
+    with _open_tar(path, f"r:{fmt}") as tf:
+        try:
+            fh = tf.extractfile(member)
+        except KeyError:
+            return None
+        return fh.read() if fh else None
+
+
+def read_archive_member(path: PathOrStr, member: str) -> Nb | None:
+    """Read notebook `member` from archive at `path`."""
+    data = read_archive_member_bytes(path, member)
+    return _loads(data) if data is not None else None
+
+
+def _transform_zip(src: Path, dst: Path, func: MemberFunc, hidden: bool) -> bool:
+    changed = False
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w") as zout:
+        zout.comment = zin.comment
+        for info in zin.infolist():
+            if not info.is_dir() and is_archive_member_nb(info.filename, hidden):
+                data = zin.read(info)
+                new_data = func(info.filename, data)
+                if new_data is not None:
+                    changed = True
+                    data = new_data
+                # keep member compression, not archive default
+                zout.writestr(info, data, compress_type=info.compress_type)
+            else:  # not a notebook - copied as stream, `info` keeps its compress_type
+                with zin.open(info) as fin, zout.open(info, "w") as fout:
+                    shutil.copyfileobj(fin, fout)
+    return changed
+
+
+def _transform_tar(
+    src: Path, dst: Path, fmt: str, func: MemberFunc, hidden: bool
+) -> bool:
+    changed = False
+    with _open_tar(src, f"r|{fmt}") as tin:
+        with _open_tar(dst, f"w|{fmt}") as tout:
+            for member in tin:
+                if not member.isfile():
+                    tout.addfile(member)
+                    continue
+                fh = tin.extractfile(member)
+                if is_archive_member_nb(member.name, hidden):
+                    data = fh.read() if fh else b""
+                    new_data = func(member.name, data)
+                    if new_data is not None:
+                        changed = True
+                        data = new_data
+                        member = copy.copy(member)
+                        member.size = len(data)
+                    tout.addfile(member, io.BytesIO(data))
+                else:
+                    tout.addfile(member, fh)
+    return changed
+
+
+def transform_archive(
+    path: PathOrStr,
+    func: MemberFunc,
+    hidden: bool = False,
+    write: bool = True,
+    timestamp: Optional[tuple[float, float]] = None,
+) -> bool:
+    """Stream notebooks at archive through `func` in one pass.
+    `func` gets member name and content, returns new content or None if not changed.
+    Archive is replaced only if some member changed and `write` is True.
+    Other members are copied as is, for tar archives without recompression
+    if archive is not compressed.
+
+    Args:
+        path (Union[str, PosixPath]): Archive filename.
+        func (Callable[[str, bytes], Optional[bytes]]): Function to apply to notebooks.
+        hidden (bool): Process hidden notebooks. Defaults to False.
+        write (bool): Write changed archive. Defaults to True.
+        timestamp (Optional[tuple[float, float]]): timestamp to set, (st_atime, st_mtime) defaults to None
+
+    Returns:
+        bool: True if some member changed.
+    """
+    src = Path(path)
+    fmt = archive_format(src)
+    if fmt is None:
+        raise ValueError(f"{src} is not an archive!")
+    if not write:
+        changed = False
+        for name, data in iter_archive_members(src, hidden):
+            if func(name, data) is not None:
+                changed = True
+        return changed
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{src.name}.", dir=src.parent)
+    os.close(fd)
+    dst = Path(tmp_name)
+    try:
+        if fmt == "zip":
+            changed = _transform_zip(src, dst, func, hidden)
+        else:
+            changed = _transform_tar(src, dst, fmt, func, hidden)
+        if changed:
+            shutil.copymode(src, dst)
+            os.replace(dst, src)
+            if timestamp is not None:
+                os.utime(src, timestamp)
+    finally:
+        if dst.exists():
+            dst.unlink()
+    return changed
+
+
+def write_archive_member(path: PathOrStr, member: str, data: bytes) -> bool:
+    """Replace content of existing notebook `member` at archive.
+
+    Returns:
+        bool: True if member was found and replaced.
+    """
+
+    def replace(name: str, _: bytes) -> Optional[bytes]:
+        return data if name == member else None
+
+    return transform_archive(path, replace, hidden=True)
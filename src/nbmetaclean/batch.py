@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterable, List, Optional
+
+from .check import check_nb_ec
+from .nb_types import Nb
+
+
+__all__ = [
+    "EcBatch",
+    "check_ec_batch",
+    "check_nb_ec_batch",
+    "extract_ec",
+]
+
+
+def _numpy() -> Any:
+    """Return numpy module or None if not installed. Imported on first use."""
+    try:
+        import numpy  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return numpy
+
+
+class EcBatch:
+    """Execution counts of code cells with source for batch of notebooks, as typed arrays.
+    Notebook `i` cells are `counts[starts[i]:starts[i] + lengths[i]]`, not executed cells are 0.
+    Notebooks with executed code cell without source (always wrong) are marked at `bad`.
+    Notebooks with execution counts not int64 numbers are kept at `irregular` by number,
+    they are checked with `check_nb_ec`.
+    """
+
+    def __init__(self) -> None:
+        self.counts = array("q")
+        self.lengths = array("q")
+        self.bad = array("b")
+        self.irregular: dict[int, Nb] = {}
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, nb: Nb) -> None:
+        """Add notebook execution counts to batch."""
+        ecs = []
+        bad = 0
+        for cell in nb["cells"]:
+            if cell["cell_type"] == "code":
+                if cell["source"]:
+                    ecs.append(cell["execution_count"])  # type: ignore[typeddict-item]
+                elif cell["execution_count"]:  # type: ignore[typeddict-item]
+                    bad = 1
+        try:
+            counts = array("q", [ec or 0 for ec in ecs])
+        except (TypeError, OverflowError):  # not int or not fit to int64
+            self.irregular[len(self.lengths)] = nb
+            counts = array("q")
+        self.counts.extend(counts)
+        self.lengths.append(len(counts))
+        self.bad.append(bad)
+
+
+def extract_ec(nbs: Iterable[Nb]) -> EcBatch:
+    """Extract execution counts of code cells from notebooks to typed arrays."""
+    batch = EcBatch()
+    for nb in nbs:
+        batch.add(nb)
+    return batch
+
+
+def _check_batch_numpy(
+    np: Any, batch: EcBatch, strict: bool, no_exec: bool
+) -> List[bool]:
+    counts = np.frombuffer(batch.counts, dtype=np.int64)
+    lengths = np.frombuffer(batch.lengths, dtype=np.int64)
+    bad = np.frombuffer(batch.bad, dtype=np.int8).astype(bool)
+    num_nbs = len(lengths)
+    starts = np.cumsum(lengths) - lengths
+    nb_ids = np.repeat(np.arange(num_nbs), lengths)
+    pos = np.arange(len(counts)) - starts[nb_ids]
+
+    not_executed = np.bincount(nb_ids, weights=counts == 0, minlength=num_nbs).astype(
+        np.int64
+    )
+    # Notebook with not executed cells passes only if no_exec and nothing executed,
+    # so sequence rules matter only for notebooks with all cells executed.
+    if strict:
+        wrong = counts != pos + 1
+    else:
+        prev = np.zeros_like(counts)
+        prev[1:] = counts[:-1]
+        prev[pos == 0] = 0
+        wrong = counts <= prev
+    wrong_seq = np.bincount(nb_ids, weights=wrong, minlength=num_nbs)
+
+    all_executed = not_executed == 0
+    none_executed = not_executed == lengths
+    result = ~bad & np.where(all_executed, wrong_seq == 0, no_exec & none_executed)
+    return result.tolist()
+
+
+def _check_batch_python(batch: EcBatch, strict: bool, no_exec: bool) -> List[bool]:
+    result = []
+    start = 0
+    for length, bad in zip(batch.lengths, batch.bad):
+        counts = batch.counts[start : start + length]
+        start += length
+        if bad:
+            result.append(False)
+            continue
+        not_executed = counts.count(0)
+        if not_executed:
+            result.append(no_exec and not_executed == length)
+        elif strict:
+            result.append(all(ec == num for num, ec in enumerate(counts, 1)))
+        else:
+            result.append(all(prev < ec for prev, ec in zip([0, *counts], counts)))
+    return result
+
+
+def check_ec_batch(
+    batch: EcBatch,
+    strict: bool = True,
+    no_exec: bool = False,
+    use_numpy: Optional[bool] = None,
+) -> List[bool]:
+    """Check extracted execution counts, same result as `check_nb_ec` for every notebook.
+    Batch can be checked many times, with different rules.
+
+    Args:
+        batch (EcBatch): Execution counts, extracted by `extract_ec`.
+        strict (bool, optional): Strict mode. Defaults to True.
+        no_exec (bool): Ignore notebooks with all code cells without execution_count.
+        use_numpy (Optional[bool]): Use NumPy, if None - if installed. Defaults to None.
+
+    Returns:
+        List[bool]: True for correct notebooks, in same order.
+    """
+    np = _numpy() if use_numpy is not False else None
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed.")
+    if not len(batch):
+        return []
+    if np is not None:
+        result = _check_batch_numpy(np, batch, strict, no_exec)
+    else:
+        result = _check_batch_python(batch, strict, no_exec)
+    for num, nb in batch.irregular.items():
+        result[num] = check_nb_ec(nb, strict, no_exec)
+    return result
+
+
+def check_nb_ec_batch(
+    nbs: Iterable[Nb],
+    strict: bool = True,
+    no_exec: bool = False,
+    use_numpy: Optional[bool] = None,
+) -> List[bool]:
+    """Check batch of notebooks for correct sequence of execution_count,
+    same result as `check_nb_ec` for every notebook.
+    With NumPy execution counts extracted to typed arrays and checked for all notebooks
+    with array operations, without NumPy every notebook checked with `check_nb_ec`.
+
+    Args:
+        nbs (Iterable[Nb]): Notebooks to check.
+        strict (bool, optional): Strict mode. Defaults to True.
+        no_exec (bool): Ignore notebooks with all code cells without execution_count.
+        use_numpy (Optional[bool]): Use NumPy, if None - if installed. Defaults to None.
+
+    Returns:
+        List[bool]: True for correct notebooks, in same order.
+    """
+    np = _numpy() if use_numpy is not False else None
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed.")
+    if np is None:
+        return [check_nb_ec(nb, strict, no_exec) for nb in nbs]
+    return check_ec_batch(extract_ec(nbs), strict, no_exec, use_numpy=True)
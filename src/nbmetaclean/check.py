@@ -1,8 +1,41 @@
-from typing import cast
-from .nb_types import CodeCell, Nb
+from __future__ import annotations
 
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Type,
+    Union,
+    cast,
+)
 
-__all__ = ["check_nb_ec", "check_nb_errors"]
+from .helpers import load_entry_point
+from .nb_types import Cell, CodeCell, Nb, Output
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .clean import CleanConfig, CleanPlan
+
+
+__all__ = [
+    "CHECKS",
+    "CleanCheck",
+    "EcCheck",
+    "ErrorsCheck",
+    "NbCheck",
+    "WarningsCheck",
+    "check_nb_ec",
+    "check_unique",
+    "check_nb_errors",
+    "check_nb_warnings",
+    "get_check",
+    "register_check",
+    "run_checks",
+]
+
+CHECKS_ENTRY_POINT = "nbmetaclean.checks"
 
 
 def check_nb_ec(nb: Nb, strict: bool = True, no_exec: bool = False) -> bool:
@@ -82,3 +115,214 @@ def check_nb_warnings(nb: Nb) -> bool:
                 if output["output_type"] == "stream" and output["name"] == "stderr":
                     return False
     return True
+
+
+class NbCheck:
+    """Base class for checks run by `run_checks` in one notebook traversal.
+    Check subscribe to events by overriding `cell` and (or) `output` methods.
+    Event handler returns verdict: True if notebook is correct, False if not,
+    None if verdict is not known yet.
+    Check without verdict at the end of traversal gets verdict from `finish`.
+    New instance created for every notebook, so check can keep state.
+    """
+
+    name: str = ""
+    message: str = ""
+
+    def start(self, nb: Nb) -> Optional[bool]:
+        """Called before traversal."""
+        return None
+
+    def cell(self, cell: Cell) -> Optional[bool]:
+        """Called for every cell."""
+        return None  # pragma: no cover
+
+    def output(self, output: Output) -> Optional[bool]:
+        """Called for every output of code cells."""
+        return None  # pragma: no cover
+
+    def finish(self) -> bool:
+        """Called after traversal if no verdict yet."""
+        return True
+
+
+CheckFactory = Callable[[], NbCheck]
+
+CHECKS: Dict[str, Type[NbCheck]] = {}
+
+
+def register_check(check: Type[NbCheck]) -> Type[NbCheck]:
+    """Register check class by name, can be used as decorator."""
+    CHECKS[check.name] = check
+    return check
+
+
+def get_check(name: str) -> Type[NbCheck]:
+    """Return check class by name.
+    If check is not registered, load it from `nbmetaclean.checks` entry points.
+
+    Raises:
+        KeyError: If check not found.
+    """
+    if name not in CHECKS:
+        register_check(load_entry_point(CHECKS_ENTRY_POINT, name))
+    return CHECKS[name]
+
+
+def _overrides(check: NbCheck, method: str) -> bool:
+    return getattr(type(check), method) is not getattr(NbCheck, method)
+
+
+def check_unique(checks: Iterable[CheckFactory]) -> None:
+    """Check that checks have different names, as `run_checks` keys verdicts by name.
+
+    Raises:
+        ValueError: If checks have same name.
+    """
+    names: set[str] = set()
+    for factory in checks:
+        name = factory().name
+        if name in names:
+            raise ValueError(f"Check {name} selected more than once.")
+        names.add(name)
+
+
+def run_checks(nb: Nb, checks: Iterable[CheckFactory]) -> Dict[str, bool]:
+    """Run checks in one traversal of notebook.
+    Check unsubscribe after verdict, traversal stops when all checks have verdict.
+
+    Args:
+        nb (Nb): Notebook to check.
+        checks (Iterable[Callable[[], NbCheck]]): Check classes or factories.
+
+    Raises:
+        ValueError: If checks have same name, verdicts are keyed by name.
+
+    Returns:
+        Dict[str, bool]: Verdicts by check name, True if correct.
+    """
+    verdicts: Dict[str, Optional[bool]] = {}
+    pending: list[NbCheck] = []
+    cell_checks: list[NbCheck] = []
+    output_checks: list[NbCheck] = []
+    for factory in checks:
+        check = factory()
+        if check.name in verdicts:
+            raise ValueError(f"Check {check.name} selected more than once.")
+        verdicts[check.name] = check.start(nb)
+        if verdicts[check.name] is None:
+            pending.append(check)
+            if _overrides(check, "cell"):
+                cell_checks.append(check)
+            if _overrides(check, "output"):
+                output_checks.append(check)
+
+    def dispatch(subscribed: list[NbCheck], method: str, item: Any) -> None:
+        for check in list(subscribed):
+            verdict = getattr(check, method)(item)
+            if verdict is not None:
+                verdicts[check.name] = verdict
+                if check in cell_checks:
+                    cell_checks.remove(check)
+                if check in output_checks:
+                    output_checks.remove(check)
+
+    for cell in nb["cells"]:
+        if not cell_checks and not output_checks:
+            break
+        if cell_checks:
+            dispatch(cell_checks, "cell", cell)
+        if output_checks and cell["cell_type"] == "code":
+            for output in cell.get("outputs") or []:  # type: ignore
+                dispatch(output_checks, "output", output)
+                if not output_checks:
+                    break
+
+    for check in pending:
+        if verdicts[check.name] is None:
+            verdicts[check.name] = check.finish()
+    return cast(Dict[str, bool], verdicts)
+
+
+@register_check
+class EcCheck(NbCheck):
+    """Correct sequence of execution_count, same as `check_nb_ec`."""
+
+    name = "ec"
+    message = "wrong execution_count"
+
+    def __init__(self, strict: bool = True, no_exec: bool = False) -> None:
+        self.strict = strict
+        self.no_exec = no_exec
+        self.current = 0
+        self.no_exec_cells = 0
+
+    def cell(self, cell: Cell) -> Optional[bool]:
+        if cell["cell_type"] != "code":
+            return None
+        execution_count = cast(CodeCell, cell)["execution_count"]
+        if not cell["source"]:
+            return False if execution_count else None
+        if not execution_count:
+            if not self.no_exec:
+                return False
+            self.no_exec_cells += 1
+            return None
+        if execution_count != self.current + 1 and self.strict:
+            return False
+        if execution_count <= self.current:
+            return False
+        self.current = execution_count
+        return None
+
+    def finish(self) -> bool:
+        return not (self.no_exec_cells and self.current)
+
+
+@register_check
+class ErrorsCheck(NbCheck):
+    """No errors in outputs, same as `check_nb_errors`."""
+
+    name = "err"
+    message = "errors in outputs"
+
+    def output(self, output: Output) -> Optional[bool]:
+        return False if output["output_type"] == "error" else None
+
+
+@register_check
+class WarningsCheck(NbCheck):
+    """No warnings in outputs, same as `check_nb_warnings`."""
+
+    name = "warn"
+    message = "warnings in outputs"
+
+    def output(self, output: Output) -> Optional[bool]:
+        if output["output_type"] == "stream" and output.get("name") == "stderr":
+            return False
+        return None
+
+
+@register_check
+class CleanCheck(NbCheck):
+    """Notebook is clean: `clean_nb` with config would not change it, checked by `is_clean`.
+
+    Args:
+        cfg (Union[CleanConfig, CleanPlan, None]): Config or compiled plan, if None default config.
+            Pass compiled plan to check many notebooks.
+    """
+
+    name = "clean"
+    message = "content to clean"
+
+    def __init__(self, cfg: Union[CleanConfig, CleanPlan, None] = None) -> None:
+        # clean imported on use, so checks without it do not load it
+        from .clean import CleanConfig, CleanPlan, compile_config, is_clean
+
+        self.plan = (
+            cfg if isinstance(cfg, CleanPlan) else compile_config(cfg or CleanConfig())
+        )
+        self.is_clean = is_clean
+
+    def start(self, nb: Nb) -> Optional[bool]:
+        return self.is_clean(nb, self.plan)
@@ -1,28 +1,64 @@
 from __future__ import annotations
 
 import copy
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Optional, Tuple, Union
-
-from .helpers import read_nb, write_nb
-
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from .archive import is_archive, transform_archive
+from .helpers import nb_to_json, read_nb_with_reason, write_nb_json
+from .journal import Journal
+from .lock import nb_lock
+from .mask import MaskMatcher, compile_masks
+from .metrics import RunMetrics
+from .progress import Progress, file_size
 from .nb_types import Cell, CodeCell, Metadata, Nb, Output
+from .reader import open_failure, parse_nb, read_bytes
+from .stats import CleanStats, NbStats, nb_counts
+from .store import extract_payloads, has_payloads
+from .transform import NbTransform, get_transform
+from .watchdog import LimitExceeded, Watchdog
 
 
 __all__ = [
     "CleanConfig",
+    "CleanPlan",
+    "clean_archive",
     "clean_cell",
     "clean_nb",
+    "clean_nb_bytes",
     "clean_nb_file",
+    "clean_nb_model",
     "clean_outputs",
+    "compile_config",
     "filter_metadata",
     "filter_meta_mask",
+    "is_clean",
     "NB_METADATA_PRESERVE_MASKS",
     "TupleStr",
 ]
 
 TupleStr = Tuple[str, ...]
+# seconds by phase: parse, clean, serialise, write
+Durations = Dict[str, float]
+# failure reason, cleaned data, stats, durations - result of `_clean_nb_data`
+CleanedData = Tuple[Optional[str], Optional[bytes], Optional[NbStats], Durations]
+
+
+class _ContentResult(NamedTuple):
+    """Result of cleaning notebook content, kept by content hash with `dedupe_content`.
+    Cleaned data is not kept, it is copied from first written file."""
+
+    reason: Optional[str]
+    changed: bool
+    stats: Optional[NbStats]
+    written: Optional[Path] = None  # first file with cleaned content
+    digest: Optional[bytes] = None  # hash of cleaned content
+
 
 NB_METADATA_PRESERVE_MASKS = (
     ("language_info", "name"),
@@ -49,6 +85,25 @@ class CleanConfig:
             If False - use new mask. Defaults to True.
         dry_run (bool): perform a trial run, don't write results. Defaults to False.
         verbose (bool): Verbose mode. Print extra information. Defaults to False.
+        store_path (Optional[Path]): Directory to move large outputs and attachments payloads to.
+            If None, payloads are not moved. Defaults to None.
+        store_threshold (int): Minimal payload size to move to store, in bytes. Defaults to 1024.
+        lock (bool): Hold advisory lock on notebook while cleaning. Defaults to False.
+        lock_timeout (Optional[float]): Seconds to wait for lock, None - wait forever. Defaults to None.
+        skip_locked (bool): Skip notebooks still locked after `lock_timeout`,
+            if False they are reported as errors. Defaults to False.
+        max_nb_bytes (Optional[int]): Skip notebooks larger than this, bytes. Defaults to None.
+        max_nb_seconds (Optional[float]): Time limit to read and clean notebook. Defaults to None.
+        max_nb_memory (Optional[int]): Memory limit for worker process reading and cleaning
+            notebooks, bytes. Defaults to None.
+        dedupe_content (bool): Parse and clean byte-identical notebooks once,
+            write result to every copy. Defaults to False.
+        journal_path (Optional[Path]): Journal file, processed notebooks with stat and outcome
+            are appended to it. Defaults to None.
+        resume (bool): Skip notebooks journaled at previous run with same config
+            and not changed since, their outcome taken from journal. Defaults to False.
+        transforms (tuple[str, ...]): Names of registered transforms, run at same traversal
+            as clean steps, in given order. Defaults to ().
     """
 
     clear_nb_metadata: bool = True
@@ -62,6 +117,18 @@ class CleanConfig:
     mask_merge: bool = True
     dry_run: bool = False
     verbose: bool = False
+    store_path: Optional[Path] = None
+    store_threshold: int = 1024
+    lock: bool = False
+    lock_timeout: Optional[float] = None
+    skip_locked: bool = False
+    max_nb_bytes: Optional[int] = None
+    max_nb_seconds: Optional[float] = None
+    max_nb_memory: Optional[int] = None
+    dedupe_content: bool = False
+    journal_path: Optional[Path] = None
+    resume: bool = False
+    transforms: TupleStr = ()
 
 
 def filter_meta_mask(
@@ -85,141 +152,861 @@ def filter_metadata(
     nb_meta: Metadata,
     masks: Optional[tuple[TupleStr, ...]] = None,
 ) -> Metadata:
-    """Clean notebooknode metadata."""
+    """Clean notebooknode metadata.
+    Mask items can be globs, like `*.tags`, or regex, like `/^celltoolbar$/`.
+    """
     if masks is None:
         return {}
-    filtered_meta: Metadata = {}
-    for mask in masks:
-        filtered_meta.update(filter_meta_mask(nb_meta, mask))  # type: ignore
-    return filtered_meta
+    return compile_masks(tuple(masks)).filter(nb_meta)
 
 
-def clean_cell(
-    cell: Cell | CodeCell,
-    cfg: CleanConfig,
-) -> bool:
-    """Clean cell: optionally metadata, execution_count and outputs."""
+def _filter_by(metadata: Metadata, matcher: Optional[MaskMatcher]) -> Metadata:
+    return matcher.filter(metadata) if matcher is not None else {}
+
+
+CellStep = Callable[[Cell, "CleanPlan"], bool]
+OutputStep = Callable[[Output, "CleanPlan"], bool]
+
+
+@dataclass(frozen=True)
+class CleanPlan:
+    """Compiled clean config: only steps that can change notebook.
+    Immutable, can be shared between threads and processes.
+    Created by `compile_config`.
+
+    Args:
+        nb_metadata_masks (Optional[tuple[TupleStr, ...]]): Preserve masks for notebook metadata,
+            None if notebook metadata not cleaned.
+        cell_metadata_masks (Optional[tuple[TupleStr, ...]]): Preserve masks for cell metadata.
+        cell_steps (tuple[CellStep, ...]): Steps for every cell.
+        output_steps (tuple[OutputStep, ...]): Steps for every output.
+        store_path (Optional[Path]): Directory to move large payloads to.
+        store_threshold (int): Minimal payload size to move to store.
+        store_write (bool): Write payloads to store.
+        nb_metadata_matcher (Optional[MaskMatcher]): Compiled `nb_metadata_masks`.
+        cell_metadata_matcher (Optional[MaskMatcher]): Compiled `cell_metadata_masks`.
+        transforms (tuple[NbTransform, ...]): Transforms, run after clean steps.
+        nb_transforms (tuple[NbTransform, ...]): Transforms subscribed to notebook.
+        cell_transforms (tuple[NbTransform, ...]): Transforms subscribed to cells.
+        output_transforms (tuple[NbTransform, ...]): Transforms subscribed to outputs.
+    """
+
+    nb_metadata_masks: Optional[tuple[TupleStr, ...]] = None
+    cell_metadata_masks: Optional[tuple[TupleStr, ...]] = None
+    cell_steps: tuple[CellStep, ...] = ()
+    output_steps: tuple[OutputStep, ...] = ()
+    store_path: Optional[Path] = None
+    store_threshold: int = 1024
+    store_write: bool = True
+    nb_metadata_matcher: Optional[MaskMatcher] = None
+    cell_metadata_matcher: Optional[MaskMatcher] = None
+    transforms: tuple[NbTransform, ...] = ()
+    nb_transforms: tuple[NbTransform, ...] = ()
+    cell_transforms: tuple[NbTransform, ...] = ()
+    output_transforms: tuple[NbTransform, ...] = ()
+
+    @property
+    def empty(self) -> bool:
+        """True if plan can not change any notebook."""
+        return (
+            self.nb_metadata_masks is None
+            and not self.cell_steps
+            and self.store_path is None
+            and not self.nb_transforms
+        )
+
+
+def _clear_cell_metadata(cell: Cell, plan: CleanPlan) -> bool:
+    metadata = cell.get("metadata")
+    if not metadata:
+        return False
+    cell["metadata"] = _filter_by(metadata, plan.cell_metadata_matcher)
+    return cell["metadata"] != metadata
+
+
+def _clear_cell_execution_count(cell: Cell, plan: CleanPlan) -> bool:
+    if cell["cell_type"] == "code" and cell.get("execution_count"):
+        cell["execution_count"] = None  # type: ignore # it's code cell
+        return True
+    return False
+
+
+def _clear_cell_outputs(cell: Cell, plan: CleanPlan) -> bool:
+    if cell["cell_type"] == "code" and cell.get("outputs"):
+        cell["outputs"] = []  # type: ignore  # it's code cell
+        return True
+    return False
+
+
+def _clean_cell_outputs(cell: Cell, plan: CleanPlan) -> bool:
+    if cell["cell_type"] == "code" and cell.get("outputs"):
+        return clean_outputs(cell["outputs"], plan)  # type: ignore # it's code cell
+    return False
+
+
+def _clear_output_execution_count(output: Output, plan: CleanPlan) -> bool:
+    if output.get("execution_count", None):
+        output["execution_count"] = None
+        return True
+    return False
+
+
+def _clear_output_metadata(output: Output, plan: CleanPlan) -> bool:
+    metadata = output.get("metadata", None)
+    if not metadata:
+        return False
+    output["metadata"] = _filter_by(metadata, plan.cell_metadata_matcher)
+    return output["metadata"] != metadata
+
+
+def _transform_cell(cell: Cell, plan: CleanPlan) -> bool:
     changed = False
+    for transform in plan.cell_transforms:
+        if transform.cell(cell):
+            changed = True
+    return changed
 
-    if cfg.clear_cell_metadata:
-        if cell.get("metadata", None):
-            metadata = cell["metadata"]
-            old_metadata = copy.deepcopy(metadata)
-            cell["metadata"] = filter_metadata(
-                metadata, cfg.cell_metadata_preserve_mask
-            )
-            if cell["metadata"] != old_metadata:
-                changed = True
 
-    if cell["cell_type"] == "code":
-        if cfg.clear_execution_count and cell.get("execution_count"):
-            cell["execution_count"] = None  # type: ignore # it's code cell
+def _transform_output(output: Output, plan: CleanPlan) -> bool:
+    changed = False
+    for transform in plan.output_transforms:
+        if transform.output(output):
             changed = True
+    return changed
 
-        if cell.get("outputs"):
-            if cfg.clear_outputs:
-                cell["outputs"] = []  # type: ignore  # it's code cell
-                changed = True
-            elif cfg.clear_cell_metadata or cfg.clear_execution_count:
-                result = clean_outputs(cell["outputs"], cfg)  # type: ignore # it's code cell
-                if result:
-                    changed = True
 
+def _keeps(metadata: Metadata, matcher: Optional[MaskMatcher]) -> bool:
+    return matcher.keeps(metadata) if matcher is not None else not metadata
+
+
+def _cell_metadata_clean(cell: Cell, plan: CleanPlan) -> bool:
+    metadata = cell.get("metadata")
+    return not metadata or _keeps(metadata, plan.cell_metadata_matcher)
+
+
+def _cell_execution_count_clean(cell: Cell, plan: CleanPlan) -> bool:
+    return cell["cell_type"] != "code" or not cell.get("execution_count")
+
+
+def _cell_outputs_clear(cell: Cell, plan: CleanPlan) -> bool:
+    return cell["cell_type"] != "code" or not cell.get("outputs")
+
+
+def _cell_outputs_clean(cell: Cell, plan: CleanPlan) -> bool:
+    if cell["cell_type"] != "code":
+        return True
+    checks = [_CLEAN_CHECKS[step] for step in plan.output_steps]
+    return all(
+        check(output, plan)
+        for output in cell.get("outputs") or []  # type: ignore # it's code cell
+        for check in checks
+    )
+
+
+def _output_execution_count_clean(output: Output, plan: CleanPlan) -> bool:
+    return not output.get("execution_count", None)
+
+
+def _output_metadata_clean(output: Output, plan: CleanPlan) -> bool:
+    metadata = output.get("metadata", None)
+    return not metadata or _keeps(metadata, plan.cell_metadata_matcher)
+
+
+# step -> check that step would not change cell (output), for `is_clean`
+_CLEAN_CHECKS: Dict[Callable[..., bool], Callable[..., bool]] = {
+    _clear_cell_metadata: _cell_metadata_clean,
+    _clear_cell_execution_count: _cell_execution_count_clean,
+    _clear_cell_outputs: _cell_outputs_clear,
+    _clean_cell_outputs: _cell_outputs_clean,
+    _clear_output_execution_count: _output_execution_count_clean,
+    _clear_output_metadata: _output_metadata_clean,
+}
+
+
+def compile_config(
+    cfg: CleanConfig, transforms: Iterable[NbTransform] = ()
+) -> CleanPlan:
+    """Compile clean config to plan with only steps that can change notebook.
+    Transforms from `cfg.transforms` are created by name, then `transforms` added.
+
+    Args:
+        cfg (CleanConfig): Config to compile.
+        transforms (Iterable[NbTransform]): Transforms instances, run after `cfg.transforms`.
+
+    Raises:
+        KeyError: If transform not found.
+
+    Returns:
+        CleanPlan: Plan for `clean_nb`, `clean_cell`, `clean_outputs`.
+    """
+    plan_transforms = tuple(
+        [get_transform(name)() for name in cfg.transforms] + list(transforms)
+    )
+    nb_transforms = tuple(t for t in plan_transforms if t.subscribed("notebook"))
+    cell_transforms = tuple(t for t in plan_transforms if t.subscribed("cell"))
+    output_transforms = tuple(t for t in plan_transforms if t.subscribed("output"))
+    nb_metadata_masks = None
+    if cfg.clear_nb_metadata:
+        if cfg.nb_metadata_preserve_mask:
+            if not cfg.mask_merge:
+                nb_metadata_masks = cfg.nb_metadata_preserve_mask
+            else:
+                nb_metadata_masks = (
+                    cfg.nb_metadata_preserve_mask + NB_METADATA_PRESERVE_MASKS
+                )
+        else:
+            nb_metadata_masks = NB_METADATA_PRESERVE_MASKS
+
+    output_steps: list[OutputStep] = []
+    if cfg.clear_execution_count:
+        output_steps.append(_clear_output_execution_count)
+    if cfg.clear_cell_metadata:
+        output_steps.append(_clear_output_metadata)
+    if output_transforms:
+        output_steps.append(_transform_output)
+
+    cell_steps: list[CellStep] = []
+    if cfg.clear_cell_metadata:
+        cell_steps.append(_clear_cell_metadata)
+    if cfg.clear_execution_count:
+        cell_steps.append(_clear_cell_execution_count)
+    if cfg.clear_outputs:
+        cell_steps.append(_clear_cell_outputs)
+    elif output_steps:
+        cell_steps.append(_clean_cell_outputs)
+    if cell_transforms:
+        cell_steps.append(_transform_cell)
+
+    return CleanPlan(
+        nb_metadata_masks=nb_metadata_masks,
+        cell_metadata_masks=cfg.cell_metadata_preserve_mask,
+        cell_steps=tuple(cell_steps),
+        output_steps=tuple(output_steps),
+        store_path=cfg.store_path,
+        store_threshold=cfg.store_threshold,
+        store_write=not cfg.dry_run,
+        nb_metadata_matcher=(
+            compile_masks(nb_metadata_masks) if nb_metadata_masks is not None else None
+        ),
+        cell_metadata_matcher=(
+            compile_masks(cfg.cell_metadata_preserve_mask)
+            if cfg.cell_metadata_preserve_mask is not None
+            else None
+        ),
+        transforms=plan_transforms,
+        nb_transforms=nb_transforms,
+        cell_transforms=cell_transforms,
+        output_transforms=output_transforms,
+    )
+
+
+def _get_plan(cfg: Union[CleanConfig, CleanPlan]) -> CleanPlan:
+    return cfg if isinstance(cfg, CleanPlan) else compile_config(cfg)
+
+
+def clean_cell(
+    cell: Cell | CodeCell,
+    cfg: Union[CleanConfig, CleanPlan],
+) -> bool:
+    """Clean cell: optionally metadata, execution_count and outputs."""
+    plan = _get_plan(cfg)
+    changed = False
+    for step in plan.cell_steps:
+        if step(cell, plan):
+            changed = True
     return changed
 
 
-def clean_outputs(outputs: list[Output], cfg: CleanConfig) -> bool:
+def clean_outputs(outputs: list[Output], cfg: Union[CleanConfig, CleanPlan]) -> bool:
     """Clean outputs."""
+    plan = _get_plan(cfg)
     changed = False
     for output in outputs:
-        if cfg.clear_execution_count and output.get("execution_count", None):
-            output["execution_count"] = None
-            changed = True
-        if cfg.clear_cell_metadata and (metadata := output.get("metadata", None)):
-            old_metadata = copy.deepcopy(metadata)
-            output["metadata"] = filter_metadata(
-                metadata, cfg.cell_metadata_preserve_mask
-            )
-            if output["metadata"] != old_metadata:
+        for step in plan.output_steps:
+            if step(output, plan):
                 changed = True
     return changed
 
 
 def clean_nb(
     nb: Nb,
-    cfg: CleanConfig,
+    cfg: Union[CleanConfig, CleanPlan],
 ) -> bool:
-    """Clean notebook - metadata, execution_count, outputs.
+    """Clean notebook - metadata, execution_count, outputs, then transforms, in one traversal.
+    Config compiled to plan on every call, compile it once with `compile_config`
+    to clean many notebooks.
 
     Args:
         nb (Notebook): Notebook to clean.
-        clear_execution_count (bool, optional): Clear execution_count. Defaults to True.
-        clear_outputs (bool, optional): Clear outputs. Defaults to False.
+        cfg (Union[CleanConfig, CleanPlan]): Config or compiled plan.
 
     Returns:
         bool: True if changed.
     """
+    plan = _get_plan(cfg)
     changed = False
-    if cfg.clear_nb_metadata and (metadata := nb.get("metadata")):
-        old_metadata = copy.deepcopy(metadata)
-        if cfg.nb_metadata_preserve_mask:
-            if not cfg.mask_merge:
-                masks = cfg.nb_metadata_preserve_mask
-            else:
-                masks = cfg.nb_metadata_preserve_mask + NB_METADATA_PRESERVE_MASKS
-        else:
-            masks = NB_METADATA_PRESERVE_MASKS
-        nb["metadata"] = filter_metadata(metadata, masks=masks)
-        if nb["metadata"] != old_metadata:
+    if plan.nb_metadata_masks is not None and (metadata := nb.get("metadata")):
+        nb["metadata"] = _filter_by(metadata, plan.nb_metadata_matcher)
+        if nb["metadata"] != metadata:
+            changed = True
+    for transform in plan.nb_transforms:
+        if transform.notebook(nb):
             changed = True
-    if cfg.clear_cell_metadata or cfg.clear_execution_count or cfg.clear_outputs:
+    if plan.cell_steps:
         for cell in nb["cells"]:
-            result = clean_cell(
-                cell,
-                cfg,
-            )
-            if result:
-                changed = True
+            for step in plan.cell_steps:
+                if step(cell, plan):
+                    changed = True
+    if plan.store_path is not None and extract_payloads(
+        nb, plan.store_path, plan.store_threshold, write=plan.store_write
+    ):
+        changed = True
 
     return changed
 
 
+def is_clean(
+    nb: Nb,
+    cfg: Union[CleanConfig, CleanPlan],
+) -> bool:
+    """Check if notebook is clean: `clean_nb` with same config would not change it.
+    Notebook is not changed or copied, check stops at first field that would change.
+    Transforms can be checked only by run, so with transforms notebook copy is cleaned.
+
+    Args:
+        nb (Notebook): Notebook to check.
+        cfg (Union[CleanConfig, CleanPlan]): Config or compiled plan.
+
+    Returns:
+        bool: True if clean.
+    """
+    plan = _get_plan(cfg)
+    if plan.transforms:
+        return not clean_nb(copy.deepcopy(nb), replace(plan, store_write=False))
+    if (
+        plan.nb_metadata_masks is not None
+        and (metadata := nb.get("metadata"))
+        and not _keeps(metadata, plan.nb_metadata_matcher)
+    ):
+        return False
+    if plan.cell_steps:
+        checks = [_CLEAN_CHECKS[step] for step in plan.cell_steps]
+        for cell in nb["cells"]:
+            for check in checks:
+                if not check(cell, plan):
+                    return False
+    if plan.store_path is not None and has_payloads(nb, plan.store_threshold):
+        return False
+    return True
+
+
+def clean_nb_bytes(
+    data: bytes,
+    cfg: Union[CleanConfig, CleanPlan, None] = None,
+) -> bytes:
+    """Clean notebook serialized to bytes, nothing read or written to disk.
+
+    Args:
+        data (bytes): Notebook json, utf-8 encoded.
+        cfg (Union[CleanConfig, CleanPlan, None]): Config or compiled plan, if None default config.
+
+    Returns:
+        bytes: Cleaned notebook, same object `data` if nothing changed.
+
+    Raises:
+        ValueError: If data is not valid utf-8 json.
+    """
+    nb = json.loads(data.decode("utf-8"))
+    if clean_nb(nb, cfg or CleanConfig()):
+        return nb_to_json(nb).encode("utf-8")
+    return data
+
+
+def clean_nb_model(
+    model: dict[str, Any],
+    cfg: Union[CleanConfig, CleanPlan, None] = None,
+) -> bool:
+    """Clean notebook at Jupyter contents model (`model["content"]`) inplace.
+    Models of other types (file, directory) or without content are not changed.
+
+    Args:
+        model (dict[str, Any]): Jupyter contents model.
+        cfg (Union[CleanConfig, CleanPlan, None]): Config or compiled plan, if None default config.
+
+    Returns:
+        bool: True if changed.
+    """
+    if model.get("type") != "notebook" or not model.get("content"):
+        return False
+    return clean_nb(model["content"], cfg or CleanConfig())
+
+
+def clean_archive(
+    path: Path,
+    cfg: CleanConfig,
+    plan: Optional[CleanPlan] = None,
+    stats: Optional[CleanStats] = None,
+    reasons: Optional[dict[Path, str]] = None,
+    hidden: bool = False,
+    scanned: Optional[list[Path]] = None,
+) -> tuple[list[Path], list[Path]]:
+    """Clean notebooks inside zip or tar archive, rewrite archive in one pass.
+
+    Args:
+        path (Path): Archive filename.
+        cfg (CleanConfig): Config for job.
+        plan (Optional[CleanPlan]): Compiled config, if None compiled from `cfg`.
+        stats (Optional[CleanStats]): If given, stats for cleaned notebooks are added to it.
+        reasons (Optional[dict[Path, str]]): If given, failure reasons for notebooks with errors
+            are added to it.
+        hidden (bool): Clean hidden notebooks inside archive. Defaults to False.
+        scanned (Optional[list[Path]]): If given, all notebooks read from archive are added to it.
+
+    Returns:
+        tuple[List[Path], List[Path]]: List of cleaned notebooks, list of notebooks with errors.
+            Notebooks named as `archive / member`.
+    """
+    plan = plan or compile_config(cfg)
+    cleaned: list[Path] = []
+    errors: list[Path] = []
+    reasons = reasons if reasons is not None else {}
+
+    def clean_member(name: str, data: bytes) -> Optional[bytes]:
+        if scanned is not None:
+            scanned.append(path / name)
+        reason, result, nb_stats, _ = _clean_nb_data(
+            data, plan, path / name, stats is not None
+        )
+        if reason is not None:
+            errors.append(path / name)
+            reasons[path / name] = reason
+            return None
+        if result is not None:
+            cleaned.append(path / name)
+            if stats is not None and nb_stats is not None:
+                stats.add(nb_stats)
+        return result
+
+    if cfg.preserve_timestamp:
+        stat = path.stat()
+        timestamp = (stat.st_atime, stat.st_mtime)
+    else:
+        timestamp = None
+    try:
+        transform_archive(
+            path,
+            clean_member,
+            hidden=hidden,
+            write=not cfg.dry_run,
+            timestamp=timestamp,
+        )
+    except Exception:
+        reasons[path] = "archive error"
+        return [], [path]
+    return cleaned, errors
+
+
+def _read_clean_nb(
+    filename: Path, plan: CleanPlan, with_stats: bool = False, serialize: bool = True
+) -> tuple[Optional[str], bool, Optional[str], Optional[NbStats], Durations]:
+    """Read, clean and serialize notebook, return failure reason (None if valid notebook),
+    changed flag, serialized notebook if changed and `serialize`,
+    stats if `with_stats` and notebook changed and durations of parse, clean and serialise.
+    Notebook itself is not returned, so only result is sent back from watchdog worker."""
+    start = time.perf_counter()
+    nb, reason = read_nb_with_reason(filename)
+    parsed = time.perf_counter()
+    durations = {"parse": parsed - start}
+    if nb is None:
+        return reason or "", False, None, None, durations
+    before = nb_counts(nb) if with_stats else None
+    changed = clean_nb(nb, plan)
+    cleaned = time.perf_counter()
+    durations["clean"] = cleaned - parsed
+    if not changed:
+        return None, False, None, None, durations
+    text = nb_to_json(nb) if serialize or before is not None else None
+    if serialize:
+        durations["serialise"] = time.perf_counter() - cleaned
+    nb_stats = (
+        NbStats.from_counts(
+            filename,
+            filename.stat().st_size,
+            len(text.encode("utf-8")),  # type: ignore[union-attr]
+            before,
+            nb_counts(nb),
+        )
+        if before is not None
+        else None
+    )
+    return None, True, text if serialize else None, nb_stats, durations
+
+
+def _clean_nb_data(
+    data: bytes, plan: CleanPlan, path: Path, with_stats: bool = False
+) -> CleanedData:
+    """Clean serialized notebook, return failure reason (None if valid notebook),
+    cleaned data (None if not changed), stats for `path` if `with_stats` and notebook changed
+    and durations of parse, clean and serialise."""
+    start = time.perf_counter()
+    nb, reason = parse_nb(data)
+    parsed = time.perf_counter()
+    durations = {"parse": parsed - start}
+    if nb is None:
+        return reason, None, None, durations
+    before = nb_counts(nb) if with_stats else None
+    changed = clean_nb(nb, plan)
+    cleaned = time.perf_counter()
+    durations["clean"] = cleaned - parsed
+    if not changed:
+        return None, None, None, durations
+    result = nb_to_json(nb).encode("utf-8")
+    durations["serialise"] = time.perf_counter() - cleaned
+    nb_stats = (
+        NbStats.from_counts(path, len(data), len(result), before, nb_counts(nb))
+        if before is not None
+        else None
+    )
+    return None, result, nb_stats, durations
+
+
+def _clean_archive_task(
+    path: Path, cfg: CleanConfig, plan: CleanPlan, with_stats: bool, hidden: bool
+) -> tuple[list[Path], list[Path], Optional[CleanStats], dict[Path, str], int]:
+    """Clean archive, return stats, reasons and number of notebooks read with result,
+    so it can run at worker process."""
+    stats = CleanStats() if with_stats else None
+    reasons: dict[Path, str] = {}
+    scanned: list[Path] = []
+    cleaned, errors = clean_archive(path, cfg, plan, stats, reasons, hidden, scanned)
+    return cleaned, errors, stats, reasons, len(scanned)
+
+
+def _over_size(filename: Path, max_bytes: Optional[int]) -> bool:
+    if max_bytes is None:
+        return False
+    return file_size(filename) > max_bytes
+
+
+def _config_key(cfg: CleanConfig) -> str:
+    """Key of config options changing result, for journal."""
+    config = asdict(cfg)
+    for key in ("silent", "verbose", "journal_path", "resume"):
+        del config[key]
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+def _get_timestamp(filename: Path, cfg: CleanConfig) -> Optional[tuple[float, float]]:
+    if not cfg.preserve_timestamp:
+        return None
+    stat = filename.stat()
+    return stat.st_atime, stat.st_mtime
+
+
+class _CleanRun:
+    """State of `clean_nb_file` run: results, worker for limits, cleaned content by hash."""
+
+    def __init__(
+        self,
+        cfg: CleanConfig,
+        plan: CleanPlan,
+        skipped: list[Path],
+        stats: Optional[CleanStats] = None,
+        reasons: Optional[dict[Path, str]] = None,
+        progress: Optional[Progress] = None,
+        metrics: Optional[RunMetrics] = None,
+        hidden: bool = False,
+    ) -> None:
+        self.cfg = cfg
+        self.hidden = hidden
+        self.progress = progress
+        self.metrics = metrics
+        self.plan = plan
+        self.cleaned: list[Path] = []
+        self.errors: list[Path] = []
+        self.skipped = skipped
+        # notebooks read, archive counted by members
+        self.scanned = 0
+        self.stats = stats
+        self.reasons = reasons if reasons is not None else {}
+        self.watchdog = (
+            Watchdog(cfg.max_nb_seconds, cfg.max_nb_memory)
+            if cfg.max_nb_seconds is not None or cfg.max_nb_memory is not None
+            else None
+        )
+        # content hash -> result, without cleaned data, so memory does not grow with corpus
+        self.contents: Optional[Dict[bytes, _ContentResult]] = (
+            {} if cfg.dedupe_content else None
+        )
+        self.journal = (
+            Journal(cfg.journal_path, _config_key(cfg), cfg.resume)
+            if cfg.journal_path is not None
+            else None
+        )
+
+    def error(self, filename: Path, reason: str) -> None:
+        self.errors.append(filename)
+        self.reasons[filename] = reason
+
+    def observe(self, durations: Durations) -> None:
+        if self.metrics is not None:
+            for phase, seconds in durations.items():
+                self.metrics.observe(phase, seconds)
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run task at watchdog worker if limits set."""
+        if self.watchdog is not None:
+            return self.watchdog.run(func, *args)
+        return func(*args)
+
+    def process(self, filename: Path) -> None:
+        """Clean notebook or archive, with journal if set: outcome of notebook
+        journaled and not changed since is taken from journal. Progress updated if set."""
+        entry = self.journal.done(filename) if self.journal is not None else None
+        if entry is not None:
+            self.cleaned.extend(Path(nb) for nb in entry.cleaned)
+            for nb, reason in entry.errors.items():
+                self.error(Path(nb), reason)
+            self.skipped.extend(Path(nb) for nb in entry.skipped)
+            # unchanged archive members are not journaled
+            self.scanned += max(
+                1, len(entry.cleaned) + len(entry.errors) + len(entry.skipped)
+            )
+            if self.progress is not None:
+                self.progress.update()
+            return
+        num_cleaned, num_errors, num_skipped, num_scanned = (
+            len(self.cleaned),
+            len(self.errors),
+            len(self.skipped),
+            self.scanned,
+        )
+        counted = self.progress is not None or self.metrics is not None
+        bytes_read = file_size(filename) if counted else 0
+        self.clean(filename)
+        if self.scanned == num_scanned:  # notebook, or archive without notebooks read
+            self.scanned += 1
+        if self.journal is not None:
+            self.journal.add(
+                filename,
+                self.cleaned[num_cleaned:],
+                {nb: self.reasons.get(nb, "") for nb in self.errors[num_errors:]},
+                self.skipped[num_skipped:],
+            )
+        if counted:
+            written = len(self.cleaned) > num_cleaned and not self.cfg.dry_run
+            bytes_written = file_size(filename) if written else 0
+            if self.progress is not None:
+                self.progress.update(1, bytes_read, bytes_written)
+            if self.metrics is not None:
+                self.metrics.bytes["read"] += bytes_read
+                self.metrics.bytes["written"] += bytes_written
+
+    def clean(self, filename: Path) -> None:
+        """Clean notebook or archive, under lock if set."""
+        if not self.cfg.lock:
+            self.clean_file(filename)
+            return
+        with nb_lock(filename, self.cfg.lock_timeout) as locked:
+            if locked:
+                self.clean_file(filename)
+            elif not self.cfg.skip_locked:
+                self.error(filename, "locked")
+
+    def clean_file(self, filename: Path) -> None:
+        """Clean notebook or archive, add result to `cleaned`, `errors` or `skipped`.
+        With watchdog notebook is read, cleaned and serialized at worker process,
+        only result is sent back and written here.
+        """
+        cfg = self.cfg
+        if _over_size(filename, cfg.max_nb_bytes):
+            self.skipped.append(filename)
+            return
+        if self.plan.empty:  # nothing to clean: file opened, not read and parsed
+            reason = open_failure(filename)
+            if reason is not None:
+                self.error(filename, reason)
+            return
+        try:
+            if is_archive(filename) and filename.is_file():
+                start = time.perf_counter()
+                (
+                    archive_cleaned,
+                    archive_errors,
+                    archive_stats,
+                    reasons,
+                    archive_scanned,
+                ) = self.run(
+                    _clean_archive_task,
+                    filename,
+                    cfg,
+                    self.plan,
+                    self.stats is not None,
+                    self.hidden,
+                )
+                self.observe({"clean": time.perf_counter() - start})
+                self.cleaned.extend(archive_cleaned)
+                self.errors.extend(archive_errors)
+                self.reasons.update(reasons)
+                self.scanned += archive_scanned
+                if self.stats is not None and archive_stats is not None:
+                    self.stats.extend(archive_stats)
+                return
+            if self.contents is not None and filename.is_file():
+                self.clean_content(filename)
+                return
+            reason, changed, text, nb_stats, durations = self.run(
+                _read_clean_nb,
+                filename,
+                self.plan,
+                self.stats is not None,
+                not cfg.dry_run,
+            )
+        except LimitExceeded:
+            self.skipped.append(filename)
+            return
+        self.observe(durations)
+        if reason is not None:
+            self.error(filename, reason)
+            return
+        if changed:
+            self.cleaned.append(filename)
+            if self.stats is not None and nb_stats is not None:
+                self.stats.add(nb_stats)
+            if text is None:  # dry run
+                return
+            start = time.perf_counter()
+            write_nb_json(text, filename, _get_timestamp(filename, cfg))
+            self.observe({"write": time.perf_counter() - start})
+
+    def clean_content(self, filename: Path) -> None:
+        """Clean notebook by content: identical notebooks parsed and cleaned once,
+        cleaned content copied from first written file to every copy."""
+        data, reason = read_bytes(filename)
+        if data is None:
+            self.error(filename, reason or "")
+            return
+        digest = hashlib.sha256(data).digest()
+        contents: Dict[bytes, _ContentResult] = self.contents  # type: ignore[assignment]
+        result = contents.get(digest)
+        cleaned_data = None
+        if result is not None and result.changed and not self.cfg.dry_run:
+            cleaned_data = self.read_written(result)
+            if cleaned_data is None:  # first copy changed or removed since
+                result = None
+        if result is None:
+            reason, cleaned_data, nb_stats, durations = self.run(
+                _clean_nb_data, data, self.plan, filename, self.stats is not None
+            )
+            self.observe(durations)
+            result = contents[digest] = _ContentResult(
+                reason, cleaned_data is not None, nb_stats
+            )
+        del data
+        if result.reason is not None:
+            self.error(filename, result.reason)
+            return
+        if not result.changed:
+            return
+        self.cleaned.append(filename)
+        if self.stats is not None and result.stats is not None:
+            self.stats.add(replace(result.stats, path=filename))
+        if self.cfg.dry_run or cleaned_data is None:
+            return
+        start = time.perf_counter()
+        timestamp = _get_timestamp(filename, self.cfg)
+        filename.write_bytes(cleaned_data)
+        if timestamp is not None:
+            os.utime(filename, timestamp)
+        self.observe({"write": time.perf_counter() - start})
+        if result.written is None:
+            contents[digest] = result._replace(
+                written=filename, digest=hashlib.sha256(cleaned_data).digest()
+            )
+
+    @staticmethod
+    def read_written(result: _ContentResult) -> Optional[bytes]:
+        """Cleaned content from first written copy, None if it is changed or removed."""
+        if result.written is None:
+            return None
+        try:
+            data = result.written.read_bytes()
+        except OSError:
+            return None
+        return data if hashlib.sha256(data).digest() == result.digest else None
+
+    def close(self) -> None:
+        if self.watchdog is not None:
+            self.watchdog.close()
+        if self.journal is not None:
+            self.journal.close()
+
+
 def clean_nb_file(
-    path: Union[Path, list[Path]],
+    path: Union[Path, Iterable[Path]],
     cfg: Optional[CleanConfig] = None,
+    skipped: Optional[list[Path]] = None,
+    stats: Optional[CleanStats] = None,
+    reasons: Optional[dict[Path, str]] = None,
+    progress: Optional[Progress] = None,
+    metrics: Optional[RunMetrics] = None,
+    hidden: bool = False,
 ) -> tuple[list[Path], list[Path]]:
     """Clean metadata and execution count from notebook.
+    If `cfg.lock` is set, every notebook is read, cleaned and written under advisory lock.
+    If `cfg.max_nb_seconds` or `cfg.max_nb_memory` is set, notebooks are read and cleaned
+    at worker process, killed if limit exceeded.
+    If `cfg.dedupe_content` is set, byte-identical notebooks are parsed and cleaned once.
+    If `cfg.journal_path` is set, outcome of every notebook is journaled, with `cfg.resume`
+    notebooks journaled at interrupted run are not processed again.
+    If config can not change any notebook, files are only opened, not read and parsed:
+    files that can not be opened are reported as errors, not valid notebooks are not.
 
     Args:
-        path (Union[str, PosixPath]): Notebook filename or list of names.
+        path (Union[str, PosixPath]): Notebook filename or list (iterable) of names.
+            Zip and tar archives are cleaned member by member.
         cfg (CleanConfig, optional): Config for job, if None, used default settings. Default is None.
+        skipped (Optional[list[Path]]): If given, notebooks skipped as limit exceeded are added to it.
+        stats (Optional[CleanStats]): If given, stats for cleaned notebooks are added to it:
+            size before and after, cleared execution counts, dropped metadata keys, removed outputs.
+            Collected at dry run too.
+        reasons (Optional[dict[Path, str]]): If given, failure reasons for notebooks with errors
+            are added to it, like "invalid json", "permission denied", "locked".
+        progress (Optional[Progress]): If given, updated after every notebook or archive.
+        metrics (Optional[RunMetrics]): If given, notebooks by outcome, bytes read and written
+            and durations of parse, clean, serialise and write are added to it.
+            Archive is timed as whole, as clean.
+        hidden (bool): Clean hidden notebooks inside archives, as `hidden` of `get_nb_names`.
+            Defaults to False.
 
     Returns:
         tuple[List[Path], List[TuplePath]]: List of cleaned notebooks, list of notebooks with errors.
     """
     cfg = cfg or CleanConfig()
-    if not isinstance(path, list):
+    if isinstance(path, (str, os.PathLike)):
         path = [path]
-    cleaned: list[Path] = []
-    errors: list[Path] = []
-    for filename in path:
-        nb = read_nb(filename)
-        if nb is None:
-            errors.append(filename)
-            continue
-        result = clean_nb(
-            nb,
-            cfg,
+    plan = compile_config(cfg)
+    clean_run = _CleanRun(
+        cfg,
+        plan,
+        skipped if skipped is not None else [],
+        stats,
+        reasons,
+        progress,
+        metrics,
+        hidden,
+    )
+    try:
+        for filename in path:
+            clean_run.process(filename)
+    finally:
+        clean_run.close()
+    if metrics is not None:
+        metrics.notebooks.update(
+            scanned=clean_run.scanned,
+            cleaned=len(clean_run.cleaned),
+            errored=len(clean_run.errors),
+            skipped=len(clean_run.skipped),
         )
-        if result:
-            cleaned.append(filename)
-            if cfg.dry_run:
-                continue
-            if cfg.preserve_timestamp:
-                stat = filename.stat()
-                timestamp = (stat.st_atime, stat.st_mtime)
-            else:
-                timestamp = None
-            write_nb(nb, filename, timestamp)
 
-    return cleaned, errors
+    return clean_run.cleaned, clean_run.errors
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Union
+
+from .mask import parse_mask
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .clean import CleanConfig, TupleStr
+
+
+__all__ = [
+    "add_clean_options",
+    "clean_config_from_args",
+    "process_mask",
+]
+
+
+def add_clean_options(parser: argparse.ArgumentParser) -> None:
+    """Add options that set what is cleaned at notebook, shared by nbmetaclean and nbcheck."""
+    parser.add_argument(
+        "--not_ec",
+        action="store_false",
+        help="Do not clear execution_count.",
+    )
+    parser.add_argument(
+        "--dont_clear_nb_metadata",
+        action="store_true",
+        help="Do not clear notebook metadata.",
+    )
+    parser.add_argument(
+        "--clear_cell_metadata",
+        action="store_true",
+        help="Clear cell metadata.",
+    )
+    parser.add_argument(
+        "--clear_outputs",
+        action="store_true",
+        help="Clear outputs.",
+    )
+    parser.add_argument(
+        "--nb_metadata_preserve_mask",
+        nargs="+",
+        help="Preserve mask for notebook metadata. Items can be globs, like `jupytext.*`, "
+        "or regex, like `/^celltoolbar$/`, regex matches anywhere at key, use `^...$` to anchor.",
+    )
+    parser.add_argument(
+        "--cell_metadata_preserve_mask",
+        nargs="+",
+        help="Preserve mask for cell metadata. Items can be globs, like `*.tags`, "
+        "or regex, like `/^tags$/`, regex matches anywhere at key, use `^...$` to anchor.",
+    )
+    parser.add_argument(
+        "--dont_merge_masks",
+        action="store_true",
+        help="Do not merge masks.",
+    )
+    parser.add_argument(
+        "--store",
+        help="Move large outputs and attachments payloads to content-addressed store at this directory.",
+    )
+    parser.add_argument(
+        "--store_threshold",
+        type=int,
+        default=1024,
+        help="Minimal payload size in bytes to move to store, default 1024.",
+    )
+    parser.add_argument(
+        "--transform",
+        action="append",
+        metavar="NAME",
+        help="Run registered transform by name, at same traversal as cleaning, "
+        "can be used multiple times. "
+        "Transforms from `nbmetaclean.transforms` entry points are loaded when selected.",
+    )
+
+
+def process_mask(mask: Union[list[str], None]) -> Union[tuple[TupleStr, ...], None]:
+    if mask is None:
+        return None
+    return tuple(parse_mask(item) for item in mask)
+
+
+def clean_config_from_args(args: argparse.Namespace, **kwargs: Any) -> CleanConfig:
+    """Clean config from options added by `add_clean_options`,
+    other config fields can be set by `kwargs`.
+
+    Raises:
+        KeyError: If transform not found.
+    """
+    from .clean import CleanConfig
+    from .transform import get_transform
+
+    transforms = tuple(args.transform or ())
+    for name in transforms:
+        get_transform(name)
+    return CleanConfig(
+        clear_nb_metadata=not args.dont_clear_nb_metadata,
+        clear_cell_metadata=args.clear_cell_metadata,
+        clear_execution_count=args.not_ec,
+        clear_outputs=args.clear_outputs,
+        nb_metadata_preserve_mask=process_mask(args.nb_metadata_preserve_mask),
+        cell_metadata_preserve_mask=process_mask(args.cell_metadata_preserve_mask),
+        mask_merge=not args.dont_merge_masks,
+        store_path=Path(args.store) if args.store else None,
+        store_threshold=args.store_threshold,
+        transforms=transforms,
+        **kwargs,
+    )
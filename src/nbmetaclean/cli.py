@@ -0,0 +1,36 @@
+"""Command line entry points.
+Run is forwarded to server if it is running, before apps and their dependencies are imported,
+so module imports only `client`.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from .client import forward
+
+
+__all__ = [
+    "nbcheck",
+    "nbmetaclean",
+]
+
+
+def nbmetaclean() -> None:
+    """`nbmetaclean` (`nbclean`) command, forwarded to server if it is running."""
+    argv = sys.argv[1:]
+    if argv[:1] != ["server"] and (code := forward("nbmetaclean", argv)) is not None:
+        sys.exit(code)
+    from .app_clean import app_clean
+
+    app_clean(argv)
+
+
+def nbcheck() -> None:
+    """`nbcheck` command, forwarded to server if it is running."""
+    argv = sys.argv[1:]
+    if (code := forward("nbcheck", argv)) is not None:
+        sys.exit(code)
+    from .app_check import app_check
+
+    app_check(argv)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import stat
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .version import __version__
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .clean import CleanConfig
+
+
+__all__ = [
+    "NO_SERVER_ENV",
+    "SOCKET_ENV",
+    "forward",
+    "is_trusted_socket",
+    "request",
+    "server_clean_nb_bytes",
+    "socket_path",
+]
+
+SOCKET_ENV = "NBMETACLEAN_SOCKET"
+NO_SERVER_ENV = "NBMETACLEAN_NO_SERVER"
+
+
+def socket_path() -> str:
+    """Server socket: `NBMETACLEAN_SOCKET`, at `XDG_RUNTIME_DIR`
+    or at per user directory at temp directory, created by server with mode 0700."""
+    if path := os.environ.get(SOCKET_ENV):
+        return path
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(runtime_dir, "nbmetaclean.sock")
+    return os.path.join(
+        os.environ.get("TMPDIR", "/tmp"), f"nbmetaclean-{os.getuid()}", "server.sock"
+    )
+
+
+def is_trusted_socket(path: str) -> bool:
+    """Check that socket is owned by current user and not accessible by others:
+    mode 0600 (0700) or at directory of current user with mode 0700.
+    Socket created by other user is not trusted, runs are not forwarded to it.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        return False
+    if not st.st_mode & 0o077:
+        return True
+    try:
+        parent = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:  # pragma: no cover
+        return False
+    return parent.st_uid == os.getuid() and not parent.st_mode & 0o077
+
+
+def request(
+    message: Dict[str, Any], path: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Send request to server, return response.
+    Return None if server is not running, socket is not trusted (see `is_trusted_socket`)
+    or server closed connection without response.
+    """
+    if not hasattr(socket, "AF_UNIX"):  # pragma: no cover  # windows
+        return None
+    path = path or socket_path()
+    if not is_trusted_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except OSError:
+            return None
+        sock.sendall(json.dumps(message).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    if not chunks:
+        return None
+    return json.loads(b"".join(chunks))
+
+
+def _reads_stdin(argv: List[str]) -> bool:
+    """Check if CLI reads paths from stdin, `--files_from -`."""
+    for num, arg in enumerate(argv):
+        if arg in ("--files_from=-", "--files-from=-"):
+            return True
+        if arg in ("--files_from", "--files-from") and argv[num + 1 : num + 2] == ["-"]:
+            return True
+    return False
+
+
+def forward(app: str, argv: List[str]) -> Optional[int]:
+    """Run CLI at server if it is running, print output and return exit code.
+    Return None if server is not running, disabled by `NBMETACLEAN_NO_SERVER`,
+    has other version or CLI reads stdin - CLI runs in-process.
+    """
+    if os.environ.get(NO_SERVER_ENV) or _reads_stdin(argv):
+        return None
+    response = request(
+        {
+            "cmd": "run",
+            "app": app,
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "version": __version__,
+        }
+    )
+    if response is None or "error" in response:
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["code"]
+
+
+def server_clean_nb_bytes(
+    data: bytes,
+    cfg: Optional[CleanConfig] = None,
+    path: Optional[str] = None,
+) -> Optional[bytes]:
+    """Clean notebook serialized to bytes at server, see `clean_nb_bytes`.
+
+    Args:
+        data (bytes): Notebook json, utf-8 encoded.
+        cfg (Optional[CleanConfig]): Config, if None default config.
+        path (Optional[str]): Server socket, if None `socket_path()`.
+
+    Returns:
+        Optional[bytes]: Cleaned notebook, same object `data` if nothing changed,
+            None if server is not running.
+
+    Raises:
+        ValueError: If data is not valid utf-8 json.
+    """
+    import dataclasses  # imported on use, module is imported before every CLI run
+
+    config = (
+        {
+            key: os.fspath(value) if isinstance(value, os.PathLike) else value
+            for key, value in dataclasses.asdict(cfg).items()
+        }
+        if cfg is not None
+        else None
+    )
+    response = request(
+        {"cmd": "clean", "data": data.decode("utf-8"), "cfg": config}, path
+    )
+    if response is None:
+        return None
+    if "error" in response:
+        raise ValueError(response["error"])
+    if response["data"] is None:
+        return data
+    return response["data"].encode("utf-8")
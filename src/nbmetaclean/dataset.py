@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import sqlite3
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from .batch import EcBatch, _numpy, check_ec_batch
+from .check import CheckFactory, EcCheck, run_checks
+from .clean import CleanConfig, CleanPlan, clean_nb, compile_config
+from .helpers import nb_to_json
+from .nb_types import Nb, PathOrStr
+from .reader import READ_NOT_NOTEBOOK, parse_nb
+
+
+__all__ = [
+    "DatasetResult",
+    "is_sqlite",
+    "iter_jsonl",
+    "iter_sqlite",
+    "process_dataset",
+    "process_record",
+]
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+PROGRESS_TABLE = "_nbmetaclean_progress"
+
+# JSONL line or SQLite row as dict column -> value.
+Item = Union[str, Dict[str, Any]]
+
+
+def is_sqlite(path: PathOrStr) -> bool:
+    """Check if dataset at `path` is SQLite database, by suffix."""
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+@dataclass
+class DatasetResult:
+    """Result of dataset processing.
+
+    Args:
+        records (int): Records processed at this run.
+        offset (int): Records processed including previous runs, offset to resume from.
+        cleaned (int): Records with cleaned notebook.
+        errors (Dict[int, str]): Failure reason by record offset. Records written unchanged.
+        failed (Counter[str]): Failed checks by check name.
+    """
+
+    records: int = 0
+    offset: int = 0
+    cleaned: int = 0
+    errors: Dict[int, str] = field(default_factory=dict)
+    failed: Counter[str] = field(default_factory=Counter)
+
+
+def _process_record(
+    record: Dict[str, Any],
+    nb_field: str,
+    plan: Optional[CleanPlan],
+    checks: Iterable[CheckFactory],
+) -> Tuple[Optional[Nb], bool, Optional[str], Dict[str, bool]]:
+    """Clean and check notebook at `record[nb_field]`, return notebook as well."""
+    value = record.get(nb_field)
+    nb: Optional[Nb]
+    if isinstance(value, str):
+        nb, reason = parse_nb(value.encode("utf-8"))
+    elif isinstance(value, dict) and isinstance(value.get("cells"), list):
+        nb, reason = cast(Nb, value), None
+    else:
+        nb, reason = None, READ_NOT_NOTEBOOK
+    if nb is None:
+        return None, False, reason, {}
+    changed = plan is not None and clean_nb(nb, plan)
+    if changed and isinstance(value, str):
+        record[nb_field] = nb_to_json(nb)
+    results = run_checks(nb, checks) if checks else {}
+    return nb, changed, None, results
+
+
+def process_record(
+    record: Dict[str, Any],
+    nb_field: str,
+    plan: Optional[CleanPlan] = None,
+    checks: Iterable[CheckFactory] = (),
+    checks_field: str = "nbcheck",
+) -> Tuple[bool, Optional[str], Dict[str, bool]]:
+    """Clean and check notebook at `record[nb_field]` inplace.
+    Notebook can be json object or json string, written back in same form.
+    Checks results added to record at `checks_field`.
+
+    Returns:
+        Tuple[bool, Optional[str], Dict[str, bool]]: Changed flag, failure reason
+            (None if valid notebook) and checks results.
+    """
+    _, changed, reason, results = _process_record(record, nb_field, plan, checks)
+    if results:
+        record[checks_field] = results
+    return changed, reason, results
+
+
+def _split_ec_check(
+    checks: List[CheckFactory],
+) -> Tuple[List[CheckFactory], Optional[EcCheck]]:
+    """Take `ec` check out of checks, to check whole batch by `check_ec_batch`.
+    Only if NumPy installed, without it batch check is not faster than `run_checks`.
+    """
+    if _numpy() is None:
+        return checks, None
+    for num, factory in enumerate(checks):
+        check = factory()
+        if type(check) is EcCheck:
+            return checks[:num] + checks[num + 1 :], check
+    return checks, None
+
+
+def _process_batch(
+    items: List[Item],
+    nb_field: str,
+    plan: Optional[CleanPlan],
+    checks: List[CheckFactory],
+    checks_field: str,
+) -> List[Tuple[Item, bool, Optional[str], Dict[str, bool]]]:
+    """Process batch of JSONL lines or SQLite rows, runs at worker process.
+    With NumPy `ec` check runs for all notebooks of batch at once.
+    """
+    names = [factory().name for factory in checks]
+    other_checks, ec_check = _split_ec_check(checks)
+    processed: List[
+        Tuple[Item, Optional[Dict[str, Any]], bool, Optional[str], Dict[str, bool]]
+    ] = []
+    ec_batch = EcBatch()
+    ec_nums: List[int] = []
+    for item in items:
+        if isinstance(item, str):
+            try:
+                record = json.loads(item)
+            except ValueError:
+                processed.append((item, None, False, "invalid json", {}))
+                continue
+            if not isinstance(record, dict):
+                processed.append((item, None, False, READ_NOT_NOTEBOOK, {}))
+                continue
+        else:
+            record = item
+        nb, changed, reason, results = _process_record(
+            record, nb_field, plan, other_checks
+        )
+        if nb is not None and ec_check is not None:
+            ec_nums.append(len(processed))
+            ec_batch.add(nb)
+        processed.append((item, record, changed, reason, results))
+    if ec_check is not None:
+        verdicts = check_ec_batch(
+            ec_batch, ec_check.strict, ec_check.no_exec, use_numpy=True
+        )
+        for num, verdict in zip(ec_nums, verdicts):
+            results = processed[num][4]
+            results[ec_check.name] = verdict
+            ordered = {name: results[name] for name in names}
+            results.clear()
+            results.update(ordered)
+
+    result: List[Tuple[Item, bool, Optional[str], Dict[str, bool]]] = []
+    for item, record, changed, reason, results in processed:
+        out: Item
+        if record is None:
+            out = item
+        else:
+            if results:
+                record[checks_field] = results
+            if isinstance(item, str):
+                out = (
+                    json.dumps(record, ensure_ascii=False) + "\n"
+                    if changed or results
+                    else item
+                )
+            else:
+                out = record
+        result.append((out, changed, reason, results))
+    return result
+
+
+def iter_jsonl(path: PathOrStr, offset: int = 0) -> Iterator[str]:
+    """Iterate over records lines at JSONL file, skip first `offset` records."""
+    with open(path, "r", encoding="utf-8") as fh:
+        num = 0
+        for line in fh:
+            if not line.strip():
+                continue
+            if num >= offset:
+                yield line if line.endswith("\n") else line + "\n"
+            num += 1
+
+
+def iter_sqlite(
+    path: PathOrStr, table: str, offset: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over rows of SQLite table as dicts, by rowid, skip first `offset` rows."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.execute(
+            f'SELECT * FROM "{table}" ORDER BY rowid LIMIT -1 OFFSET ?', (offset,)
+        )
+        for row in cursor:
+            yield dict(row)
+    finally:
+        conn.close()
+
+
+def _batches(items: Iterable[Item], batch_size: int) -> Iterator[List[Item]]:
+    batch: List[Item] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _JsonlWriter:
+    """Write JSONL shard, progress saved at `<output>.progress` after every batch.
+    On resume output truncated to size saved with progress, so partial writes dropped."""
+
+    def __init__(self, output: Path, resume: bool) -> None:
+        self.progress_path = output.with_name(output.name + ".progress")
+        self.offset = 0
+        size = 0
+        if resume and self.progress_path.exists():
+            progress = json.loads(self.progress_path.read_text(encoding="utf-8"))
+            self.offset, size = progress["offset"], progress["size"]
+        self.fh = open(output, "r+b" if size else "wb")
+        self.fh.truncate(size)
+        self.fh.seek(size)
+
+    def write(self, items: List[Item], offset: int) -> None:
+        self.fh.write("".join(items).encode("utf-8"))  # type: ignore[arg-type]
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        tmp_path = self.progress_path.with_name(f".{self.progress_path.name}.tmp")
+        tmp_path.write_text(
+            json.dumps({"offset": offset, "size": self.fh.tell()}), encoding="utf-8"
+        )
+        os.replace(tmp_path, self.progress_path)
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class _SqliteWriter:
+    """Write rows to table at new SQLite database, same schema as source table,
+    plus column for checks results. Progress saved at same transaction as rows."""
+
+    def __init__(
+        self,
+        source: Path,
+        output: Path,
+        table: str,
+        resume: bool,
+        checks_field: Optional[str],
+    ) -> None:
+        self.table = table
+        self.checks_field = checks_field
+        self.conn = sqlite3.connect(output)
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            (schema,) = src.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+        finally:
+            src.close()
+        if not resume:
+            self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.conn.execute(f"DROP TABLE IF EXISTS {PROGRESS_TABLE}")
+        self.conn.execute(
+            schema.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)
+        )
+        columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+        if checks_field is not None and checks_field not in columns:
+            self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{checks_field}" TEXT')
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (tbl TEXT PRIMARY KEY, offset INTEGER)"
+        )
+        row = self.conn.execute(
+            f"SELECT offset FROM {PROGRESS_TABLE} WHERE tbl = ?", (table,)
+        ).fetchone()
+        self.offset = row[0] if row else 0
+        self.conn.commit()
+
+    def write(self, items: List[Item], offset: int) -> None:
+        rows: List[Dict[str, Any]] = items  # type: ignore[assignment]
+        if rows:
+            if self.checks_field is not None:
+                for row in rows:
+                    if isinstance(row.get(self.checks_field), dict):
+                        row[self.checks_field] = json.dumps(row[self.checks_field])
+            columns = list(rows[0])
+            if self.checks_field is not None and self.checks_field not in columns:
+                columns.append(self.checks_field)
+            names = ", ".join(f'"{name}"' for name in columns)
+            marks = ", ".join("?" for _ in columns)
+            self.conn.executemany(
+                f'INSERT INTO "{self.table}" ({names}) VALUES ({marks})',
+                (tuple(row.get(name) for name in columns) for row in rows),
+            )
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {PROGRESS_TABLE} (tbl, offset) VALUES (?, ?)",
+            (self.table, offset),
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def process_dataset(
+    source: PathOrStr,
+    output: PathOrStr,
+    nb_field: str = "notebook",
+    clean_cfg: Optional[CleanConfig] = None,
+    checks: Optional[List[CheckFactory]] = None,
+    table: str = "notebooks",
+    checks_field: str = "nbcheck",
+    workers: int = 0,
+    batch_size: int = 100,
+    resume: bool = False,
+) -> DatasetResult:
+    """Clean and check notebooks stored as records at JSONL file or SQLite table,
+    write records to new JSONL file or SQLite database.
+    Records processed by batches at worker pool, number of batches in flight is limited,
+    so memory is bounded. Progress saved after every written batch,
+    with `resume` processing continued from saved record offset.
+
+    Args:
+        source (Union[Path, str]): JSONL file or SQLite database (`.sqlite`, `.sqlite3`, `.db`).
+        output (Union[Path, str]): Output file, same format as source.
+        nb_field (str): Record field (column) with notebook. Defaults to "notebook".
+        clean_cfg (Optional[CleanConfig]): Clean config, if None notebooks are not cleaned.
+        checks (Optional[List[CheckFactory]]): Checks, results written to `checks_field`.
+        table (str): SQLite table. Defaults to "notebooks".
+        checks_field (str): Record field for checks results. Defaults to "nbcheck".
+        workers (int): Number of worker processes, 0 - process at current process.
+        batch_size (int): Records per batch. Defaults to 100.
+        resume (bool): Continue from offset saved at previous run. Defaults to False.
+
+    Returns:
+        DatasetResult: Processed records, cleaned records, errors and failed checks.
+    """
+    source_path, output_path = Path(source), Path(output)
+    plan = compile_config(clean_cfg) if clean_cfg is not None else None
+    if plan is not None and plan.empty:
+        plan = None
+    checks = checks or []
+    writer: Union[_JsonlWriter, _SqliteWriter]
+    if is_sqlite(source_path):
+        writer = _SqliteWriter(
+            source_path, output_path, table, resume, checks_field if checks else None
+        )
+        items: Iterable[Item] = iter_sqlite(source_path, table, writer.offset)
+    else:
+        writer = _JsonlWriter(output_path, resume)
+        items = iter_jsonl(source_path, writer.offset)
+    result = DatasetResult(offset=writer.offset)
+    args: Tuple[Any, ...] = (nb_field, plan, checks, checks_field)
+
+    def write(
+        batch_result: List[Tuple[Item, bool, Optional[str], Dict[str, bool]]],
+    ) -> None:
+        for out, changed, reason, results in batch_result:
+            if reason is not None:
+                result.errors[result.offset] = reason
+            result.cleaned += changed
+            result.failed.update(name for name, passed in results.items() if not passed)
+            result.offset += 1
+        result.records += len(batch_result)
+        writer.write([out for out, *_ in batch_result], result.offset)
+
+    try:
+        if workers <= 0:
+            for batch in _batches(items, batch_size):
+                write(_process_batch(batch, *args))
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                pending: Deque[Any] = deque()
+                for batch in _batches(items, batch_size):
+                    pending.append(pool.apply_async(_process_batch, (batch, *args)))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().get())
+                while pending:
+                    write(pending.popleft().get())
+    finally:
+        writer.close()
+    return result
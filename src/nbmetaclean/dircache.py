@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .archive import is_archive
+from .nb_types import PathOrStr
+
+
+__all__ = [
+    "DirCache",
+    "RACY_WINDOW_NS",
+    "list_dir",
+]
+
+# Listing taken less than this after directory change is not trusted:
+# directory can change again within mtime granularity of filesystem.
+RACY_WINDOW_NS = 2_000_000_000
+
+Listing = Tuple[List[str], List[str]]
+
+
+def list_dir(path: PathOrStr) -> Listing:
+    """List directory: names of notebooks and archives, names of subdirectories."""
+    files: List[str] = []
+    dirs: List[str] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.is_file() and (
+                entry.name.endswith(".ipynb") or is_archive(entry.name)
+            ):
+                files.append(entry.name)
+    return files, dirs
+
+
+class DirCache:
+    """On-disk cache of directories listings, keyed by directory mtime.
+    Directory is listed again only if its mtime changed, or listing was taken
+    too close to the last change (coarse mtime filesystems).
+
+    Args:
+        path (Union[Path, str]): Cache file.
+    """
+
+    def __init__(self, path: PathOrStr) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def listing(self, path: PathOrStr) -> Listing:
+        """Return listing for directory, from cache if directory not changed."""
+        key = os.path.abspath(path)
+        mtime_ns = os.stat(key).st_mtime_ns
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry[0] == mtime_ns
+            and entry[1] - mtime_ns > RACY_WINDOW_NS
+        ):
+            self.hits += 1
+            return entry[2], entry[3]
+        self.misses += 1
+        listed_at = time.time_ns()
+        files, dirs = list_dir(key)
+        self.entries[key] = [mtime_ns, listed_at, files, dirs]
+        self._dirty = True
+        return files, dirs
+
+    def save(self) -> None:
+        """Write cache file if changed."""
+        if not self._dirty:
+            return
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .clean import CleanConfig, compile_config, is_clean
+from .nb_types import Nb, PathOrStr
+from .reader import READ_NOT_FOUND, READ_NOT_NOTEBOOK, parse_nb
+
+
+__all__ = [
+    "GitBlobReader",
+    "HistoryResult",
+    "history_pathspec",
+    "iter_nb_changes",
+    "scan_history",
+]
+
+NULL_SHA = "0" * 40
+
+NbCheck = Callable[[Nb], bool]
+
+
+@dataclass
+class HistoryResult:
+    """Result of checks for notebook blob introduced at commit.
+
+    Args:
+        commit (str): Commit sha.
+        path (str): Notebook path at commit.
+        blob (str): Blob sha.
+        failed (tuple[str, ...]): Names of failed checks, "read_error" if blob is not valid notebook.
+        reason (Optional[str]): Read failure reason, like "invalid json" or "not a notebook".
+    """
+
+    commit: str
+    path: str
+    blob: str
+    failed: Tuple[str, ...]
+    reason: Optional[str] = None
+
+
+class GitBlobReader:
+    """Read blobs from git repository through one long-lived `git cat-file --batch` process."""
+
+    def __init__(self, repo: Optional[PathOrStr] = None) -> None:
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=repo,
+        )
+
+    def read(self, sha: str) -> Optional[bytes]:
+        """Return blob content or None if blob is missing."""
+        stdin: IO[bytes] = self.process.stdin  # type: ignore
+        stdout: IO[bytes] = self.process.stdout  # type: ignore
+        stdin.write(f"{sha}\n".encode())
+        stdin.flush()
+        header = stdout.readline().split()
+        if len(header) != 3:  # "<sha> missing"
+            return None
+        data = stdout.read(int(header[2]))
+        stdout.read(1)  # trailing newline
+        return data
+
+    def close(self) -> None:
+        if self.process.stdin:
+            self.process.stdin.close()
+        if self.process.stdout:
+            self.process.stdout.close()
+        self.process.wait()
+
+    def __enter__(self) -> GitBlobReader:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _iter_nul_split(stream: IO[bytes], chunk_size: int = 2**16) -> Iterator[bytes]:
+    """Iterate over NUL terminated items from stream."""
+    rest = b""
+    while chunk := stream.read(chunk_size):
+        *items, rest = (rest + chunk).split(b"\0")
+        yield from items
+    if rest:
+        yield rest
+
+
+def iter_nb_changes(
+    rev_range: str,
+    pathspec: Optional[List[str]] = None,
+    repo: Optional[PathOrStr] = None,
+) -> Iterator[tuple[str, str, str]]:
+    """Iterate over notebooks added or changed at commits from `rev_range`.
+    Use one `git log --raw -z` process, deleted notebooks are skipped.
+    Paths are NUL terminated, so not quoted, any file names are supported,
+    not utf-8 names decoded by `os.fsdecode`.
+
+    Args:
+        rev_range (str): Commit range, like `main..HEAD` or `HEAD~10..`.
+        pathspec (Optional[List[str]]): Git pathspec to filter notebooks. Defaults to `*.ipynb`.
+        repo (Optional[PathOrStr]): Path to repository. Defaults to current directory.
+
+    Yields:
+        tuple[str, str, str]: Commit sha, notebook path, blob sha.
+    """
+    process = subprocess.Popen(
+        [
+            "git",
+            "log",
+            "--raw",
+            "--no-abbrev",
+            "--no-renames",
+            "-z",
+            "--format=%H",
+            rev_range,
+            "--",
+            *(pathspec or ["*.ipynb"]),
+        ],
+        stdout=subprocess.PIPE,
+        cwd=repo,
+    )
+    # items: commit sha, then pairs of `:<modes> <shas> <status>` and path
+    commit = ""
+    info = ""
+    for item in _iter_nul_split(process.stdout):  # type: ignore[arg-type]
+        text = os.fsdecode(item)  # not utf-8 names kept as at file system
+        if info:
+            blob = info.split()[3]
+            if blob != NULL_SHA and text.endswith(".ipynb"):
+                yield commit, text, blob
+            info = ""
+            continue
+        text = text.lstrip("\n")
+        if text.startswith(":"):
+            info = text
+        elif text:
+            commit = text
+    if process.wait():
+        raise RuntimeError(f"git log failed for {rev_range}")
+
+
+def _not_clean(cfg: CleanConfig) -> NbCheck:
+    plan = compile_config(cfg)
+
+    def check(nb: Nb) -> bool:
+        return is_clean(nb, plan)
+
+    return check
+
+
+def scan_history(
+    rev_range: str,
+    checks: Dict[str, NbCheck],
+    clean_cfg: Optional[CleanConfig] = None,
+    pathspec: Optional[List[str]] = None,
+    repo: Optional[PathOrStr] = None,
+) -> list[HistoryResult]:
+    """Check notebooks introduced at commits from `rev_range`.
+    Each unique blob is read and checked once.
+
+    Args:
+        rev_range (str): Commit range, like `main..HEAD` or `HEAD~10..`.
+        checks (Dict[str, Callable[[Nb], bool]]): Checks by name, check return True if notebook is correct.
+        clean_cfg (Optional[CleanConfig]): If set, add dry-run clean as "not_clean" check.
+        pathspec (Optional[List[str]]): Git pathspec to filter notebooks. Defaults to `*.ipynb`.
+        repo (Optional[PathOrStr]): Path to repository. Defaults to current directory.
+
+    Returns:
+        list[HistoryResult]: Results for every notebook change, from newest commit.
+    """
+    checks = dict(checks)
+    if clean_cfg is not None:
+        checks["not_clean"] = _not_clean(clean_cfg)
+    verdicts: Dict[str, Tuple[Tuple[str, ...], Optional[str]]] = {}
+    results: list[HistoryResult] = []
+    with GitBlobReader(repo) as reader:
+        for commit, path, blob in iter_nb_changes(rev_range, pathspec, repo):
+            if blob not in verdicts:
+                verdicts[blob] = _check_blob(reader.read(blob), checks)
+            results.append(HistoryResult(commit, path, blob, *verdicts[blob]))
+    return results
+
+
+def _check_blob(
+    data: Optional[bytes], checks: Dict[str, NbCheck]
+) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """Return failed checks and read failure reason."""
+    if data is None:
+        return ("read_error",), READ_NOT_FOUND
+    nb, reason = parse_nb(data)
+    if nb is None:
+        return ("read_error",), reason
+    try:
+        return tuple(name for name, check in checks.items() if not check(nb)), None
+    except Exception:  # not valid notebook structure
+        return ("read_error",), READ_NOT_NOTEBOOK
+
+
+def history_pathspec(paths: List[str]) -> List[str]:
+    """Convert paths to git pathspec for notebooks."""
+    return [
+        path if path.endswith(".ipynb") else f"{Path(path).as_posix()}/*.ipynb"
+        for path in paths
+    ]
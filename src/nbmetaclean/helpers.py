@@ -2,37 +2,93 @@ from __future__ import annotations
 
 import json
 import os
+import sys
+import time
+from importlib import metadata
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Iterable, Iterator, Optional
 
+from .archive import (
+    is_archive,
+    read_archive_member_bytes,
+    split_archive_path,
+    write_archive_member,
+)
+from .dircache import DirCache, list_dir
 from .nb_types import Nb, PathOrStr
+from .reader import READ_NOT_FOUND, READ_OS_ERROR, ReadResult, parse_nb, read_nb_file
 
 __all__ = [
     "get_nb_names",
     "get_nb_names_from_list",
     "is_notebook",
+    "iter_nb_names_from_list",
+    "load_entry_point",
+    "plugin_id",
+    "NbNamesStream",
+    "nb_to_json",
     "read_nb",
+    "read_nb_with_reason",
+    "read_paths",
+    "read_paths_from",
     "write_nb",
+    "write_nb_json",
 ]
 
 
 def read_nb(path: PathOrStr) -> Nb | None:
     """Read notebook from filename.
     If file does not exist or is not a valid notebook, return None.
+    Path can point to notebook inside zip or tar archive, like `bundle.zip/nb.ipynb`.
     Args:
         path (Union[str, PosixPath): Notebook filename.
 
     Returns:
         Notebook Union[None, Notebook]: Jupyter Notebook as dict or None if not valid or does not exist.
     """
-    nb_path = Path(path)
-    if not nb_path.exists() or not nb_path.is_file():
-        return None
+    return read_nb_with_reason(path).nb
+
+
+def read_nb_with_reason(path: PathOrStr) -> ReadResult:
+    """Read notebook from filename, return notebook or failure reason:
+    "not found", "permission denied", "is a directory", "os error",
+    "not utf-8", "invalid json" or "not a notebook".
+    File opened once and always closed.
+    Path can point to notebook inside zip or tar archive, like `bundle.zip/nb.ipynb`.
+
+    Args:
+        path (Union[str, PosixPath): Notebook filename.
+
+    Returns:
+        ReadResult: Notebook and None or None and failure reason.
+    """
+    result = read_nb_file(path)
+    if result.reason != READ_NOT_FOUND:
+        return result
+    archive_path = split_archive_path(Path(path))
+    if archive_path is None:
+        return result
     try:
-        nb = json.load(open(nb_path, "r", encoding="utf-8"))
-        return nb
+        data = read_archive_member_bytes(*archive_path)
     except Exception:
-        return None
+        return ReadResult(None, READ_OS_ERROR)
+    if data is None:
+        return result
+    return parse_nb(data)
+
+
+def nb_to_json(nb: Nb) -> str:
+    """Serialize notebook to json string, same format as Jupyter use."""
+    return (
+        json.dumps(
+            nb,
+            indent=1,
+            separators=(",", ": "),
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        + "\n"
+    )
 
 
 def write_nb(
@@ -41,6 +97,7 @@ def write_nb(
     timestamp: Optional[tuple[float, float]] = None,
 ) -> Path:
     """Write notebook to file, optionally set timestamp.
+    Path can point to existing notebook inside zip or tar archive, like `bundle.zip/nb.ipynb`.
 
     Args:
         nb (Notebook): Notebook to write
@@ -49,20 +106,35 @@ def write_nb(
     Returns:
         Path: Filename of written notebook.
     """
+    return write_nb_json(nb_to_json(nb), path, timestamp)
+
+
+def write_nb_json(
+    text: str,
+    path: PathOrStr,
+    timestamp: Optional[tuple[float, float]] = None,
+) -> Path:
+    """Write notebook serialized by `nb_to_json` to file, optionally set timestamp.
+    Same as `write_nb`, for callers that serialize notebook themselves.
+
+    Args:
+        text (str): Serialized notebook.
+        path (Union[str, PosixPath]): filename to write
+        timestamp (Optional[tuple[float, float]]): timestamp to set, (st_atime, st_mtime) defaults to None
+    Returns:
+        Path: Filename of written notebook.
+    """
     filename = Path(path)
     if filename.suffix != ".ipynb":
         filename = filename.with_suffix(".ipynb")
+    if not filename.parent.is_dir():
+        archive_path = split_archive_path(filename)
+        if archive_path is not None:
+            if not write_archive_member(*archive_path, text.encode("utf-8")):
+                raise FileNotFoundError(f"{filename} not exists!")
+            return filename
     with filename.open("w", encoding="utf-8") as fh:
-        fh.write(
-            json.dumps(
-                nb,
-                indent=1,
-                separators=(",", ": "),
-                ensure_ascii=False,
-                sort_keys=True,
-            )
-            + "\n",
-        )
+        fh.write(text)
     if timestamp is not None:
         os.utime(filename, timestamp)
     return filename
@@ -85,17 +157,46 @@ def is_notebook(path: Path, hidden: bool = False) -> bool:
     return False
 
 
+def _file_id(path: Path) -> Optional[tuple[int, int]]:
+    """Return (device, inode) for path, symlinks followed. None if stat failed."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _is_new(path: Path, seen: set[tuple[int, int]]) -> bool:
+    """Check that file or dir not seen before, add to `seen`."""
+    file_id = _file_id(path)
+    if file_id is None:
+        return True
+    if file_id in seen:
+        return False
+    seen.add(file_id)
+    return True
+
+
 def get_nb_names(
     path: Optional[PathOrStr] = None,
     recursive: bool = True,
     hidden: bool = False,
+    archives: bool = False,
+    cache: Optional[DirCache] = None,
+    seen: Optional[set[tuple[int, int]]] = None,
 ) -> list[Path]:
     """Return list of notebooks from `path`. If no `path` return notebooks from current folder.
+    Every notebook and directory returned or visited once, by (device, inode),
+    so hardlinks, symlinks and symlink cycles do not produce duplicates.
 
     Args:
         path (Union[Path, str, None]): Path for nb or folder with notebooks.
         recursive bool: Recursive search.
         hidden bool: Skip or not hidden paths, defaults to False.
+        archives bool: Add zip and tar archives to result, defaults to False.
+        cache (Optional[DirCache]): Directories listings cache, defaults to None.
+        seen (Optional[set[tuple[int, int]]]): (device, inode) of visited notebooks and dirs,
+            shared between calls to skip already found. Defaults to None.
 
     Raises:
         sys.exit: If filename or dir not exists or not nb file.
@@ -104,25 +205,40 @@ def get_nb_names(
         List[Path]: List of notebooks names.
     """
     nb_path = Path(path or ".")
+    seen = seen if seen is not None else set()
 
     if not nb_path.exists():
         raise FileNotFoundError(f"{nb_path} not exists!")
 
     if nb_path.is_file():
-        if is_notebook(nb_path, hidden):
+        if (
+            is_notebook(nb_path, hidden) or (archives and is_archive(nb_path))
+        ) and _is_new(nb_path, seen):
             return [nb_path]
 
     if nb_path.is_dir():
+        if not _is_new(nb_path, seen):
+            return []
         result = []
-        for item in nb_path.iterdir():
-            if item.is_file() and is_notebook(item, hidden):
+        files, dirs = cache.listing(nb_path) if cache is not None else list_dir(nb_path)
+        for name in files:
+            item = nb_path / name
+            if (
+                is_notebook(item, hidden)
+                or (archives and is_archive(item) and not name.startswith("."))
+            ) and _is_new(item, seen):
                 result.append(item)
-            if item.is_dir() and recursive:
-                if item.name.startswith(".") and not hidden:
+        if recursive:
+            for name in dirs:
+                if name.startswith(".") and not hidden:
                     continue
-                if "checkpoint" in item.name:
+                if "checkpoint" in name:
                     continue
-                result.extend(get_nb_names(item, recursive, hidden))
+                result.extend(
+                    get_nb_names(
+                        nb_path / name, recursive, hidden, archives, cache, seen
+                    )
+                )
 
         return result
 
@@ -133,23 +249,154 @@ def get_nb_names_from_list(
     path_list: list[PathOrStr] | PathOrStr,
     recursive: bool = True,
     hidden: bool = False,
+    archives: bool = False,
+    cache: Optional[DirCache] = None,
 ) -> list[Path]:
     """Return list of notebooks from `path_list`.
+    Notebooks found at several paths (overlapping paths, links) returned once.
 
     Args:
         path_list (Union[Path, str, None]): Path for nb or folder with notebooks.
         recursive (bool): Recursive search.
         hidden (bool): Skip or not hidden paths, defaults to False.
+        archives (bool): Add zip and tar archives to result, defaults to False.
+        cache (Optional[DirCache]): Directories listings cache, defaults to None.
 
     Returns:
         List[Path]: List of notebooks names.
     """
     path_list = [path_list] if isinstance(path_list, (str, Path)) else path_list
-    nb_files: list[Path] = []
+    return list(iter_nb_names_from_list(path_list, recursive, hidden, archives, cache))
+
+
+def iter_nb_names_from_list(
+    path_list: Iterable[PathOrStr],
+    recursive: bool = True,
+    hidden: bool = False,
+    archives: bool = False,
+    cache: Optional[DirCache] = None,
+) -> Iterator[Path]:
+    """Yield notebooks from `path_list`, path by path, paths read as needed.
+    Same as `get_nb_names_from_list`, for long streamed lists of paths.
+    """
+    seen: set[tuple[int, int]] = set()
     for path in path_list:
         if Path(path).exists():
-            nb_files.extend(get_nb_names(path, recursive, hidden))
+            yield from get_nb_names(path, recursive, hidden, archives, cache, seen)
         else:
             print(f"{path} not exists!")
 
-    return nb_files
+
+class NbNamesStream:
+    """Iterator over notebooks from streamed paths, notebooks found while iterated.
+
+    Args:
+        path_list (Iterable[Union[Path, str]]): Paths for nb or folder with notebooks.
+        hidden (bool): Skip or not hidden paths, defaults to False.
+        archives (bool): Add zip and tar archives to result, defaults to False.
+        cache (Optional[DirCache]): Directories listings cache, defaults to None.
+
+    Attributes:
+        count (int): Notebooks returned so far.
+        seconds (float): Time spent to find notebooks.
+    """
+
+    def __init__(
+        self,
+        path_list: Iterable[PathOrStr],
+        hidden: bool = False,
+        archives: bool = False,
+        cache: Optional[DirCache] = None,
+    ) -> None:
+        self._names = iter_nb_names_from_list(
+            path_list, hidden=hidden, archives=archives, cache=cache
+        )
+        self.count = 0
+        self.seconds = 0.0
+
+    def __iter__(self) -> NbNamesStream:
+        return self
+
+    def __next__(self) -> Path:
+        start = time.perf_counter()
+        try:
+            name = next(self._names)
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.count += 1
+        return name
+
+
+def read_paths(stream: IO[bytes], chunk_size: int = 2**16) -> Iterator[str]:
+    """Read paths from binary stream chunk by chunk, yield them as read.
+    Paths are NUL separated (`find -print0`, `git ls-files -z`) if NUL read before
+    or together with first newline, otherwise newline separated. Empty paths are skipped.
+    """
+    sep = None
+    buffer = b""
+    while chunk := stream.read(chunk_size):
+        buffer += chunk
+        if sep is None:
+            if b"\0" in buffer:
+                sep = b"\0"
+            elif b"\n" in buffer:
+                sep = b"\n"
+            else:
+                continue
+        *items, buffer = buffer.split(sep)
+        for item in items:
+            if sep == b"\n":
+                item = item.rstrip(b"\r")
+            if item:
+                yield os.fsdecode(item)
+    if sep == b"\n":
+        buffer = buffer.rstrip(b"\r")
+    if buffer:
+        yield os.fsdecode(buffer)
+
+
+def read_paths_from(name: str) -> Iterator[str]:
+    """Read paths from file, `-` for stdin, see `read_paths`."""
+    if name == "-":
+        yield from read_paths(sys.stdin.buffer)
+        return
+    with open(name, "rb") as fh:
+        yield from read_paths(fh)
+
+
+def load_entry_point(group: str, name: str) -> Any:
+    """Load object registered at entry points `group` with `name`.
+
+    Raises:
+        KeyError: If entry point not found.
+    """
+    entry_points = metadata.entry_points()
+    selected: Iterable[metadata.EntryPoint]
+    if hasattr(entry_points, "select"):
+        selected = entry_points.select(group=group, name=name)
+    else:  # python < 3.10
+        selected = [ep for ep in entry_points.get(group, []) if ep.name == name]
+    for entry_point in selected:
+        return entry_point.load()
+    raise KeyError(f"{name} not found at {group} entry points!")
+
+
+def _module_version(module: str) -> str:
+    top = module.split(".")[0]
+    packages = (
+        metadata.packages_distributions()
+        if hasattr(metadata, "packages_distributions")
+        else {}  # python < 3.10
+    )
+    for dist in packages.get(top) or [top]:
+        try:
+            return metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            continue
+    return str(getattr(sys.modules.get(top), "__version__", "unknown"))
+
+
+def plugin_id(plugin: Any) -> str:
+    """Qualified name and version of distribution of plugin class, like `pkg.checks.MyCheck==1.0`.
+    Version is `__version__` of top package or `unknown` if package is not installed."""
+    return f"{plugin.__module__}.{plugin.__qualname__}=={_module_version(plugin.__module__)}"
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .helpers import read_nb
+from .nb_types import Nb, PathOrStr
+
+
+__all__ = [
+    "DEFAULT_INDEX",
+    "load_index",
+    "nb_record",
+    "query",
+    "refresh_index",
+    "save_index",
+    "summary",
+]
+
+DEFAULT_INDEX = ".nbindex.jsonl"
+
+Record = Dict[str, Any]
+
+
+def _text_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, list):
+        return sum(_text_size(item) for item in value)
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def nb_record(nb: Nb) -> Record:
+    """Return inventory record for notebook: cell counts by type, output bytes by mime type,
+    execution_count state and metadata keys.
+    execution_count state is "none" if no code cells executed, "all" if all executed,
+    "partial" otherwise.
+    """
+    cells: Counter[str] = Counter()
+    output_bytes: Counter[str] = Counter()
+    executed = not_executed = 0
+    for cell in nb["cells"]:
+        cells[cell["cell_type"]] += 1
+        if cell["cell_type"] != "code":
+            continue
+        if cell.get("execution_count"):
+            executed += 1
+        elif cell["source"]:
+            not_executed += 1
+        for output in cell.get("outputs") or []:  # type: ignore
+            if output["output_type"] == "stream":
+                output_bytes["stream"] += _text_size(output.get("text", ""))
+            elif output["output_type"] == "error":
+                output_bytes["error"] += _text_size(output.get("traceback", []))
+            else:
+                for mime, value in (output.get("data") or {}).items():
+                    output_bytes[mime] += _text_size(value)
+    if not executed:
+        ec_state = "none"
+    elif not not_executed:
+        ec_state = "all"
+    else:
+        ec_state = "partial"
+    metadata = nb.get("metadata") or {}
+    kernelspec = metadata.get("kernelspec") or {}
+    return {
+        "nbformat": nb.get("nbformat"),
+        "cells": dict(cells),
+        "output_bytes": dict(output_bytes),
+        "execution_count": ec_state,
+        "metadata_keys": sorted(metadata),
+        "kernelspec": kernelspec.get("name") if isinstance(kernelspec, dict) else None,
+    }
+
+
+def load_index(index_path: PathOrStr) -> Dict[str, Record]:
+    """Load index from JSONL file, return records by path. Empty if file not exists."""
+    records: Dict[str, Record] = {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["path"]] = record
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def save_index(records: Dict[str, Record], index_path: PathOrStr) -> None:
+    """Write index to JSONL file, replace file atomically."""
+    index_file = Path(index_path)
+    tmp_path = index_file.with_name(f".{index_file.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        for path in sorted(records):
+            fh.write(json.dumps(records[path], ensure_ascii=False) + "\n")
+    os.replace(tmp_path, index_file)
+
+
+def _under(path: Path, roots: List[Path]) -> bool:
+    return any(path == root or root in path.parents for root in roots)
+
+
+def refresh_index(
+    nb_files: Iterable[Path],
+    records: Dict[str, Record],
+    roots: Optional[Iterable[PathOrStr]] = None,
+) -> tuple[Dict[str, Record], int]:
+    """Refresh index for notebooks, parse only notebooks with changed stat.
+    Records under refreshed `roots` for notebooks not at `nb_files` are dropped,
+    other records are kept while their notebooks exist.
+
+    Args:
+        nb_files (Iterable[Path]): Notebooks to index.
+        records (Dict[str, Record]): Current index.
+        roots (Optional[Iterable[Union[Path, str]]]): Refreshed paths, `nb_files` found at them.
+            Defaults to None - only records of removed notebooks are dropped.
+
+    Returns:
+        tuple[Dict[str, Record], int]: New index, number of parsed notebooks.
+    """
+    root_list = [Path(root) for root in roots or []]
+    new_records: Dict[str, Record] = {
+        path: record
+        for path, record in records.items()
+        if not _under(Path(path), root_list) and Path(path).exists()
+    }
+    parsed = 0
+    for nb_path in nb_files:
+        path = nb_path.as_posix()
+        try:
+            stat = nb_path.stat()
+        except OSError:
+            continue
+        record = records.get(path)
+        if (
+            record is not None
+            and record["size"] == stat.st_size
+            and record["mtime_ns"] == stat.st_mtime_ns
+        ):
+            new_records[path] = record
+            continue
+        nb = read_nb(nb_path)
+        parsed += 1
+        record = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if nb is None:
+            record["error"] = "read error"
+        else:
+            try:
+                record.update(nb_record(nb))
+            except (KeyError, TypeError, AttributeError):
+                record["error"] = "not valid notebook"
+        new_records[path] = record
+    return new_records, parsed
+
+
+def summary(records: Iterable[Record], by: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregate index records.
+
+    Args:
+        records (Iterable[Record]): Index records.
+        by (Optional[str]): Group by "dir", "kernel" or "ec", if None only totals.
+
+    Returns:
+        Dict[str, Any]: Totals: notebooks, size, cells by type, output bytes by mime,
+            and groups with notebooks, size and output bytes for every group.
+    """
+    totals: Dict[str, Any] = {
+        "notebooks": 0,
+        "errors": 0,
+        "size": 0,
+        "cells": Counter(),
+        "output_bytes": Counter(),
+    }
+    groups: Dict[str, Counter[str]] = {}
+    for record in records:
+        totals["notebooks"] += 1
+        totals["size"] += record["size"]
+        if "error" in record:
+            totals["errors"] += 1
+            continue
+        totals["cells"].update(record["cells"])
+        totals["output_bytes"].update(record["output_bytes"])
+        if by is not None:
+            key = _group_key(record, by)
+            group = groups.setdefault(key, Counter())
+            group["notebooks"] += 1
+            group["size"] += record["size"]
+            group["output_bytes"] += sum(record["output_bytes"].values())
+    totals["cells"] = dict(totals["cells"])
+    totals["output_bytes"] = dict(totals["output_bytes"])
+    if by is not None:
+        totals["groups"] = {key: dict(groups[key]) for key in sorted(groups)}
+    return totals
+
+
+def _group_key(record: Record, by: str) -> str:
+    if by == "dir":
+        return Path(record["path"]).parent.as_posix()
+    if by == "kernel":
+        return str(record.get("kernelspec"))
+    if by == "ec":
+        return record["execution_count"]
+    raise ValueError(f"Unknown group: {by}")
+
+
+def query(
+    records: Iterable[Record],
+    kernel: Optional[str] = None,
+    metadata_key: Optional[str] = None,
+    ec: Optional[str] = None,
+    min_output_bytes: Optional[int] = None,
+) -> List[Record]:
+    """Return records matching all given conditions."""
+    result = []
+    for record in records:
+        if "error" in record:
+            continue
+        if kernel is not None and record.get("kernelspec") != kernel:
+            continue
+        if metadata_key is not None and metadata_key not in record["metadata_keys"]:
+            continue
+        if ec is not None and record["execution_count"] != ec:
+            continue
+        if (
+            min_output_bytes is not None
+            and sum(record["output_bytes"].values()) < min_output_bytes
+        ):
+            continue
+        result.append(record)
+    return result
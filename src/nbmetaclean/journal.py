@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .nb_types import PathOrStr
+
+
+__all__ = [
+    "Journal",
+    "JournalEntry",
+    "file_stat",
+    "load_journal",
+]
+
+FileStat = Tuple[int, int, int]
+
+
+def file_stat(path: PathOrStr) -> Optional[FileStat]:
+    """Size, mtime and inode of file, None if file can not be stat."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class JournalEntry(NamedTuple):
+    """Outcome of processed notebook (or archive) and its stat after processing.
+
+    Args:
+        stat (Optional[FileStat]): Size, mtime and inode after processing.
+        cleaned (List[str]): Cleaned notebooks, archive members for archive.
+        errors (Dict[str, str]): Failure reason by notebook.
+        skipped (List[str]): Skipped notebooks.
+    """
+
+    stat: Optional[FileStat]
+    cleaned: List[str]
+    errors: Dict[str, str]
+    skipped: List[str]
+
+
+def load_journal(
+    path: PathOrStr,
+) -> Tuple[Optional[str], Dict[str, JournalEntry], int]:
+    """Load journal: config key from header line, entries by path, last one wins,
+    and size of complete lines. Incomplete line of interrupted write is ignored.
+    """
+    config = None
+    entries: Dict[str, JournalEntry] = {}
+    size = 0
+    try:
+        with open(path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                size += len(line)
+                if "config" in record:
+                    config = record["config"]
+                    continue
+                stat = record["stat"]
+                entries[record["path"]] = JournalEntry(
+                    tuple(stat) if stat is not None else None,  # type: ignore[arg-type]
+                    record["cleaned"],
+                    record["errors"],
+                    record["skipped"],
+                )
+    except OSError:
+        pass
+    return config, entries, size
+
+
+class Journal:
+    """Append-only journal of processed notebooks: path, stat after processing and outcome.
+    Every entry is one json line, flushed at once, so entries survive interrupted run.
+    First line holds config key, journal for other config is not resumed.
+
+    Args:
+        path (Union[Path, str]): Journal file.
+        config (str): Key of run config.
+        resume (bool): Keep entries of previous run with same config,
+            if False journal is started again. Defaults to False.
+    """
+
+    def __init__(self, path: PathOrStr, config: str, resume: bool = False) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, JournalEntry] = {}
+        size = 0
+        if resume:
+            journal_config, entries, size = load_journal(self.path)
+            if journal_config == config:
+                self.entries = entries
+            else:
+                size = 0
+        self.fh = open(self.path, "r+b" if size else "wb")
+        self.fh.truncate(size)
+        self.fh.seek(size)
+        if not size:
+            self._write({"config": config})
+
+    def _write(self, record: dict) -> None:
+        self.fh.write(json.dumps(record).encode("utf-8") + b"\n")
+        self.fh.flush()
+
+    def done(self, path: Path) -> Optional[JournalEntry]:
+        """Entry for notebook if it is journaled and not changed since."""
+        entry = self.entries.get(str(path))
+        if entry is None or entry.stat is None or entry.stat != file_stat(path):
+            return None
+        return entry
+
+    def add(
+        self,
+        path: Path,
+        cleaned: List[Path],
+        errors: Dict[Path, str],
+        skipped: List[Path],
+    ) -> None:
+        """Journal outcome of processed notebook with its current stat."""
+        self._write(
+            {
+                "path": str(path),
+                "stat": file_stat(path),
+                "cleaned": [str(nb) for nb in cleaned],
+                "errors": {str(nb): reason for nb, reason in errors.items()},
+                "skipped": [str(nb) for nb in skipped],
+            }
+        )
+
+    def close(self) -> None:
+        self.fh.close()
@@ -0,0 +1,48 @@
+"""Jupyter server `ContentsManager.pre_save_hook`, clean notebook model before it saved.
+
+At `jupyter_server_config.py`:
+
+    c.FileContentsManager.pre_save_hook = "nbmetaclean.jupyter_hook.pre_save_hook"
+
+or with custom config:
+
+    from nbmetaclean import CleanConfig
+    from nbmetaclean.jupyter_hook import make_pre_save_hook
+
+    c.FileContentsManager.pre_save_hook = make_pre_save_hook(CleanConfig(clear_outputs=True))
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from .clean import CleanConfig, clean_nb_model, compile_config
+
+
+__all__ = [
+    "make_pre_save_hook",
+    "pre_save_hook",
+]
+
+PreSaveHook = Callable[..., None]
+
+
+def make_pre_save_hook(cfg: Optional[CleanConfig] = None) -> PreSaveHook:
+    """Return pre-save hook, cleaning notebooks in memory with given config.
+    Config compiled once, when hook created.
+
+    Args:
+        cfg (Optional[CleanConfig]): Config for cleaning, if None default config.
+
+    Returns:
+        PreSaveHook: Hook, called by contents manager as `hook(model=model, path=path, contents_manager=cm)`.
+    """
+    plan = compile_config(cfg or CleanConfig())
+
+    def hook(model: dict[str, Any], **kwargs: Any) -> None:
+        clean_nb_model(model, plan)
+
+    return hook
+
+
+pre_save_hook = make_pre_save_hook()
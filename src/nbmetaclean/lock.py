@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .nb_types import PathOrStr
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover  # windows, locking not supported
+    fcntl = None  # type: ignore
+
+
+__all__ = ["nb_lock"]
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+@contextmanager
+def nb_lock(path: PathOrStr, timeout: Optional[float] = None) -> Iterator[bool]:
+    """Hold exclusive advisory lock (fcntl `flock`) on file.
+    Yields True if lock acquired, False if file still locked after `timeout`.
+    If file can not be opened or locking is not supported, yields True without lock.
+
+    Args:
+        path (Union[Path, str]): File to lock.
+        timeout (Optional[float]): Seconds to wait for lock, None - wait forever,
+            0 - do not wait. Defaults to None.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield True
+        return
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        yield True
+        return
+    with fh:
+        if timeout is None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        else:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
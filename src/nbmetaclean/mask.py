@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import fnmatch
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+
+from .nb_types import Metadata
+
+
+__all__ = [
+    "MaskMatcher",
+    "compile_masks",
+    "is_pattern",
+    "parse_mask",
+]
+
+TupleStr = Tuple[str, ...]
+
+MASK_ITEM_RE = re.compile(r"/(?:[^/\\]|\\.)+/|[^.]+")
+
+
+def is_pattern(item: str) -> bool:
+    """Check if mask item is a pattern: regex like `/^cell/` or glob like `jupytext*`."""
+    return is_regex(item) or any(char in item for char in "*?[")
+
+
+def is_regex(item: str) -> bool:
+    return len(item) > 2 and item.startswith("/") and item.endswith("/")
+
+
+def parse_mask(mask: str) -> TupleStr:
+    """Split dotted mask to path items. Dots inside regex items `/.../` are not separators.
+
+    Examples:
+        `language_info.name` -> ("language_info", "name")
+        `*.tags` -> ("*", "tags")
+        `/^a.b$/.c` -> ("/^a.b$/", "c")
+    """
+    return tuple(MASK_ITEM_RE.findall(mask))
+
+
+def _item_regex(item: str) -> str:
+    """Regex for mask item, to `search` key: regex item matches anywhere at key
+    (use `^...$` to anchor), glob item matches whole key."""
+    if is_regex(item):
+        return f"(?:{item[1:-1]})"
+    return rf"(?:\A{fnmatch.translate(item)})"
+
+
+class MaskMatcher:
+    """Preserve masks compiled to tree, one node per metadata path level.
+    Exact items are matched by dict lookup, all pattern items at level by one regex.
+    Result for every key is cached, so filtering cost one lookup per key.
+
+    Args:
+        masks (tuple[TupleStr, ...]): Preserve masks, items can be patterns.
+    """
+
+    def __init__(self, masks: Tuple[TupleStr, ...]) -> None:
+        self.masks = masks
+        self.keep_all = any(not mask for mask in masks)
+        self.exact: Dict[str, List[TupleStr]] = {}
+        self.patterns: List[Tuple[Pattern[str], List[TupleStr]]] = []
+        self.regex: Optional[Pattern[str]] = None
+        self._children: Dict[str, Optional[MaskMatcher]] = {}
+        if self.keep_all:
+            return
+        pattern_rests: Dict[str, List[TupleStr]] = {}
+        for mask in masks:
+            key, rest = mask[0], mask[1:]
+            target = pattern_rests if is_pattern(key) else self.exact
+            target.setdefault(key, []).append(rest)
+        self.patterns = [
+            (re.compile(_item_regex(item)), rests)
+            for item, rests in pattern_rests.items()
+        ]
+        if self.patterns:
+            self.regex = re.compile(
+                "|".join(_item_regex(item) for item in pattern_rests)
+            )
+
+    def child(self, key: str) -> Optional[MaskMatcher]:
+        """Return matcher for value at `key` or None if key not preserved."""
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        rests = list(self.exact.get(key, []))
+        if self.regex is not None and self.regex.search(key):
+            for pattern, pattern_rests in self.patterns:
+                if pattern.search(key):
+                    rests.extend(pattern_rests)
+        child = MaskMatcher(tuple(rests)) if rests else None
+        self._children[key] = child
+        return child
+
+    def filter(self, metadata: Metadata) -> Metadata:
+        """Return new metadata with preserved keys only. Input is not changed."""
+        if self.keep_all:
+            return metadata
+        return {
+            key: _filter_value(value, child)
+            for key, value in metadata.items()
+            if value is not None and (child := self.child(key)) is not None
+        }
+
+    def keeps(self, metadata: Metadata) -> bool:
+        """Check if `filter` returns metadata equal to input, without building it.
+        Stops at first key that would be dropped."""
+        if self.keep_all:
+            return True
+        for key, value in metadata.items():
+            if value is None or (child := self.child(key)) is None:
+                return False
+            if (
+                isinstance(value, dict)
+                and not child.keep_all
+                and not child.keeps(value)
+                and child.preserves_any(value)  # if nothing preserved value kept whole
+            ):
+                return False
+        return True
+
+    def preserves_any(self, metadata: Metadata) -> bool:
+        """Check if `filter` keeps any key of metadata."""
+        return self.keep_all or any(
+            value is not None and self.child(key) is not None
+            for key, value in metadata.items()
+        )
+
+    def __reduce__(self):  # type: ignore
+        return MaskMatcher, (self.masks,)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MaskMatcher) and self.masks == other.masks
+
+    def __hash__(self) -> int:
+        return hash(self.masks)
+
+
+def _filter_value(
+    value: Union[str, int, Metadata], matcher: MaskMatcher
+) -> Union[str, int, Metadata]:
+    """Filter nested value, if nothing preserved keep whole value."""
+    if matcher.keep_all or not isinstance(value, dict):
+        return value
+    return matcher.filter(value) or value
+
+
+@lru_cache(maxsize=64)
+def compile_masks(masks: Tuple[TupleStr, ...]) -> MaskMatcher:
+    """Compile masks to matcher, cached for same masks."""
+    return MaskMatcher(masks)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from .nb_types import PathOrStr
+
+
+__all__ = [
+    "DURATION_BUCKETS",
+    "Histogram",
+    "RunMetrics",
+]
+
+# seconds, upper bounds of histogram buckets
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+class Histogram:
+    """Histogram with fixed buckets: count per bucket, sum and count of observations."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for num, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[num] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Buckets as (`le` label, cumulative count), last one `+Inf`."""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((f"{bound:g}", total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    values = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return (
+        "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, values)) + "}"
+    )
+
+
+class RunMetrics:
+    """Metrics of run, written at end of run as Prometheus textfile,
+    for node exporter textfile collector.
+
+    Counters: notebooks by outcome (`scanned`, `cleaned`, `errored`, `skipped`),
+    bytes `read` and `written`, check failures by check.
+    Histograms: durations of phases (`discovery`, `parse`, `clean`, `serialise`, `write`,
+    `check`), discovery observed once per run, other phases once per notebook.
+
+    Args:
+        prefix (str): Metrics names prefix, like `nbmetaclean` or `nbcheck`.
+    """
+
+    def __init__(self, prefix: str = "nbmetaclean") -> None:
+        self.prefix = prefix
+        self.notebooks: Counter[str] = Counter()
+        self.bytes: Counter[str] = Counter()
+        self.check_failures: Counter[str] = Counter()
+        self.phases: Dict[str, Histogram] = {}
+        self.start = time.time()
+        self._start = time.perf_counter()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Add phase duration."""
+        if phase not in self.phases:
+            self.phases[phase] = Histogram()
+        self.phases[phase].observe(seconds)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time block as phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def to_text(self) -> str:
+        """Metrics in Prometheus text exposition format."""
+        name = self.prefix
+        lines = [
+            f"# HELP {name}_notebooks_total Notebooks by outcome.",
+            f"# TYPE {name}_notebooks_total counter",
+        ]
+        for outcome, num in sorted(self.notebooks.items()):
+            lines.append(f"{name}_notebooks_total{_labels(outcome=outcome)} {num}")
+        lines += [
+            f"# HELP {name}_bytes_total Bytes read and written.",
+            f"# TYPE {name}_bytes_total counter",
+        ]
+        for direction in ("read", "written"):
+            lines.append(
+                f"{name}_bytes_total{_labels(direction=direction)} {self.bytes[direction]}"
+            )
+        if self.check_failures:
+            lines += [
+                f"# HELP {name}_check_failures_total Failed notebooks by check.",
+                f"# TYPE {name}_check_failures_total counter",
+            ]
+            for check, num in sorted(self.check_failures.items()):
+                lines.append(f"{name}_check_failures_total{_labels(check=check)} {num}")
+        lines += [
+            f"# HELP {name}_phase_duration_seconds Duration of run phases.",
+            f"# TYPE {name}_phase_duration_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            for bound, count in histogram.cumulative():
+                lines.append(
+                    f"{name}_phase_duration_seconds_bucket{_labels(phase=phase, le=bound)} {count}"
+                )
+            lines.append(
+                f"{name}_phase_duration_seconds_sum{_labels(phase=phase)} {histogram.sum:.6f}"
+            )
+            lines.append(
+                f"{name}_phase_duration_seconds_count{_labels(phase=phase)} {histogram.count}"
+            )
+        lines += [
+            f"# HELP {name}_run_duration_seconds Duration of last run.",
+            f"# TYPE {name}_run_duration_seconds gauge",
+            f"{name}_run_duration_seconds {time.perf_counter() - self._start:.6f}",
+            f"# HELP {name}_last_run_timestamp_seconds Start time of last run.",
+            f"# TYPE {name}_last_run_timestamp_seconds gauge",
+            f"{name}_last_run_timestamp_seconds {self.start:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: PathOrStr) -> None:
+        """Write metrics to textfile, atomically: collector never reads partial file."""
+        filename = Path(path)
+        tmp_path = filename.with_name(f".{filename.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.to_text(), encoding="utf-8")
+        os.replace(tmp_path, filename)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+from .nb_types import PathOrStr
+
+
+__all__ = [
+    "LOG_INTERVAL",
+    "Progress",
+    "TTY_INTERVAL",
+    "file_size",
+    "format_duration",
+]
+
+TTY_INTERVAL = 0.2  # seconds between progress line redraws at terminal
+LOG_INTERVAL = 10.0  # seconds between progress log lines if not terminal
+
+
+def file_size(path: PathOrStr) -> int:
+    """File size, 0 if file can not be stat."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def format_duration(seconds: float) -> str:
+    """Seconds as `H:MM:SS`."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+class Progress:
+    """Progress of run: files done of total, notebooks per second, MB per second
+    read and written, ETA. At terminal line is redrawn inplace,
+    otherwise printed as log lines. Line is rendered not often than `interval`,
+    update is cheap. Updates are thread-safe.
+
+    Args:
+        total (Optional[int]): Files to process, None if not known (streamed files), no ETA.
+        stream (Optional[TextIO]): Output stream, if None - stderr.
+        interval (Optional[float]): Seconds between updates of output,
+            if None - `TTY_INTERVAL` at terminal, `LOG_INTERVAL` otherwise.
+        tty (Optional[bool]): Redraw line inplace, if None - if stream is terminal.
+    """
+
+    def __init__(
+        self,
+        total: Optional[int],
+        stream: Optional[TextIO] = None,
+        interval: Optional[float] = None,
+        tty: Optional[bool] = None,
+    ) -> None:
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty() if tty is None else tty
+        self.interval = (
+            interval
+            if interval is not None
+            else (TTY_INTERVAL if self.tty else LOG_INTERVAL)
+        )
+        self.done = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.start = time.monotonic()
+        self._shown = self.start
+        self._lock = threading.Lock()
+
+    def update(
+        self, files: int = 1, bytes_read: int = 0, bytes_written: int = 0
+    ) -> None:
+        """Add processed files and bytes, show progress if interval passed."""
+        with self._lock:
+            self.done += files
+            self.bytes_read += bytes_read
+            self.bytes_written += bytes_written
+            now = time.monotonic()
+            if now - self._shown >= self.interval:
+                self._shown = now
+                self._show(now)
+
+    def line(self, now: Optional[float] = None) -> str:
+        """Progress line."""
+        elapsed = max((now or time.monotonic()) - self.start, 1e-9)
+        rate = self.done / elapsed
+        done = f"{self.done}/{self.total}" if self.total is not None else self.done
+        line = (
+            f"{done} notebooks, {rate:.1f} nb/s, "
+            f"read {self.bytes_read / elapsed / 2**20:.1f} MB/s, "
+            f"written {self.bytes_written / elapsed / 2**20:.1f} MB/s"
+        )
+        if self.total is not None and self.done < self.total:
+            eta = format_duration((self.total - self.done) / rate) if rate else "-"
+            line += f", ETA {eta}"
+        else:
+            line += f", elapsed {format_duration(elapsed)}"
+        return line
+
+    def _show(self, now: float) -> None:
+        if self.tty:
+            self.stream.write(f"\r{self.line(now)}\x1b[K")
+        else:
+            self.stream.write(f"{self.line(now)}\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Show final progress line."""
+        with self._lock:
+            self._show(time.monotonic())
+            if self.tty:
+                self.stream.write("\n")
+                self.stream.flush()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from typing import NamedTuple, Optional, cast
+
+from .nb_types import Nb, PathOrStr
+
+
+__all__ = [
+    "READ_INVALID_JSON",
+    "READ_IS_DIR",
+    "READ_NOT_FOUND",
+    "READ_NOT_NOTEBOOK",
+    "READ_NOT_UTF8",
+    "READ_OS_ERROR",
+    "READ_PERMISSION",
+    "ReadResult",
+    "open_failure",
+    "parse_nb",
+    "read_bytes",
+    "read_nb_file",
+]
+
+READ_NOT_FOUND = "not found"
+READ_PERMISSION = "permission denied"
+READ_IS_DIR = "is a directory"
+READ_OS_ERROR = "os error"
+READ_NOT_UTF8 = "not utf-8"
+READ_INVALID_JSON = "invalid json"
+READ_NOT_NOTEBOOK = "not a notebook"
+
+
+class ReadResult(NamedTuple):
+    """Notebook and failure reason, one of them is None."""
+
+    nb: Optional[Nb]
+    reason: Optional[str]
+
+
+def _os_error_reason(ex: OSError) -> str:
+    if isinstance(ex, (FileNotFoundError, NotADirectoryError)):
+        return READ_NOT_FOUND
+    if isinstance(ex, PermissionError):
+        return READ_PERMISSION
+    if isinstance(ex, IsADirectoryError):
+        return READ_IS_DIR
+    return READ_OS_ERROR
+
+
+def open_failure(path: PathOrStr) -> Optional[str]:
+    """Check file can be opened for reading, without reading it.
+    Return failure reason or None."""
+    try:
+        with open(path, "rb"):
+            return None
+    except OSError as ex:
+        return _os_error_reason(ex)
+
+
+def read_bytes(path: PathOrStr) -> tuple[Optional[bytes], Optional[str]]:
+    """Read file content with one open, file always closed.
+    Return content and None or None and failure reason."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(), None
+    except OSError as ex:
+        return None, _os_error_reason(ex)
+
+
+def parse_nb(data: bytes) -> ReadResult:
+    """Decode and parse notebook, check it is a notebook: json object with list of cells."""
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return ReadResult(None, READ_NOT_UTF8)
+    return _parse_text(text)
+
+
+def _parse_text(text: str) -> ReadResult:
+    try:
+        nb = json.loads(text)
+    except ValueError:
+        return ReadResult(None, READ_INVALID_JSON)
+    if not isinstance(nb, dict) or not isinstance(nb.get("cells"), list):
+        return ReadResult(None, READ_NOT_NOTEBOOK)
+    return ReadResult(cast(Nb, nb), None)
+
+
+def read_nb_file(path: PathOrStr) -> ReadResult:
+    """Read notebook from file: one open, bytes decoded once, file always closed.
+    Content read as text, so raw bytes are released before parsing."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+    except UnicodeDecodeError:
+        return ReadResult(None, READ_NOT_UTF8)
+    except OSError as ex:
+        return ReadResult(None, _os_error_reason(ex))
+    return _parse_text(text)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import socketserver
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .clean import CleanConfig, CleanPlan, clean_nb_bytes, compile_config
+from .client import request
+from .version import __version__
+
+
+__all__ = [
+    "NbServer",
+    "config_from_dict",
+    "serve",
+]
+
+
+def config_from_dict(config: Dict[str, Any]) -> CleanConfig:
+    """Clean config from json dict: masks and transforms lists to tuples, paths to Path."""
+    config = dict(config)
+    for key in ("nb_metadata_preserve_mask", "cell_metadata_preserve_mask"):
+        if config.get(key) is not None:
+            config[key] = tuple(tuple(mask) for mask in config[key])
+    if config.get("transforms") is not None:
+        config["transforms"] = tuple(config["transforms"])
+    for key in ("store_path", "journal_path"):
+        if config.get(key) is not None:
+            config[key] = Path(config[key])
+    return CleanConfig(**config)
+
+
+def _apps() -> Dict[str, Callable[[Optional[List[str]]], None]]:
+    # imported at first run, apps import server module for `nbmetaclean server`.
+    from .app_check import app_check
+    from .app_clean import app_clean
+
+    return {"nbmetaclean": app_clean, "nbcheck": app_check}
+
+
+def run_app(app: str, argv: List[str], cwd: str) -> Dict[str, Any]:
+    """Run CLI in-process at directory `cwd`, return output and exit code."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    old_cwd = os.getcwd()
+    try:
+        os.chdir(cwd)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                _apps()[app](argv)
+            except SystemExit as ex:
+                if isinstance(ex.code, int) or ex.code is None:
+                    code = ex.code or 0
+                else:
+                    print(ex.code, file=stderr)
+                    code = 1
+            except Exception:
+                traceback.print_exc(file=stderr)
+                code = 1
+    finally:
+        os.chdir(old_cwd)
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "code": code}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: NbServer
+
+    def handle(self) -> None:
+        try:
+            message = json.loads(self.rfile.read())
+            response = self.server.dispatch(message)
+        except Exception as ex:
+            response = {"error": f"{type(ex).__name__}: {ex}"}
+        self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class NbServer(socketserver.UnixStreamServer):
+    """Server at Unix socket, keeps compiled configs and loaded checks warm.
+    Requests handled one at time: CLI runs change working directory and redirect output.
+
+    Requests, json objects:
+        {"cmd": "ping"} - server version.
+        {"cmd": "run", "app": "nbmetaclean" | "nbcheck", "argv": [...], "cwd": "..."} -
+            run CLI, response with stdout, stderr and exit code.
+        {"cmd": "clean", "data": "...", "cfg": {...} | null} - clean notebook json,
+            response with cleaned notebook or null if nothing changed.
+        {"cmd": "shutdown"} - stop server.
+    """
+
+    def __init__(self, path: str) -> None:
+        old_umask = os.umask(0o077)  # socket only for current user
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self.plans: Dict[str, CleanPlan] = {}
+
+    def plan(self, config: Optional[Dict[str, Any]]) -> CleanPlan:
+        """Compiled plan for config, compiled once per distinct config."""
+        key = json.dumps(config, sort_keys=True)
+        if key not in self.plans:
+            cfg = config_from_dict(config) if config is not None else CleanConfig()
+            self.plans[key] = compile_config(cfg)
+        return self.plans[key]
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        cmd = message.get("cmd")
+        if cmd == "ping":
+            return {"version": __version__}
+        if cmd == "run":
+            if message.get("version") != __version__:
+                return {"error": f"server version {__version__}"}
+            return run_app(message["app"], message["argv"], message["cwd"])
+        if cmd == "clean":
+            data = message["data"].encode("utf-8")
+            try:
+                result = clean_nb_bytes(data, self.plan(message.get("cfg")))
+            except ValueError as ex:
+                return {"error": str(ex)}
+            return {"data": None if result is data else result.decode("utf-8")}
+        if cmd == "shutdown":
+            # shutdown waits for serve_forever loop, can not be called from handler.
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True}
+        return {"error": f"unknown command: {cmd}"}
+
+
+def serve(path: str, ready: Optional[Callable[[], None]] = None) -> None:
+    """Serve at Unix socket `path` until shutdown request.
+    Socket directory is created with mode 0700 if not exists.
+    Stale socket file (server not running) is removed.
+
+    Raises:
+        RuntimeError: If server is already running at `path`
+            or socket directory is owned by other user.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.stat(directory).st_uid != os.getuid():
+        raise RuntimeError(f"socket directory {directory} is owned by other user")
+    if os.path.lexists(path):
+        if request({"cmd": "ping"}, path) is not None:
+            raise RuntimeError(f"server is already running at {path}")
+        os.unlink(path)
+    with NbServer(path) as server:
+        try:
+            if ready is not None:
+                ready()
+            server.serve_forever()
+        finally:
+            os.unlink(path)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .nb_types import Nb
+
+
+__all__ = [
+    "CleanStats",
+    "NbCounts",
+    "NbStats",
+    "nb_counts",
+]
+
+# executed code cells, metadata keys, outputs by mime type
+NbCounts = Tuple[int, "Counter[str]", "Counter[str]"]
+
+
+def _meta_keys(metadata: Any, prefix: str) -> Iterator[str]:
+    """Dotted paths to metadata leaf values, like `nb.language_info.version`."""
+    for key, value in metadata.items():
+        path = f"{prefix}.{key}"
+        if isinstance(value, dict) and value:
+            yield from _meta_keys(value, path)
+        else:
+            yield path
+
+
+def nb_counts(nb: Nb) -> NbCounts:
+    """Count executed code cells, metadata keys (notebook keys prefixed by `nb.`,
+    cell keys by `cell.`) and outputs by mime type (stream and error by output type).
+    """
+    executed = 0
+    keys: Counter[str] = Counter(_meta_keys(nb.get("metadata") or {}, "nb"))
+    outputs: Counter[str] = Counter()
+    for cell in nb["cells"]:
+        keys.update(_meta_keys(cell.get("metadata") or {}, "cell"))
+        if cell["cell_type"] != "code":
+            continue
+        if cell.get("execution_count") is not None:
+            executed += 1
+        for output in cell.get("outputs") or []:  # type: ignore
+            if "data" in output:
+                outputs.update(list(output["data"]))
+            else:
+                outputs[output["output_type"]] += 1
+    return executed, keys, outputs
+
+
+@dataclass
+class NbStats:
+    """Changes at cleaned notebook.
+
+    Args:
+        path (Path): Notebook.
+        bytes_before (int): Size before cleaning.
+        bytes_after (int): Size after cleaning.
+        execution_counts (int): Cleared execution counts.
+        metadata_keys (Counter[str]): Dropped metadata keys.
+        outputs (Counter[str]): Removed outputs by mime type.
+    """
+
+    path: Path
+    bytes_before: int = 0
+    bytes_after: int = 0
+    execution_counts: int = 0
+    metadata_keys: Counter[str] = field(default_factory=Counter)
+    outputs: Counter[str] = field(default_factory=Counter)
+
+    @classmethod
+    def from_counts(
+        cls,
+        path: Path,
+        bytes_before: int,
+        bytes_after: int,
+        before: NbCounts,
+        after: NbCounts,
+    ) -> NbStats:
+        """Stats from notebook counts before and after cleaning."""
+        return cls(
+            path,
+            bytes_before,
+            bytes_after,
+            before[0] - after[0],
+            before[1] - after[1],
+            before[2] - after[2],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path.as_posix(),
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "execution_counts": self.execution_counts,
+            "metadata_keys": dict(self.metadata_keys),
+            "outputs": dict(self.outputs),
+        }
+
+
+@dataclass
+class CleanStats:
+    """Stats for cleaned notebooks, per notebook and in aggregate."""
+
+    notebooks: List[NbStats] = field(default_factory=list)
+
+    def add(self, nb_stats: NbStats) -> None:
+        self.notebooks.append(nb_stats)
+
+    def extend(self, other: CleanStats) -> None:
+        self.notebooks.extend(other.notebooks)
+
+    def total(self) -> Dict[str, Any]:
+        """Aggregate stats: notebooks, bytes before and after, saved bytes,
+        cleared execution counts, dropped metadata keys and removed outputs."""
+        metadata_keys: Counter[str] = Counter()
+        outputs: Counter[str] = Counter()
+        for nb_stats in self.notebooks:
+            metadata_keys.update(nb_stats.metadata_keys)
+            outputs.update(nb_stats.outputs)
+        bytes_before = sum(nb_stats.bytes_before for nb_stats in self.notebooks)
+        bytes_after = sum(nb_stats.bytes_after for nb_stats in self.notebooks)
+        return {
+            "notebooks": len(self.notebooks),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+            "execution_counts": sum(
+                nb_stats.execution_counts for nb_stats in self.notebooks
+            ),
+            "metadata_keys": dict(metadata_keys.most_common()),
+            "outputs": dict(outputs.most_common()),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total(),
+            "notebooks": [nb_stats.to_dict() for nb_stats in self.notebooks],
+        }
+
+    def report(self) -> List[str]:
+        """Report lines: aggregate, then one line per notebook."""
+        total = self.total()
+        lines = [
+            f"stats: {total['notebooks']} notebooks, "
+            f"{total['bytes_before']} -> {total['bytes_after']} bytes, "
+            f"saved {total['bytes_saved']} bytes, "
+            f"execution_counts cleared: {total['execution_counts']}",
+        ]
+        if total["metadata_keys"]:
+            lines.append(
+                "metadata keys dropped: "
+                + ", ".join(
+                    f"{key}: {num}" for key, num in total["metadata_keys"].items()
+                )
+            )
+        if total["outputs"]:
+            lines.append(
+                "outputs removed: "
+                + ", ".join(f"{key}: {num}" for key, num in total["outputs"].items())
+            )
+        for nb_stats in self.notebooks:
+            lines.append(
+                f"- {nb_stats.path}: {nb_stats.bytes_before} -> {nb_stats.bytes_after} bytes, "
+                f"ec: {nb_stats.execution_counts}, "
+                f"metadata keys: {sum(nb_stats.metadata_keys.values())}, "
+                f"outputs: {sum(nb_stats.outputs.values())}"
+            )
+        return lines
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union, cast
+
+from .helpers import read_nb, write_nb
+from .nb_types import Metadata, MultilineText, Nb, PathOrStr
+
+
+__all__ = [
+    "STORE_REF_PREFIX",
+    "extract_payloads",
+    "has_payloads",
+    "is_binary_mime",
+    "is_store_ref",
+    "rehydrate_nb",
+    "rehydrate_nb_file",
+]
+
+STORE_REF_PREFIX = "nbmetaclean-store:sha256:"
+DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+BINARY_MIMES = ("application/pdf", "application/octet-stream")
+
+# mime type -> text, lines or json data
+MimeBundle = Dict[str, Union[MultilineText, Metadata]]
+
+
+def is_store_ref(value: object) -> bool:
+    """Check if `value` is a reference to payload at store."""
+    return isinstance(value, str) and value.startswith(STORE_REF_PREFIX)
+
+
+def is_binary_mime(mime: str) -> bool:
+    """Check if mime type payload is base64 encoded binary data: images (not svg), pdf."""
+    return (
+        mime.startswith("image/") and not mime.endswith("+xml")
+    ) or mime in BINARY_MIMES
+
+
+def store_file(store: Path, digest: str) -> Path:
+    """Path for payload with `digest` at store.
+
+    Raises:
+        ValueError: If `digest` is not sha256 hex digest.
+    """
+    if DIGEST_RE.fullmatch(digest) is None:
+        raise ValueError(f"Wrong store digest: {digest!r}")
+    return store / digest[:2] / digest
+
+
+def _load_payload(store: Path, digest: str) -> str:
+    data = store_file(store, digest).read_bytes()
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Store payload {digest} does not match its digest")
+    return data.decode("utf-8")
+
+
+def _movable(mime: str, value: str, threshold: int) -> bool:
+    return len(value) >= threshold and is_binary_mime(mime) and not is_store_ref(value)
+
+
+def _save_payload(store: Path, payload: str, write: bool) -> str:
+    data = payload.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    filename = store_file(store, digest)
+    if write and not filename.exists():
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=filename.parent)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_name, filename)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    return STORE_REF_PREFIX + digest
+
+
+def _iter_bundles(nb: Nb) -> Iterator[MimeBundle]:
+    """Iterate over output data and attachments mime bundles."""
+    for cell in nb["cells"]:
+        for bundle in (cell.get("attachments") or {}).values():
+            yield cast(MimeBundle, bundle)  # attachments typed as text at nb_types
+        for output in cell.get("outputs") or []:  # type: ignore
+            if isinstance(output.get("data"), dict):
+                yield output["data"]
+
+
+def extract_payloads(
+    nb: Nb,
+    store: PathOrStr,
+    threshold: int = 1024,
+    write: bool = True,
+) -> bool:
+    """Move output data and attachments payloads larger than `threshold` to store.
+    Payload saved to file named by sha256 hash, at notebook replaced by reference.
+    Only base64 encoded binary payloads (images, except svg, and pdf) are moved,
+    text, html, javascript and json payloads stay at notebook.
+
+    Args:
+        nb (Nb): Notebook to process.
+        store (Union[Path, str]): Store directory.
+        threshold (int): Minimal payload size to move, in bytes. Defaults to 1024.
+        write (bool): Write payloads to store. If False, only references are set. Defaults to True.
+
+    Returns:
+        bool: True if notebook changed.
+    """
+    store_path = Path(store)
+    changed = False
+    for bundle in _iter_bundles(nb):
+        for mime, value in bundle.items():
+            if isinstance(value, str) and _movable(mime, value, threshold):
+                bundle[mime] = _save_payload(store_path, value, write)
+                changed = True
+    return changed
+
+
+def has_payloads(nb: Nb, threshold: int = 1024) -> bool:
+    """Check if notebook has payloads that `extract_payloads` would move to store.
+
+    Args:
+        nb (Nb): Notebook to check.
+        threshold (int): Minimal payload size to move, in bytes. Defaults to 1024.
+
+    Returns:
+        bool: True if any payload would be moved.
+    """
+    return any(
+        isinstance(value, str) and _movable(mime, value, threshold)
+        for bundle in _iter_bundles(nb)
+        for mime, value in bundle.items()
+    )
+
+
+def rehydrate_nb(nb: Nb, store: PathOrStr) -> bool:
+    """Restore payloads from store, replace references with content.
+    Payload content is verified by its sha256 digest.
+
+    Args:
+        nb (Nb): Notebook to process.
+        store (Union[Path, str]): Store directory.
+
+    Raises:
+        FileNotFoundError: If payload not found at store.
+        ValueError: If reference has wrong digest or payload does not match digest.
+
+    Returns:
+        bool: True if notebook changed.
+    """
+    store_path = Path(store)
+    changed = False
+    for bundle in _iter_bundles(nb):
+        for mime, value in bundle.items():
+            if isinstance(value, str) and is_store_ref(value):
+                digest = value[len(STORE_REF_PREFIX) :]
+                bundle[mime] = _load_payload(store_path, digest)
+                changed = True
+    return changed
+
+
+def rehydrate_nb_file(
+    path: Union[Path, Iterable[Path]],
+    store: PathOrStr,
+    preserve_timestamp: bool = True,
+    dry_run: bool = False,
+) -> tuple[list[Path], list[Path]]:
+    """Restore payloads from store at notebooks.
+
+    Args:
+        path (Union[str, PosixPath]): Notebook filename or list (iterable) of names.
+        store (Union[Path, str]): Store directory.
+        preserve_timestamp (bool): Preserve timestamp. Defaults to True.
+        dry_run (bool): perform a trial run, don't write results. Defaults to False.
+
+    Returns:
+        tuple[List[Path], List[Path]]: List of changed notebooks, list of notebooks with errors.
+    """
+    if isinstance(path, (str, os.PathLike)):
+        path = [path]
+    rehydrated: list[Path] = []
+    errors: list[Path] = []
+    for filename in path:
+        nb = read_nb(filename)
+        if nb is None:
+            errors.append(filename)
+            continue
+        try:
+            result = rehydrate_nb(nb, store)
+        except (OSError, ValueError):
+            errors.append(filename)
+            continue
+        if result:
+            rehydrated.append(filename)
+            if dry_run:
+                continue
+            timestamp: Optional[tuple[float, float]] = None
+            if preserve_timestamp:
+                stat = filename.stat()
+                timestamp = (stat.st_atime, stat.st_mtime)
+            write_nb(nb, filename, timestamp)
+    return rehydrated, errors
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Type
+
+from .helpers import load_entry_point
+from .nb_types import Cell, Nb, Output
+
+
+__all__ = [
+    "DropExecuteTime",
+    "NbTransform",
+    "StripAnsi",
+    "TRANSFORMS",
+    "get_transform",
+    "register_transform",
+]
+
+TRANSFORMS_ENTRY_POINT = "nbmetaclean.transforms"
+
+
+class NbTransform:
+    """Base class for cleaning transforms run by `clean_nb` in same traversal as clean steps.
+    Transform subscribe to events by overriding `notebook`, `cell` and (or) `output` methods.
+    Handler changes item inplace and returns True if it changed.
+    One instance created for compiled plan and shared between notebooks and threads,
+    so transform should not keep state.
+    """
+
+    name: str = ""
+
+    def notebook(self, nb: Nb) -> bool:
+        """Called for notebook, before cells."""
+        return False  # pragma: no cover
+
+    def cell(self, cell: Cell) -> bool:
+        """Called for every cell, after clean steps."""
+        return False  # pragma: no cover
+
+    def output(self, output: Output) -> bool:
+        """Called for every output of code cells, after clean steps."""
+        return False  # pragma: no cover
+
+    def subscribed(self, method: str) -> bool:
+        """Check if transform overrides event handler."""
+        return getattr(type(self), method) is not getattr(NbTransform, method)
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and vars(other) == vars(self)
+
+    def __hash__(self) -> int:
+        return hash(type(self))
+
+
+TRANSFORMS: Dict[str, Type[NbTransform]] = {}
+
+
+def register_transform(transform: Type[NbTransform]) -> Type[NbTransform]:
+    """Register transform class by name, can be used as decorator."""
+    TRANSFORMS[transform.name] = transform
+    return transform
+
+
+def get_transform(name: str) -> Type[NbTransform]:
+    """Return transform class by name.
+    If transform is not registered, load it from `nbmetaclean.transforms` entry points.
+
+    Raises:
+        KeyError: If transform not found.
+    """
+    if name not in TRANSFORMS:
+        register_transform(load_entry_point(TRANSFORMS_ENTRY_POINT, name))
+    return TRANSFORMS[name]
+
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def _strip_ansi(value: Any) -> Any:
+    if isinstance(value, str):
+        return ANSI_RE.sub("", value)
+    if isinstance(value, list):
+        return [_strip_ansi(item) for item in value]
+    return value
+
+
+@register_transform
+class StripAnsi(NbTransform):
+    """Strip ANSI escape codes from error tracebacks and stream outputs."""
+
+    name = "strip_ansi"
+
+    def output(self, output: Output) -> bool:
+        key = {"error": "traceback", "stream": "text"}.get(output["output_type"])
+        if key is None or key not in output:
+            return False
+        value = output[key]  # type: ignore[literal-required]
+        new_value = _strip_ansi(value)
+        if new_value == value:
+            return False
+        output[key] = new_value  # type: ignore[literal-required]
+        return True
+
+
+@register_transform
+class DropExecuteTime(NbTransform):
+    """Remove `ExecuteTime` cell metadata, set by jupyter contrib extension."""
+
+    name = "execute_time"
+
+    def cell(self, cell: Cell) -> bool:
+        metadata = cell.get("metadata")
+        if metadata and "ExecuteTime" in metadata:
+            del metadata["ExecuteTime"]  # type: ignore[misc]
+            return True
+        return False
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .nb_types import PathOrStr
+
+
+__all__ = [
+    "DEFAULT_MAX_SIZE",
+    "VerdictCache",
+]
+
+DEFAULT_MAX_SIZE = 64 * 2**20  # bytes
+ROW_OVERHEAD = 32  # bytes per row at estimate of cache size, besides key and verdicts
+
+
+class VerdictCache:
+    """Cache of checks verdicts at SQLite file, keyed by hash of notebook content
+    and checks options. Not depends on paths and mtimes, so file can be saved and
+    restored between CI runs. On hit notebook is only hashed, not parsed.
+    Least recently used entries are evicted when cache is larger than `max_size`.
+
+    Args:
+        path (Union[Path, str]): Cache file.
+        options (Dict[str, Any]): Checks options, json serializable, other values as `str`:
+            selected checks and their settings. Entries for other options are not used.
+        max_size (int): Cache size limit, bytes. Defaults to DEFAULT_MAX_SIZE.
+    """
+
+    def __init__(
+        self,
+        path: PathOrStr,
+        options: Dict[str, Any],
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.prefix = hashlib.sha256(
+            json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+        ).digest()
+        self.hits = 0
+        self.misses = 0
+        self._used: List[bytes] = []
+        self._now = int(time.time())
+        import sqlite3  # imported on use, nbcheck without cache does not load it
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts "
+            "(key BLOB PRIMARY KEY, verdicts TEXT NOT NULL, used INTEGER NOT NULL)"
+        )
+
+    def key(self, data: bytes) -> bytes:
+        """Cache key for notebook content."""
+        return hashlib.sha256(self.prefix + data).digest()
+
+    def get(self, key: bytes) -> Optional[Dict[str, bool]]:
+        """Verdicts by check name, None if not cached."""
+        row = self.conn.execute(
+            "SELECT verdicts FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.append(key)
+        return json.loads(row[0])
+
+    def put(self, key: bytes, verdicts: Dict[str, bool]) -> None:
+        """Cache verdicts for notebook content."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO verdicts (key, verdicts, used) VALUES (?, ?, ?)",
+            (key, json.dumps(verdicts), self._now),
+        )
+
+    def evict(self) -> int:
+        """Delete least recently used entries over size limit, return number of deleted."""
+        rows: List[Tuple[int, int]] = self.conn.execute(
+            "SELECT rowid, length(key) + length(verdicts) FROM verdicts ORDER BY used DESC"
+        ).fetchall()
+        size = 0
+        evicted = []
+        for rowid, row_size in rows:
+            size += row_size + ROW_OVERHEAD
+            if size > self.max_size:
+                evicted.append((rowid,))
+        if evicted:
+            self.conn.executemany("DELETE FROM verdicts WHERE rowid = ?", evicted)
+        return len(evicted)
+
+    def close(self) -> None:
+        """Save cache: mark hits as used, evict entries over size limit, compact file."""
+        self.conn.executemany(
+            "UPDATE verdicts SET used = ? WHERE key = ?",
+            ((self._now, key) for key in self._used),
+        )
+        evicted = self.evict()
+        self.conn.commit()
+        if evicted:
+            self.conn.execute("VACUUM")
+        self.conn.close()
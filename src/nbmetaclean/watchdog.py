@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import multiprocessing
+from typing import Any, Callable, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover  # windows, memory limit not supported
+    resource = None  # type: ignore
+
+
+__all__ = [
+    "LimitExceeded",
+    "Watchdog",
+]
+
+
+class LimitExceeded(Exception):
+    """Task exceeded time or memory limit."""
+
+
+def _set_memory_limit(max_memory: Optional[int]) -> None:
+    """Limit address space of current process to current size plus `max_memory` bytes."""
+    if max_memory is None or resource is None:
+        return
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as fh:
+            baseline = int(fh.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        baseline = 0
+    _soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = baseline + max_memory
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker(conn: Any, max_memory: Optional[int]) -> None:
+    """Run tasks from connection until it closed. Report MemoryError as limit exceeded."""
+    _set_memory_limit(max_memory)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        func, args = task
+        try:
+            result = ("ok", func(*args))
+        except MemoryError:
+            result = ("limit", None)
+        except Exception as exc:  # noqa: BLE001  # reraised at parent process
+            result = ("error", exc)
+        conn.send(result)
+
+
+class Watchdog:
+    """Run tasks at worker process with wall time and memory limits.
+    Worker is killed if task run longer than `max_seconds` and started again for next task.
+    Memory is limited by address space limit for worker (`RLIMIT_AS`), Unix only.
+
+    Args:
+        max_seconds (Optional[float]): Time limit for task, None - no limit.
+        max_memory (Optional[int]): Memory limit for worker, bytes, None - no limit.
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_memory: Optional[int] = None,
+    ) -> None:
+        self.max_seconds = max_seconds
+        self.max_memory = max_memory
+        self._process: Optional[multiprocessing.Process] = None
+        self._conn: Any = None
+
+    def _start(self) -> None:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_worker, args=(child_conn, self.max_memory), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run `func(*args)` at worker process, return result.
+        `func`, arguments and result must be picklable.
+
+        Raises:
+            LimitExceeded: If task exceeded time or memory limit.
+        """
+        if self._process is None:
+            self._start()
+        self._conn.send((func, args))
+        if not self._conn.poll(self.max_seconds):
+            self.close()
+            raise LimitExceeded(f"Time limit {self.max_seconds} seconds exceeded.")
+        try:
+            status, result = self._conn.recv()
+        except EOFError:  # worker killed, for example by OOM killer
+            self.close()
+            raise LimitExceeded("Worker process killed.") from None
+        if status == "limit":
+            self.close()  # start clean worker for next task
+            raise LimitExceeded(f"Memory limit {self.max_memory} bytes exceeded.")
+        if status == "error":
+            raise result
+        return result
+
+    def close(self) -> None:
+        """Stop worker process."""
+        if self._process is None:
+            return
+        self._conn.close()
+        self._process.terminate()
+        self._process.join()
+        self._process = None
+        self._conn = None
+
+    def __enter__(self) -> Watchdog:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 import subprocess
+import zipfile
 
 import pytest
 
-from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.helpers import nb_to_json, read_nb, write_nb
 from nbmetaclean.version import __version__
 
 
@@ -22,6 +23,15 @@ def run_app(
     return run_result.stdout.decode("utf-8"), run_result.stderr.decode("utf-8")
 
 
+def run_app_code(nb_path: Path, args: list[str]) -> int:
+    """run app, return exit code"""
+    return subprocess.run(
+        ["python", "-m", "nbmetaclean.app_check", str(nb_path), *args],
+        capture_output=True,
+        check=False,
+    ).returncode
+
+
 example_nbs_path = Path("tests/test_nbs")
 nb_name = "test_nb_3_ec.ipynb"
 
@@ -41,6 +51,24 @@ def test_run_script():
     assert not res_err
 
 
+def test_check_app_imports():
+    """modules for other options are not imported at plain check"""
+    cmd = (
+        "import sys; from nbmetaclean.app_check import app_check\n"
+        "try:\n    app_check()\nfinally:\n    print(sorted(sys.modules))"
+    )
+    run_result = subprocess.run(
+        ["python", "-c", cmd, "--ec", str(example_nbs_path / nb_name)],
+        capture_output=True,
+        check=False,
+    )
+    modules = run_result.stdout.decode("utf-8")
+    assert "'nbmetaclean.check'" in modules
+    for module in ("clean", "git_history", "metrics", "transform"):
+        assert f"'nbmetaclean.{module}'" not in modules
+    assert "'sqlite3'" not in modules
+
+
 def test_check_nb_ec(tmp_path: Path):
     """test check `--ec`"""
     # base notebook - no execution_count
@@ -63,6 +91,8 @@ def test_check_nb_ec(tmp_path: Path):
     assert res_out.startswith("1 notebooks with wrong execution_count:\n")
     assert res_out.endswith("test_nb_3_ec.ipynb\n")
     assert not res_err
+    assert run_app_code(test_nb_path, ["--ec"]) == 1
+    assert run_app_code(test_nb_path, ["--ec", "--no_exec"]) == 0
 
     # `-V` option
     res_out, res_err = run_app(test_nb_path, ["--ec", "-V"])
@@ -215,5 +245,123 @@ def test_check_app_read_error(tmp_path: Path, arg: str):
 
     res_out, res_err = run_app(test_nb_path, [arg])
     assert res_out.startswith("1 notebooks with read error:\n")
-    assert res_out.endswith("test_nb.ipynb\n")
+    assert res_out.endswith("test_nb.ipynb: invalid json\n")
+    assert not res_err
+
+
+def test_check_app_archives(tmp_path: Path):
+    """test check notebooks inside archive."""
+    test_nb = read_nb(example_nbs_path / nb_name)
+    archive = tmp_path / "nbs.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("nbs/nb.ipynb", nb_to_json(test_nb))
+        zf.writestr("nbs/wrong.ipynb", "wrong")
+
+    res_out, res_err = run_app(tmp_path, ["--ec"])
+    assert not res_out
+    assert not res_err
+
+    res_out, res_err = run_app(tmp_path, ["--ec", "--archives"])
+    assert res_out.startswith("1 notebooks with wrong execution_count:\n")
+    assert "nbs.zip/nbs/nb.ipynb\n" in res_out
+    assert "1 notebooks with read error:\n" in res_out
+    assert res_out.endswith("nbs.zip/nbs/wrong.ipynb: invalid json\n")
+    assert not res_err
+
+
+def test_check_app_registered_check(tmp_path: Path):
+    """test `--check` option."""
+    test_nb_path = write_nb(read_nb(example_nbs_path / nb_name), tmp_path / nb_name)
+    res_out, res_err = run_app(test_nb_path, ["--check", "ec"])
+    assert res_out.startswith("1 notebooks with wrong execution_count:\n")
+    assert not res_err
+
+    res_out, res_err = run_app(test_nb_path, ["--check", "not_exists"])
+    assert res_out.startswith("Check not found:")
+    assert not res_err
+
+    res_out, res_err = run_app(test_nb_path, ["--ec", "--check", "ec"])
+    assert res_out == "Check ec selected more than once.\n"
+    assert run_app_code(test_nb_path, ["--ec", "--check", "ec"]) == 1
+
+
+def test_check_app_files_from(tmp_path: Path):
+    """test `--files_from` option"""
+    test_nb = read_nb(example_nbs_path / nb_name)
+    nb_path = tmp_path / nb_name
+    write_nb(test_nb, nb_path)
+    res = subprocess.run(
+        ["python", "-m", "nbmetaclean.app_check", "--ec", "-V", "--files_from", "-"],
+        input=f"{nb_path}\n{nb_path}\n".encode("utf-8"),
+        capture_output=True,
+        check=False,
+    )
+    assert res.returncode == 1
+    assert res.stdout.decode("utf-8") == (
+        f"Checked 1 notebooks.\n1 notebooks with wrong execution_count:\n-  {nb_path}\n"
+    )
+
+
+def test_check_app_verdict_cache(tmp_path: Path):
+    """test `--verdict_cache` option"""
+    test_nb = read_nb(example_nbs_path / nb_name)
+    nb_path = tmp_path / nb_name
+    write_nb(test_nb, nb_path)
+    args = ["--ec", "-V", "--verdict_cache", str(tmp_path / "verdicts.sqlite")]
+    res_out, _ = run_app(nb_path, args)
+    assert "Verdict cache: 0 hits, 1 misses." in res_out
+    assert "1 notebooks with wrong execution_count:" in res_out
+
+    # same content at other path, mtime changed - verdict from cache
+    other_path = tmp_path / "other.ipynb"
+    other_path.write_bytes(nb_path.read_bytes())
+    res_out, _ = run_app(other_path, args)
+    assert "Verdict cache: 1 hits, 0 misses." in res_out
+    assert res_out.endswith(f"-  {other_path}\n")
+    assert run_app_code(other_path, args) == 1
+
+    # other options not use cached verdicts
+    res_out, _ = run_app(other_path, [*args, "--no_exec"])
+    assert "Verdict cache: 0 hits, 1 misses." in res_out
+    assert "wrong execution_count" not in res_out
+
+
+def test_verdict_options_plugins(monkeypatch):
+    """test verdict cache key depends on registered checks and transforms versions"""
+    from nbmetaclean import helpers
+    from nbmetaclean.app_check import parser, verdict_options
+    from nbmetaclean.clean_options import clean_config_from_args
+
+    cfg = parser.parse_args(["--check", "err", "--clean", "--transform", "strip_ansi"])
+    options = verdict_options(cfg, clean_config_from_args(cfg))
+    assert options["check"] == [f"nbmetaclean.check.ErrorsCheck=={__version__}"]
+    assert options["transforms"] == [f"nbmetaclean.transform.StripAnsi=={__version__}"]
+
+    monkeypatch.setattr(helpers, "_module_version", lambda module: "new")
+    new_options = verdict_options(cfg, clean_config_from_args(cfg))
+    assert new_options["check"] == ["nbmetaclean.check.ErrorsCheck==new"]
+    assert new_options["transforms"] == ["nbmetaclean.transform.StripAnsi==new"]
+
+
+def test_check_app_clean(tmp_path: Path):
+    """test `--clean` option"""
+    nb_path = tmp_path / "test_nb_2_meta.ipynb"
+    nb_path.write_bytes((example_nbs_path / ".test_nb_2_meta.ipynb").read_bytes())
+    data = nb_path.read_bytes()
+    res_out, res_err = run_app(nb_path, ["--clean"])
+    assert res_out == f"1 notebooks with content to clean:\n-  {nb_path}\n"
     assert not res_err
+    assert nb_path.read_bytes() == data
+    assert run_app_code(nb_path, ["--clean"]) == 1
+    # same clean options as nbmetaclean
+    args = ["--clean", "--not_ec", "--dont_clear_nb_metadata"]
+    assert run_app_code(nb_path, args) == 0
+
+    subprocess.run(
+        ["python", "-m", "nbmetaclean.app_clean", str(nb_path), "--clear_outputs"],
+        check=True,
+    )
+    assert run_app_code(nb_path, ["--clean"]) == 0
+    assert run_app_code(nb_path, ["--clean", "--clear_outputs"]) == 0
+    res_out, _ = run_app(nb_path, ["--clean", "--nb_metadata_preserve_mask", "*"])
+    assert res_out == ""
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import subprocess
@@ -217,3 +218,132 @@ def test_app_clean_version():
     res_out, res_err = run_app(args=["-v"])
     assert res_out.startswith("nbmetaclean version: ")
     assert not res_err
+
+
+def test_app_clean_store(tmp_path: Path):
+    """test `--store` and `--rehydrate` options"""
+    test_nb = read_nb(example_nbs_path / "test_nb_2_clean.ipynb")
+    test_nb["cells"][1]["outputs"][0]["data"]["image/png"] = "iVBORw0KGgo" * 200
+    test_nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+    store = tmp_path / "store"
+
+    res_out, res_err = run_app(test_nb_path, ["--rehydrate"])
+    assert res_out.startswith("Set store directory")
+
+    res_out, res_err = run_app(test_nb_path, ["--store", str(store)])
+    assert res_out.startswith("cleaned:")
+    assert not res_err
+    nb = read_nb(test_nb_path)
+    assert (
+        nb["cells"][1]["outputs"][0]["data"]["image/png"]
+        != test_nb["cells"][1]["outputs"][0]["data"]["image/png"]
+    )
+
+    res_out, res_err = run_app(test_nb_path, ["--store", str(store), "--rehydrate"])
+    assert res_out.startswith("cleaned:")
+    assert not res_err
+    assert read_nb(test_nb_path) == test_nb
+
+
+def test_app_clean_limits(tmp_path: Path):
+    """test `--max_nb_bytes` option"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    test_nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+
+    res_out, res_err = run_app(test_nb_path, ["--max_nb_bytes", "10"])
+    assert res_out.startswith("skipped (limit exceeded): 1")
+    assert not res_err
+    assert read_nb(test_nb_path) == test_nb
+
+    res_out, res_err = run_app(test_nb_path, ["--max_nb_seconds", "10"])
+    assert res_out.startswith("cleaned:")
+    assert not res_err
+
+
+def test_app_clean_stats(tmp_path: Path):
+    """test `--stats` and `--stats_json` options"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    test_nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+    stats_path = tmp_path / "stats.json"
+
+    res_out, res_err = run_app(
+        test_nb_path, ["-D", "--stats", "--stats_json", str(stats_path)]
+    )
+    assert not res_err
+    assert "stats: 1 notebooks" in res_out
+    assert "metadata keys dropped: " in res_out
+    assert read_nb(test_nb_path) == test_nb
+    stats = json.loads(stats_path.read_text(encoding="utf-8"))
+    assert stats["total"]["execution_counts"] == 1
+    assert stats["notebooks"][0]["path"] == test_nb_path.as_posix()
+
+
+def test_app_clean_resume(tmp_path: Path):
+    """test `--journal` and `--resume` options"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nb_1 = write_nb(test_nb, tmp_path / "nb_1.ipynb")
+    nb_2 = write_nb(test_nb, tmp_path / "nb_2.ipynb")
+    journal_path = tmp_path / "journal.jsonl"
+
+    res_out, res_err = run_app(nb_1, ["--resume"])
+    assert res_out == "Set journal file with `--journal` to resume.\n"
+
+    res_out, res_err = run_app(nb_1, ["--journal", str(journal_path)])
+    assert not res_err
+    assert res_out == f"cleaned: {nb_1}\n"
+
+    # report includes notebooks from journal
+    res_out, res_err = run_app(
+        [nb_1, nb_2], ["--journal", str(journal_path), "--resume"]
+    )
+    assert not res_err
+    assert res_out == f"cleaned: 2 notebooks\n-  {nb_1}\n-  {nb_2}\n"
+    assert len(journal_path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_app_clean_files_from(tmp_path: Path):
+    """test `--files_from` option, file and stdin, NUL separated"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nbs = [write_nb(test_nb, tmp_path / f"nb_{num}.ipynb") for num in range(3)]
+    paths_file = tmp_path / "paths.txt"
+    paths_file.write_text(f"{nbs[0]}\n{nbs[1]}\n", encoding="utf-8")
+
+    res_out, res_err = run_app(nbs[2], ["--files_from", str(paths_file)])
+    assert not res_err
+    assert res_out == f"cleaned: 3 notebooks\n-  {nbs[2]}\n-  {nbs[0]}\n-  {nbs[1]}\n"
+
+    res_out, res_err = run_app(args=["--files_from", str(tmp_path / "no_file")])
+    assert res_out == f"{tmp_path / 'no_file'} not exists!\n"
+
+    for nb in nbs:
+        write_nb(test_nb, nb)
+    res = subprocess.run(
+        ["python", "-m", "nbmetaclean.app_clean", "--files-from", "-", "-V"],
+        input="\0".join(str(nb) for nb in nbs).encode("utf-8"),
+        capture_output=True,
+        check=False,
+    )
+    assert not res.stderr
+    res_out = res.stdout.decode("utf-8")
+    assert "checked: 3 notebooks\n" in res_out
+    assert "cleaned: 3 notebooks\n" in res_out
+
+
+def test_app_clean_transform(tmp_path: Path):
+    """test `--transform` option, nbcheck `--clean` with same transforms"""
+    test_nb = read_nb(example_nbs_path / "test_nb_2_clean.ipynb")
+    test_nb["cells"][1]["metadata"]["ExecuteTime"] = {"end_time": "2024"}
+    test_nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+    args = ["--transform", "execute_time"]
+    check_args = ["python", "-m", "nbmetaclean.app_check", str(test_nb_path), "--clean"]
+
+    res_out, res_err = run_app(test_nb_path, ["--transform", "not_exists"])
+    assert res_out.startswith("Transform not found:")
+    assert read_nb(test_nb_path) == test_nb
+
+    assert subprocess.run([*check_args, *args], check=False).returncode == 1
+    res_out, res_err = run_app(test_nb_path, list(args))
+    assert res_out.startswith("cleaned:")
+    assert not res_err
+    assert read_nb(test_nb_path)["cells"][1]["metadata"] == {}
+    assert subprocess.run([*check_args, *args], check=False).returncode == 0
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean.archive import (
+    is_archive,
+    is_archive_member_nb,
+    iter_archive_nbs,
+    split_archive_path,
+)
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import get_nb_names, nb_to_json, read_nb, write_nb
+
+
+example_nbs_path = Path("tests/test_nbs")
+nb_meta = ".test_nb_2_meta.ipynb"
+nb_clean = "test_nb_2_clean.ipynb"
+
+
+def make_archive(path: Path) -> Path:
+    """create archive with dirty notebook, clean notebook and other file"""
+    nb_dirty = nb_to_json(read_nb(example_nbs_path / nb_meta)).encode("utf-8")
+    nb_ok = nb_to_json(read_nb(example_nbs_path / nb_clean)).encode("utf-8")
+    members = {
+        "nbs/dirty.ipynb": nb_dirty,
+        "nbs/clean.ipynb": nb_ok,
+        "nbs/.ipynb_checkpoints/dirty-checkpoint.ipynb": nb_dirty,
+        "nbs/.hidden.ipynb": nb_dirty,
+        "data.txt": b"some data",
+    }
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in members.items():
+                zf.writestr(name, data)
+    else:
+        with tarfile.open(path, "w:gz") as tf:
+            for name, data in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_is_archive():
+    """test is_archive, is_archive_member_nb"""
+    assert is_archive(Path("nbs.zip"))
+    assert is_archive("nbs.tar.gz")
+    assert is_archive("nbs.TGZ")
+    assert not is_archive("nbs.ipynb")
+    assert is_archive_member_nb("dir/nb.ipynb")
+    assert not is_archive_member_nb("dir/.nb.ipynb")
+    assert is_archive_member_nb("dir/.nb.ipynb", hidden=True)
+    assert not is_archive_member_nb(".ipynb_checkpoints/nb-checkpoint.ipynb", True)
+    assert not is_archive_member_nb("data.txt")
+
+
+@pytest.mark.parametrize("name", ["nbs.zip", "nbs.tar.gz"])
+def test_clean_archive(tmp_path: Path, name: str):
+    """test clean notebooks inside archive"""
+    archive = make_archive(tmp_path / name)
+    assert get_nb_names(tmp_path) == []
+    assert get_nb_names(tmp_path, archives=True) == [archive]
+
+    names = [member for member, _ in iter_archive_nbs(archive)]
+    assert sorted(names) == ["nbs/clean.ipynb", "nbs/dirty.ipynb"]
+    assert split_archive_path(archive / "nbs/dirty.ipynb") == (
+        archive,
+        "nbs/dirty.ipynb",
+    )
+
+    # dry run
+    cleaned, errors = clean_nb_file(archive, CleanConfig(dry_run=True))
+    assert cleaned == [archive / "nbs/dirty.ipynb"]
+    assert not errors
+    assert read_nb(archive / "nbs/dirty.ipynb") == read_nb(example_nbs_path / nb_meta)
+
+    cleaned, errors = clean_nb_file([archive], CleanConfig())
+    assert cleaned == [archive / "nbs/dirty.ipynb"]
+    assert not errors
+    assert read_nb(archive / "nbs/dirty.ipynb") == read_nb(example_nbs_path / nb_clean)
+    # other members preserved
+    nb_meta_data = read_nb(example_nbs_path / nb_meta)
+    assert (
+        read_nb(archive / "nbs/.ipynb_checkpoints/dirty-checkpoint.ipynb")
+        == nb_meta_data
+    )
+
+    cleaned, errors = clean_nb_file(archive, CleanConfig())
+    assert not cleaned
+    assert not errors
+
+    # hidden notebooks
+    assert read_nb(archive / "nbs/.hidden.ipynb") == nb_meta_data
+    cleaned, errors = clean_nb_file(archive, CleanConfig(), hidden=True)
+    assert cleaned == [archive / "nbs/.hidden.ipynb"]
+    assert read_nb(archive / "nbs/.hidden.ipynb") == read_nb(
+        example_nbs_path / nb_clean
+    )
+
+    # write member
+    write_nb(nb_meta_data, archive / "nbs/clean.ipynb")
+    assert read_nb(archive / "nbs/clean.ipynb") == nb_meta_data
+    with pytest.raises(FileNotFoundError):
+        write_nb(nb_meta_data, archive / "nbs/new.ipynb")
+
+
+def test_clean_archive_errors(tmp_path: Path):
+    """test clean broken archive"""
+    archive = tmp_path / "nbs.zip"
+    archive.write_text("not a zip")
+    cleaned, errors = clean_nb_file(archive)
+    assert not cleaned
+    assert errors == [archive]
+    assert read_nb(archive / "nb.ipynb") is None
+
+
+def test_clean_zip_compress_type(tmp_path: Path):
+    """test members keep compression method when zip rewritten"""
+    nb_dirty = nb_to_json(read_nb(example_nbs_path / nb_meta)).encode("utf-8")
+    archive = tmp_path / "nbs.zip"
+    compress_types = {
+        "stored.ipynb": zipfile.ZIP_STORED,
+        "deflated.ipynb": zipfile.ZIP_DEFLATED,
+        "bzip2.ipynb": zipfile.ZIP_BZIP2,
+        "data.txt": zipfile.ZIP_LZMA,
+    }
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, compress_type in compress_types.items():
+            zf.writestr(name, nb_dirty, compress_type=compress_type)
+    cleaned, errors = clean_nb_file(archive, CleanConfig())
+    assert len(cleaned) == 3
+    assert not errors
+    with zipfile.ZipFile(archive) as zf:
+        assert {
+            info.filename: info.compress_type for info in zf.infolist()
+        } == compress_types
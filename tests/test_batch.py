@@ -0,0 +1,75 @@
+import random
+from typing import Optional
+
+import pytest
+
+from nbmetaclean.batch import _numpy, check_ec_batch, check_nb_ec_batch, extract_ec
+from nbmetaclean.check import check_nb_ec
+from nbmetaclean.helpers import read_nb
+
+
+def make_nb(rng: random.Random) -> dict:
+    """random notebook, mostly correct sequences"""
+    cells = []
+    current = 0
+    for _ in range(rng.randint(0, 6)):
+        kind = rng.random()
+        if kind < 0.15:
+            cells.append({"cell_type": "markdown", "source": "text", "metadata": {}})
+            continue
+        source = "" if kind < 0.25 else "x = 1"
+        choice = rng.random()
+        if choice < 0.6:
+            current += 1
+            ec: Optional[int] = current
+        elif choice < 0.7:
+            current += 2
+            ec = current
+        elif choice < 0.8:
+            ec = rng.choice([None, 0])
+        else:
+            ec = rng.randint(-1, 5)
+        cells.append({"cell_type": "code", "source": source, "execution_count": ec})
+    return {"cells": cells}
+
+
+def check_same(nbs: list, use_numpy: Optional[bool]) -> None:
+    batch = extract_ec(nbs)
+    for strict in (True, False):
+        for no_exec in (True, False):
+            expected = [check_nb_ec(nb, strict, no_exec) for nb in nbs]
+            assert check_nb_ec_batch(nbs, strict, no_exec, use_numpy) == expected
+            assert check_ec_batch(batch, strict, no_exec, use_numpy) == expected
+
+
+def batch_nbs() -> list:
+    rng = random.Random(0)
+    nbs = [make_nb(rng) for _ in range(2000)]
+    nbs.append(read_nb("tests/test_nbs/test_nb_3_ec.ipynb"))
+    nbs.append(read_nb("tests/test_nbs/.test_nb_2_meta.ipynb"))
+    # not int64 execution counts
+    nbs.append(
+        {"cells": [{"cell_type": "code", "source": "x", "execution_count": 2**70}]}
+    )
+    nbs.append(
+        {"cells": [{"cell_type": "code", "source": "x", "execution_count": 1.0}]}
+    )
+    return nbs
+
+
+def test_check_nb_ec_batch():
+    """test check_nb_ec_batch, same results as check_nb_ec"""
+    check_same(batch_nbs(), use_numpy=False)
+    assert check_nb_ec_batch([]) == []
+    assert check_ec_batch(extract_ec([])) == []
+
+
+@pytest.mark.skipif(_numpy() is None, reason="NumPy not installed")
+def test_check_nb_ec_batch_numpy():
+    """test check_nb_ec_batch with NumPy"""
+    nbs = batch_nbs()
+    batch = extract_ec(nbs)
+    assert len(batch) == len(nbs)
+    assert sorted(batch.irregular) == [len(nbs) - 2, len(nbs) - 1]
+    check_same(nbs, use_numpy=True)
+    assert check_nb_ec_batch([], use_numpy=True) == []
@@ -1,4 +1,23 @@
-from nbmetaclean.check import check_nb_ec, check_nb_errors, check_nb_warnings
+from functools import partial
+
+import pytest
+
+from nbmetaclean.check import (
+    CHECKS,
+    CleanCheck,
+    EcCheck,
+    ErrorsCheck,
+    NbCheck,
+    WarningsCheck,
+    check_nb_ec,
+    check_nb_errors,
+    check_nb_warnings,
+    check_unique,
+    get_check,
+    register_check,
+    run_checks,
+)
+from nbmetaclean.clean import CleanConfig
 from nbmetaclean.helpers import read_nb
 
 
@@ -90,3 +109,80 @@ def test_check_nb_warnings():
     test_nb["cells"][2]["outputs"][0]["name"] = "stderr"
     result = check_nb_warnings(test_nb)
     assert not result
+
+
+def test_run_checks():
+    """test run_checks gives same verdicts as check functions"""
+    test_nb = read_nb("tests/test_nbs/test_nb_3_ec.ipynb")
+    checks = [EcCheck, ErrorsCheck, WarningsCheck]
+    assert run_checks(test_nb, checks) == {"ec": False, "err": True, "warn": True}
+    assert run_checks(test_nb, [partial(EcCheck, no_exec=True)]) == {"ec": True}
+
+    for ec in ((1, 2, 3), (1, 2, 4), (2, 3, 4), (1, 3, 2), (1, None, 2)):
+        for cell_num, value in zip((2, 3, 5), ec):
+            test_nb["cells"][cell_num]["execution_count"] = value
+        for strict in (True, False):
+            for no_exec in (True, False):
+                factory = partial(EcCheck, strict=strict, no_exec=no_exec)
+                assert run_checks(test_nb, [factory])["ec"] == check_nb_ec(
+                    test_nb, strict, no_exec
+                )
+
+    test_nb["cells"][2]["outputs"][0]["output_type"] = "stream"
+    test_nb["cells"][2]["outputs"][0]["name"] = "stderr"
+    assert run_checks(test_nb, checks)["warn"] is False
+    test_nb["cells"][2]["outputs"][0]["output_type"] = "error"
+    assert run_checks(test_nb, checks)["err"] is False
+
+
+def test_check_unique():
+    """test checks with same name are rejected"""
+    test_nb = read_nb("tests/test_nbs/test_nb_3_ec.ipynb")
+    check_unique([EcCheck, ErrorsCheck])
+    with pytest.raises(ValueError):
+        check_unique([EcCheck, partial(EcCheck, no_exec=True)])
+    with pytest.raises(ValueError):
+        run_checks(test_nb, [EcCheck, get_check("ec")])
+
+
+def test_clean_check():
+    """test CleanCheck"""
+    test_nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    assert get_check("clean") is CleanCheck
+    assert run_checks(test_nb, [CleanCheck]) == {"clean": False}
+    cfg = CleanConfig(clear_nb_metadata=False, clear_execution_count=False)
+    assert run_checks(test_nb, [partial(CleanCheck, cfg)]) == {"clean": True}
+    clean_nb = read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    assert run_checks(clean_nb, [CleanCheck, EcCheck]) == {"clean": True, "ec": False}
+
+
+def test_register_check():
+    """test custom check"""
+    calls = []
+
+    class MaxCellsCheck(NbCheck):
+        name = "max_cells"
+        message = "too many cells"
+
+        def start(self, nb):
+            return len(nb["cells"]) <= 2
+
+    @register_check
+    class FirstCellMarkdown(NbCheck):
+        name = "first_md"
+
+        def cell(self, cell):
+            calls.append(cell["cell_type"])
+            return cell["cell_type"] == "markdown"
+
+    test_nb = read_nb("tests/test_nbs/test_nb_3_ec.ipynb")
+    assert get_check("first_md") is FirstCellMarkdown
+    # traversal stopped after verdict
+    assert run_checks(test_nb, [MaxCellsCheck, FirstCellMarkdown]) == {
+        "max_cells": False,
+        "first_md": True,
+    }
+    assert calls == ["markdown"]
+    with pytest.raises(KeyError):
+        get_check("not_exists")
+    del CHECKS["first_md"]
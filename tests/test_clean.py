@@ -1,19 +1,29 @@
 import copy
+import io
 import os
+import pickle
 from pathlib import Path
 
+import pytest
 from pytest import CaptureFixture
 
 from nbmetaclean.clean import (
     NB_METADATA_PRESERVE_MASKS,
     CleanConfig,
+    _CleanRun,
     clean_cell,
     clean_nb,
+    clean_nb_bytes,
     clean_nb_file,
+    clean_nb_model,
+    compile_config,
     filter_meta_mask,
     filter_metadata,
+    is_clean,
 )
 from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.metrics import RunMetrics
+from nbmetaclean.progress import Progress
 
 
 def test_get_meta_by_mask():
@@ -353,3 +363,152 @@ def test_clean_nb_file_timestamp(tmp_path: Path):
     cleaned_stat = cleaned[0].stat()
     assert True
     assert cleaned_stat.st_mtime != nb_stat.st_mtime
+
+
+def test_compile_config(tmp_path: Path):
+    """test compile_config, clean with plan"""
+    plan = compile_config(CleanConfig())
+    assert not plan.empty
+    assert plan.nb_metadata_masks == NB_METADATA_PRESERVE_MASKS
+    assert len(plan.cell_steps) == 2  # execution_count, outputs
+    assert len(plan.output_steps) == 1
+    # plan can be pickled, used at other process
+    assert pickle.loads(pickle.dumps(plan)) == plan
+
+    plan = compile_config(CleanConfig(clear_outputs=True, clear_cell_metadata=True))
+    assert len(plan.cell_steps) == 3
+
+    nb_path = Path("tests/test_nbs/.test_nb_2_meta.ipynb")
+    plan = compile_config(CleanConfig())
+    nb = read_nb(nb_path)
+    assert clean_nb(nb, plan)
+    assert nb == read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    assert not clean_nb(nb, plan)
+
+    # nothing to clean
+    cfg = CleanConfig(clear_nb_metadata=False, clear_execution_count=False)
+    plan = compile_config(cfg)
+    assert plan.empty
+    assert not clean_nb(read_nb(nb_path), plan)
+    # files only opened, not parsed: not valid notebooks not reported
+    (tmp_path / "wrong.ipynb").write_text("wrong")
+    nb_paths = [nb_path, tmp_path / "wrong.ipynb", tmp_path / "not_exists.ipynb"]
+    reasons: dict[Path, str] = {}
+    progress = Progress(len(nb_paths), stream=io.StringIO())
+    metrics = RunMetrics("nbmetaclean")
+    cleaned, errors = clean_nb_file(
+        nb_paths, cfg, reasons=reasons, progress=progress, metrics=metrics
+    )
+    assert not cleaned
+    assert errors == [tmp_path / "not_exists.ipynb"]
+    assert reasons == {tmp_path / "not_exists.ipynb": "not found"}
+    assert progress.done == 3
+    assert metrics.notebooks["scanned"] == 3
+    assert metrics.notebooks["errored"] == 1
+
+
+def test_is_clean(tmp_path: Path):
+    """test is_clean - same verdict as clean_nb, notebook not changed"""
+    nb_1 = read_nb(Path("tests/test_nbs/.test_nb_2_meta.ipynb"))
+    nb_1["cells"][0]["attachments"] = {"img.png": {"image/png": "a" * 2000}}
+    nb_1["cells"][1]["metadata"] = {"tags": ["test"], "collapsed": True}
+    nb_2 = read_nb(Path("tests/test_nbs/test_nb_2_clean.ipynb"))
+    nb_3 = copy.deepcopy(nb_2)  # clean, except outputs
+    nb_3["cells"][1]["outputs"] = [
+        {
+            "output_type": "execute_result",
+            "execution_count": None,
+            "metadata": {"tags": ["test"]},
+            "data": {"text/plain": "1"},
+        },
+        {"output_type": "execute_result", "execution_count": 1, "metadata": {}},
+    ]
+    configs = [
+        CleanConfig(),
+        CleanConfig(clear_nb_metadata=False),
+        CleanConfig(clear_execution_count=False),
+        CleanConfig(clear_outputs=True),
+        CleanConfig(clear_cell_metadata=True),
+        CleanConfig(clear_cell_metadata=True, cell_metadata_preserve_mask=(("tags",),)),
+        CleanConfig(nb_metadata_preserve_mask=(("kernelspec",),)),
+        CleanConfig(nb_metadata_preserve_mask=(("*",),), clear_execution_count=False),
+        CleanConfig(nb_metadata_preserve_mask=(("kernelspec", "name"),)),
+        CleanConfig(store_path=tmp_path / "store", dry_run=True),
+    ]
+    for cfg in configs:
+        for nb in (nb_1, nb_2, nb_3):
+            for test_nb in (nb, copy.deepcopy(nb)):
+                cleaned = copy.deepcopy(test_nb)
+                changed = clean_nb(cleaned, cfg)
+                before = copy.deepcopy(test_nb)
+                assert is_clean(test_nb, cfg) is not changed, cfg
+                assert test_nb == before
+                assert is_clean(cleaned, compile_config(cfg))
+    assert not (tmp_path / "store").exists()
+
+
+def test_clean_nb_bytes():
+    """test clean_nb_bytes, clean_nb_model"""
+    data = Path("tests/test_nbs/.test_nb_2_meta.ipynb").read_bytes()
+    clean_data = Path("tests/test_nbs/test_nb_2_clean.ipynb").read_bytes()
+    result = clean_nb_bytes(data)
+    assert result == clean_data
+    # not changed - same object
+    assert clean_nb_bytes(clean_data) is clean_data
+
+    with pytest.raises(ValueError):
+        clean_nb_bytes(b"not json")
+
+    model = {
+        "type": "notebook",
+        "content": read_nb("tests/test_nbs/.test_nb_2_meta.ipynb"),
+    }
+    assert clean_nb_model(model, compile_config(CleanConfig()))
+    assert model["content"] == read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    assert not clean_nb_model(model)
+    assert not clean_nb_model({"type": "file", "content": "text"})
+    assert not clean_nb_model({"type": "notebook", "content": None})
+
+
+def test_clean_nb_file_dedupe_content(tmp_path: Path):
+    """test clean_nb_file with dedupe_content"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    clean = read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    nb_paths = [write_nb(nb, tmp_path / f"nb_{num}.ipynb") for num in range(3)]
+    nb_paths.append(write_nb(clean, tmp_path / "clean.ipynb"))
+    (tmp_path / "wrong.ipynb").write_text("wrong")
+    nb_paths.append(tmp_path / "wrong.ipynb")
+
+    cleaned, errors = clean_nb_file(
+        nb_paths, CleanConfig(dedupe_content=True, dry_run=True)
+    )
+    assert cleaned == nb_paths[:3]
+    assert errors == [tmp_path / "wrong.ipynb"]
+    assert read_nb(nb_paths[0]) == nb
+
+    cleaned, errors = clean_nb_file(nb_paths, CleanConfig(dedupe_content=True))
+    assert cleaned == nb_paths[:3]
+    for nb_path in nb_paths[:4]:
+        assert nb_path.read_bytes() == nb_paths[3].read_bytes()
+
+
+def test_dedupe_content_not_keeps_data(tmp_path: Path):
+    """test dedupe_content keeps small state per content, cleaned data copied from file"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    nb_paths = [write_nb(nb, tmp_path / f"nb_{num}.ipynb") for num in range(3)]
+    cfg = CleanConfig(dedupe_content=True)
+    run = _CleanRun(cfg, compile_config(cfg), [])
+    for nb_path in nb_paths[:2]:
+        run.process(nb_path)
+    assert run.cleaned == nb_paths[:2]
+    assert run.contents is not None and len(run.contents) == 1
+    for result in run.contents.values():
+        assert result.written == nb_paths[0]
+        assert all(not isinstance(value, bytes) or len(value) == 32 for value in result)
+
+    # first copy changed - content cleaned again
+    nb_paths[0].write_text("changed")
+    run.process(nb_paths[2])
+    run.close()
+    assert run.cleaned == nb_paths
+    assert nb_paths[2].read_bytes() == nb_paths[1].read_bytes()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean import dataset
+from nbmetaclean.batch import _numpy
+from nbmetaclean.check import EcCheck, ErrorsCheck
+from nbmetaclean.clean import CleanConfig, compile_config
+from nbmetaclean.dataset import _process_batch, process_dataset, process_record
+from nbmetaclean.helpers import nb_to_json, read_nb
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def make_jsonl(path: Path, num: int) -> None:
+    """JSONL with `num` records, every 5th notebook as json string, last one not a notebook."""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    with open(path, "w", encoding="utf-8") as fh:
+        for i in range(num - 1):
+            notebook = nb_to_json(nb) if i % 5 == 0 else nb
+            fh.write(json.dumps({"id": i, "notebook": notebook}) + "\n")
+        fh.write(json.dumps({"id": num - 1, "notebook": "not json"}) + "\n")
+
+
+def read_jsonl(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_process_record():
+    """test process_record"""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    record = {"notebook": nb}
+    changed, reason, results = process_record(
+        record, "notebook", checks=[EcCheck, ErrorsCheck]
+    )
+    assert not changed
+    assert reason is None
+    assert results == {"ec": True, "err": True}
+    assert record["nbcheck"] == results
+
+    record = {"notebook": nb_to_json(nb)}
+    changed, reason, results = process_record(
+        record, "notebook", compile_config(CleanConfig())
+    )
+    assert changed
+    assert reason is None
+    assert results == {}
+    assert isinstance(record["notebook"], str)
+    assert "kernelspec" not in json.loads(record["notebook"])["metadata"]
+
+    assert process_record({"notebook": "{}"}, "notebook") == (
+        False,
+        "not a notebook",
+        {},
+    )
+    assert process_record({}, "notebook") == (False, "not a notebook", {})
+    assert process_record({"notebook": "{"}, "notebook")[1] == "invalid json"
+
+
+@pytest.mark.skipif(_numpy() is None, reason="NumPy not installed")
+def test_process_batch_ec_numpy(monkeypatch: pytest.MonkeyPatch):
+    """ec check for whole batch with NumPy, same result as per record check."""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    wrong = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    wrong["cells"][1]["execution_count"] = 5
+    items = [
+        json.dumps({"notebook": nb}),
+        json.dumps({"notebook": nb_to_json(wrong)}),
+        "not json",
+        {"notebook": "not a notebook"},
+        {"notebook": nb},
+    ]
+    for ec in (EcCheck, partial(EcCheck, strict=False)):
+        checks = [ErrorsCheck, ec]
+        batch_result = _process_batch(items, "notebook", None, checks, "nbcheck")
+        monkeypatch.setattr(dataset, "_numpy", lambda: None)
+        expected = _process_batch(items, "notebook", None, checks, "nbcheck")
+        monkeypatch.undo()
+        assert batch_result == expected
+        assert [list(results) for *_, results in batch_result][:2] == [
+            ["err", "ec"],
+            ["err", "ec"],
+        ]
+    assert [results.get("ec") for *_, results in batch_result] == [
+        True,
+        True,
+        None,
+        None,
+        True,
+    ]
+
+
+def test_process_dataset_jsonl(tmp_path: Path):
+    """test process_dataset with JSONL, workers"""
+    source = tmp_path / "source.jsonl"
+    make_jsonl(source, 12)
+    output = tmp_path / "out.jsonl"
+    result = process_dataset(
+        source, output, clean_cfg=CleanConfig(), checks=[EcCheck], batch_size=5
+    )
+    assert result.records == 12
+    assert result.offset == 12
+    assert result.cleaned == 11
+    assert result.errors == {11: "invalid json"}
+    assert result.failed["ec"] == 11  # cleaned, not executed
+
+    records = read_jsonl(output)
+    assert [record["id"] for record in records] == list(range(12))
+    assert records[0]["notebook"].startswith("{")  # json string kept as string
+    assert "kernelspec" not in json.loads(records[0]["notebook"])["metadata"]
+    assert "kernelspec" not in records[1]["notebook"]["metadata"]
+    assert records[1]["nbcheck"] == {"ec": False}
+    assert records[11] == {"id": 11, "notebook": "not json"}
+
+    output_workers = tmp_path / "out_workers.jsonl"
+    result_workers = process_dataset(
+        source,
+        output_workers,
+        clean_cfg=CleanConfig(),
+        checks=[EcCheck],
+        batch_size=2,
+        workers=2,
+    )
+    assert result_workers == result
+    assert output_workers.read_bytes() == output.read_bytes()
+
+    # no clean, no checks - records written unchanged
+    process_dataset(source, output)
+    assert output.read_bytes() == source.read_bytes()
+
+
+def test_process_dataset_jsonl_resume(tmp_path: Path):
+    """test process_dataset resume, partial write dropped"""
+    source = tmp_path / "source.jsonl"
+    make_jsonl(source, 12)
+    expected = tmp_path / "expected.jsonl"
+    process_dataset(source, expected, clean_cfg=CleanConfig(), batch_size=5)
+
+    part = tmp_path / "part.jsonl"
+    part.write_text(
+        "".join(source.read_text(encoding="utf-8").splitlines(True)[:5]),
+        encoding="utf-8",
+    )
+    output = tmp_path / "out.jsonl"
+    result = process_dataset(part, output, clean_cfg=CleanConfig(), batch_size=5)
+    assert result.offset == 5
+    with open(output, "a", encoding="utf-8") as fh:
+        fh.write('{"id": 5, "noteb')  # interrupted write
+
+    result = process_dataset(
+        source, output, clean_cfg=CleanConfig(), batch_size=5, resume=True
+    )
+    assert result.records == 7
+    assert result.offset == 12
+    assert result.errors == {11: "invalid json"}
+    assert output.read_bytes() == expected.read_bytes()
+
+    # without resume - start from beginning
+    result = process_dataset(source, output, clean_cfg=CleanConfig(), batch_size=5)
+    assert result.records == 12
+    assert output.read_bytes() == expected.read_bytes()
+
+
+def test_process_dataset_sqlite(tmp_path: Path):
+    """test process_dataset with SQLite"""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    source = tmp_path / "source.db"
+    conn = sqlite3.connect(source)
+    conn.execute("CREATE TABLE notebooks (id INTEGER, path TEXT, notebook TEXT)")
+    conn.executemany(
+        "INSERT INTO notebooks VALUES (?, ?, ?)",
+        [(i, f"nb_{i}.ipynb", nb_to_json(nb)) for i in range(7)]
+        + [(7, "bad.ipynb", "{")],
+    )
+    conn.commit()
+    conn.close()
+
+    output = tmp_path / "out.db"
+    result = process_dataset(
+        source, output, clean_cfg=CleanConfig(), checks=[EcCheck], batch_size=3
+    )
+    assert result.records == 8
+    assert result.cleaned == 7
+    assert result.errors == {7: "invalid json"}
+
+    conn = sqlite3.connect(output)
+    rows = conn.execute(
+        "SELECT id, path, notebook, nbcheck FROM notebooks ORDER BY rowid"
+    ).fetchall()
+    progress = conn.execute("SELECT * FROM _nbmetaclean_progress").fetchall()
+    conn.close()
+    assert len(rows) == 8
+    assert rows[0][:2] == (0, "nb_0.ipynb")
+    assert "kernelspec" not in json.loads(rows[0][2])["metadata"]
+    assert json.loads(rows[0][3]) == {"ec": False}
+    assert rows[7] == (7, "bad.ipynb", "{", None)
+    assert progress == [("notebooks", 8)]
+
+    # resume after finished run - nothing to do
+    result = process_dataset(
+        source, output, clean_cfg=CleanConfig(), checks=[EcCheck], resume=True
+    )
+    assert result.records == 0
+    assert result.offset == 8
+    conn = sqlite3.connect(output)
+    assert conn.execute("SELECT count(*) FROM notebooks").fetchone() == (8,)
+    conn.close()
+
+
+def test_app_dataset(tmp_path: Path):
+    """test app dataset"""
+    source = tmp_path / "source.jsonl"
+    make_jsonl(source, 4)
+    output = tmp_path / "out.jsonl"
+    res = subprocess.run(
+        ["python", "-m", "nbmetaclean.app_clean", "dataset", source, output, "--ec"],
+        capture_output=True,
+        check=False,
+    )
+    assert res.returncode == 1
+    assert res.stdout.decode("utf-8").splitlines() == [
+        "records: 4, cleaned: 3, with errors: 1, offset: 4",
+        "failed ec check: 3",
+        "- record 3: invalid json",
+    ]
+    assert read_jsonl(output)[0]["nbcheck"] == {"ec": False}
+
+    # clean options shared with nbmetaclean
+    res = subprocess.run(
+        ["python", "-m", "nbmetaclean.app_clean", "dataset", source, output]
+        + ["--dont_clear_nb_metadata", "--transform", "not_exists"],
+        capture_output=True,
+        check=False,
+    )
+    assert res.returncode == 1
+    assert res.stdout.decode("utf-8").startswith("Transform not found")
@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+from nbmetaclean import dircache
+from nbmetaclean.dircache import DirCache, list_dir
+from nbmetaclean.helpers import get_nb_names, get_nb_names_from_list
+
+
+def make_tree(path: Path) -> None:
+    """create dirs with notebooks"""
+    for name in ("nb_1.ipynb", "sub/nb_2.ipynb", "sub/.nb_3.ipynb", "file.txt"):
+        (path / name).parent.mkdir(exist_ok=True)
+        (path / name).write_text("")
+
+
+def test_list_dir(tmp_path: Path):
+    """test list_dir"""
+    make_tree(tmp_path)
+    (tmp_path / "nbs.zip").write_text("")
+    files, dirs = list_dir(tmp_path)
+    assert sorted(files) == ["nb_1.ipynb", "nbs.zip"]
+    assert dirs == ["sub"]
+
+
+def test_dir_cache(tmp_path: Path, monkeypatch):
+    """test DirCache"""
+    nbs_path = tmp_path / "nbs"
+    nbs_path.mkdir()
+    make_tree(nbs_path)
+    cache_path = tmp_path / "cache.json"
+    # trust all listings
+    monkeypatch.setattr(dircache, "RACY_WINDOW_NS", -(10**12))
+
+    cache = DirCache(cache_path)
+    names = get_nb_names(nbs_path, cache=cache)
+    assert sorted(names) == sorted(get_nb_names(nbs_path))
+    assert cache.misses == 2
+    cache.save()
+
+    cache = DirCache(cache_path)
+    names = get_nb_names_from_list([nbs_path], hidden=True, cache=cache)
+    assert len(names) == 3
+    assert cache.hits == 2
+    assert cache.misses == 0
+
+    # add notebook, only changed dir listed
+    (nbs_path / "sub" / "nb_4.ipynb").write_text("")
+    stat = (nbs_path / "sub").stat()
+    os.utime(nbs_path / "sub", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache = DirCache(cache_path)
+    names = get_nb_names(nbs_path, cache=cache)
+    assert len(names) == 3
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_dir_cache_racy(tmp_path: Path):
+    """listing taken right after change is not trusted"""
+    (tmp_path / "nbs").mkdir()
+    make_tree(tmp_path / "nbs")
+    cache = DirCache(tmp_path / "cache.json")
+    get_nb_names(tmp_path / "nbs", cache=cache)
+    cache.save()
+    cache = DirCache(tmp_path / "cache.json")
+    get_nb_names(tmp_path / "nbs", cache=cache)
+    assert cache.hits == 0
+    assert cache.misses == 2
+
+    # broken cache file
+    (tmp_path / "cache.json").write_text("wrong")
+    assert DirCache(tmp_path / "cache.json").entries == {}
@@ -1,6 +1,14 @@
+import io
+import os
 from pathlib import Path
 
-from nbmetaclean.helpers import get_nb_names, get_nb_names_from_list, is_notebook
+from nbmetaclean.helpers import (
+    NbNamesStream,
+    get_nb_names,
+    get_nb_names_from_list,
+    is_notebook,
+    read_paths,
+)
 
 
 def test_is_notebook():
@@ -140,3 +148,54 @@ def test_get_nb_names_from_list():
     assert len(names) == 4
     names = get_nb_names_from_list("wrong_name")
     assert len(names) == 0
+
+
+def test_get_nb_names_dedupe(tmp_path: Path):
+    """test get_nb_names_from_list, overlapping paths, links and symlink cycle"""
+    nbs = tmp_path / "nbs"
+    (nbs / "sub").mkdir(parents=True)
+    (nbs / "nb_1.ipynb").write_text("{}")
+    (nbs / "sub" / "nb_2.ipynb").write_text("{}")
+
+    files = get_nb_names_from_list([tmp_path, nbs, nbs / "sub" / "nb_2.ipynb"])
+    assert sorted(files) == [nbs / "nb_1.ipynb", nbs / "sub" / "nb_2.ipynb"]
+    files = get_nb_names_from_list([nbs / "sub", tmp_path])
+    assert sorted(files) == [nbs / "nb_1.ipynb", nbs / "sub" / "nb_2.ipynb"]
+
+    # hardlink to same notebook
+    os.link(nbs / "nb_1.ipynb", nbs / "nb_1_link.ipynb")
+    # symlink cycle
+    (nbs / "sub" / "loop").symlink_to(nbs, target_is_directory=True)
+    files = get_nb_names(tmp_path)
+    assert len(files) == 2
+
+
+def test_read_paths():
+    """test read_paths: newline, NUL separated, chunks"""
+    paths = ["a.ipynb", "dir/b c.ipynb", "d\u00e9.ipynb"]
+    data = "\n".join(paths).encode("utf-8")
+    assert list(read_paths(io.BytesIO(data))) == paths
+    assert list(read_paths(io.BytesIO(data + b"\n\n"), chunk_size=3)) == paths
+    data = "\r\n".join(paths).encode("utf-8") + b"\r\n"
+    assert list(read_paths(io.BytesIO(data), chunk_size=4)) == paths
+    paths.append("new\nline.ipynb")
+    data = "\0".join(paths).encode("utf-8") + b"\0"
+    assert list(read_paths(io.BytesIO(data))) == paths
+    assert list(read_paths(io.BytesIO(data), chunk_size=5)) == paths
+    assert list(read_paths(io.BytesIO(b""))) == []
+
+    # streamed: paths read as needed
+    stream = io.BytesIO(b"a\nb\nc\n")
+    paths_iter = read_paths(stream, chunk_size=2)
+    assert next(paths_iter) == "a"
+    assert stream.tell() == 2
+
+
+def test_nb_names_stream():
+    """test NbNamesStream"""
+    path = Path("tests/test_nbs")
+    stream = NbNamesStream(iter([path / "test_nb_1.ipynb", path, "not_exists"]))
+    names = list(stream)
+    assert sorted(names) == sorted(get_nb_names_from_list([path]))
+    assert stream.count == len(names)
+    assert stream.seconds > 0
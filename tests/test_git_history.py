@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+from nbmetaclean.check import check_nb_errors
+from nbmetaclean.clean import CleanConfig
+from nbmetaclean.git_history import (
+    GitBlobReader,
+    history_pathspec,
+    iter_nb_changes,
+    scan_history,
+)
+from nbmetaclean.helpers import read_nb, write_nb
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def git(repo: Path, *args: str) -> str:
+    """run git command at repo"""
+    result = subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout.decode("utf-8").strip()
+
+
+def make_repo(repo: Path) -> list[str]:
+    """create repo with three commits, return commits from newest"""
+    git(repo, "init", "-q")
+    nb = read_nb(example_nbs_path / "test_nb_2_clean.ipynb")
+    write_nb(nb, repo / "nb_1.ipynb")
+    write_nb(nb, repo / "nb_2.ipynb")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "first")
+
+    nb["cells"][1]["outputs"][0]["output_type"] = "error"
+    write_nb(nb, repo / "nb_1.ipynb")
+    (repo / "wrong.ipynb").write_text("wrong")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "second")
+
+    (repo / "nb_2.ipynb").unlink()
+    (repo / "sub").mkdir()
+    write_nb(nb, repo / "sub" / "nb_3.ipynb")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "third")
+    return git(repo, "log", "--format=%H").split()
+
+
+def test_iter_nb_changes(tmp_path: Path):
+    """test iter_nb_changes, GitBlobReader"""
+    commits = make_repo(tmp_path)
+    changes = list(iter_nb_changes("HEAD", repo=tmp_path))
+    assert [(commit, path) for commit, path, _ in changes] == [
+        (commits[0], "sub/nb_3.ipynb"),
+        (commits[1], "nb_1.ipynb"),
+        (commits[1], "wrong.ipynb"),
+        (commits[2], "nb_1.ipynb"),
+        (commits[2], "nb_2.ipynb"),
+    ]
+    # same content - same blob
+    assert changes[0][2] == changes[1][2]
+    assert changes[3][2] == changes[4][2]
+
+    # not ascii and spaces at names, not quoted
+    write_nb(
+        read_nb(example_nbs_path / "test_nb_2_clean.ipynb"),
+        tmp_path / "ноутбук 1.ipynb",
+    )
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "not ascii")
+    changes = list(iter_nb_changes("HEAD~1..", repo=tmp_path))
+    assert [path for _, path, _ in changes] == ["ноутбук 1.ipynb"]
+
+    # not utf-8 name
+    name = os.fsdecode(b"nb_\xff.ipynb")
+    write_nb(read_nb(example_nbs_path / "test_nb_2_clean.ipynb"), tmp_path / name)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "not utf-8")
+    changes = list(iter_nb_changes("HEAD~1..", repo=tmp_path))
+    assert [path for _, path, _ in changes] == [name]
+    assert (tmp_path / changes[0][1]).is_file()
+
+    changes = list(iter_nb_changes("HEAD~3..HEAD~2", ["sub/*.ipynb"], repo=tmp_path))
+    assert [path for _, path, _ in changes] == ["sub/nb_3.ipynb"]
+    assert history_pathspec([".", "nb.ipynb"]) == ["./*.ipynb", "nb.ipynb"]
+
+    with GitBlobReader(tmp_path) as reader:
+        assert reader.read(changes[0][2]).startswith(b"{")
+        assert reader.read("0" * 40) is None
+        assert reader.read(changes[0][2]).startswith(b"{")
+
+
+def test_scan_history(tmp_path: Path):
+    """test scan_history"""
+    commits = make_repo(tmp_path)
+    results = scan_history(
+        "HEAD",
+        {"errors": check_nb_errors},
+        clean_cfg=CleanConfig(),
+        repo=tmp_path,
+    )
+    assert [(res.commit, res.path, res.failed) for res in results] == [
+        (commits[0], "sub/nb_3.ipynb", ("errors",)),
+        (commits[1], "nb_1.ipynb", ("errors",)),
+        (commits[1], "wrong.ipynb", ("read_error",)),
+        (commits[2], "nb_1.ipynb", ()),
+        (commits[2], "nb_2.ipynb", ()),
+    ]
+
+    results = scan_history(
+        "HEAD",
+        {},
+        clean_cfg=CleanConfig(clear_outputs=True),
+        repo=tmp_path,
+    )
+    assert results[0].failed == ("not_clean",)
+    assert results[2].failed == ("read_error",)
+    assert results[2].reason == "invalid json"
+    assert results[0].reason is None
+    assert results[3].failed == ("not_clean",)
+
+    # valid json, not a notebook
+    (tmp_path / "empty.ipynb").write_text("{}")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "empty")
+    results = scan_history("HEAD~1..", {}, repo=tmp_path)
+    assert [(res.path, res.failed, res.reason) for res in results] == [
+        ("empty.ipynb", ("read_error",), "not a notebook")
+    ]
+
+
+def test_app_check_git_history(tmp_path: Path):
+    """test nbcheck `--git_history` option"""
+    commits = make_repo(tmp_path)
+    run_result = subprocess.run(
+        ["python", "-m", "nbmetaclean.app_check", "--err", "--git_history", "HEAD"],
+        capture_output=True,
+        check=False,
+        cwd=tmp_path,
+    )
+    assert run_result.returncode == 1
+    res_out = run_result.stdout.decode("utf-8")
+    assert res_out == (
+        f"commit {commits[0]}:\n"
+        "- sub/nb_3.ipynb: errors in outputs\n"
+        f"commit {commits[1]}:\n"
+        "- nb_1.ipynb: errors in outputs\n"
+        "- wrong.ipynb: read error: invalid json\n"
+    )
+
+
+def test_app_check_git_history_registered(tmp_path: Path):
+    """test nbcheck `--git_history` with registered checks, `--archives` rejected"""
+    commits = make_repo(tmp_path)
+    cmd = ["python", "-m", "nbmetaclean.app_check", "--git_history", "HEAD~1.."]
+    run_result = subprocess.run(
+        [*cmd, "--check", "err"], capture_output=True, check=False, cwd=tmp_path
+    )
+    assert run_result.returncode == 1
+    assert run_result.stdout.decode("utf-8") == (
+        f"commit {commits[0]}:\n- sub/nb_3.ipynb: errors in outputs\n"
+    )
+
+    run_result = subprocess.run(
+        [*cmd, "--err", "--archives"], capture_output=True, check=False, cwd=tmp_path
+    )
+    assert run_result.returncode == 1
+    assert run_result.stdout.decode("utf-8").startswith("Option --archives can not")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+from nbmetaclean.helpers import get_nb_names, read_nb, write_nb
+from nbmetaclean.index import (
+    load_index,
+    nb_record,
+    query,
+    refresh_index,
+    save_index,
+    summary,
+)
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def test_nb_record():
+    """test nb_record"""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    record = nb_record(nb)
+    assert record["cells"] == {"markdown": 1, "code": 1}
+    assert record["output_bytes"] == {"text/plain": 1}
+    assert record["execution_count"] == "all"
+    assert record["kernelspec"] == "python3"
+    assert "language_info" in record["metadata_keys"]
+
+    record = nb_record(read_nb(example_nbs_path / "test_nb_3_ec.ipynb"))
+    assert record["execution_count"] == "none"
+
+
+def test_refresh_index(tmp_path: Path):
+    """test refresh_index, load, save, summary, query"""
+    nbs_path = tmp_path / "nbs"
+    (nbs_path / "sub").mkdir(parents=True)
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    write_nb(nb, nbs_path / "nb_1.ipynb")
+    write_nb(nb, nbs_path / "sub" / "nb_2.ipynb")
+    (nbs_path / "wrong.ipynb").write_text("wrong")
+    index_path = tmp_path / "index.jsonl"
+
+    records, parsed = refresh_index(get_nb_names(nbs_path), load_index(index_path))
+    assert parsed == 3
+    save_index(records, index_path)
+    records = load_index(index_path)
+    assert len(records) == 3
+
+    # nothing changed
+    records, parsed = refresh_index(get_nb_names(nbs_path), records)
+    assert parsed == 0
+
+    # changed and removed notebook
+    nb["cells"][1]["execution_count"] = None
+    nb_path = write_nb(nb, nbs_path / "nb_1.ipynb")
+    stat = nb_path.stat()
+    os.utime(nb_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    (nbs_path / "sub" / "nb_2.ipynb").unlink()
+    records, parsed = refresh_index(get_nb_names(nbs_path), records)
+    assert parsed == 1
+    assert len(records) == 2
+
+    result = summary(records.values(), by="dir")
+    assert result["notebooks"] == 2
+    assert result["errors"] == 1
+    assert result["cells"] == {"markdown": 1, "code": 1}
+    assert result["groups"] == {
+        nbs_path.as_posix(): {"notebooks": 1, "size": stat.st_size, "output_bytes": 1}
+    }
+    assert list(summary(records.values(), by="ec")["groups"]) == ["none"]
+
+    assert len(query(records.values(), kernel="python3")) == 1
+    assert not query(records.values(), kernel="julia")
+    assert not query(records.values(), ec="all")
+    assert not query(records.values(), metadata_key="some key")
+    assert len(query(records.values(), min_output_bytes=1)) == 1
+
+
+def test_refresh_index_roots(tmp_path: Path):
+    """test refresh_index prunes only under refreshed roots"""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    (tmp_path / "nbs_1").mkdir()
+    (tmp_path / "nbs_2").mkdir()
+    nb_1 = write_nb(nb, tmp_path / "nbs_1" / "nb.ipynb")
+    nb_2 = write_nb(nb, tmp_path / "nbs_2" / "nb.ipynb")
+    records, _ = refresh_index([nb_1, nb_2], {})
+    assert len(records) == 2
+
+    # other root kept
+    records, parsed = refresh_index([nb_1], records, [tmp_path / "nbs_1"])
+    assert parsed == 0
+    assert list(records) == [nb_2.as_posix(), nb_1.as_posix()]
+
+    # removed notebook at refreshed root and outside
+    nb_1.unlink()
+    records, _ = refresh_index([], records, [tmp_path / "nbs_1"])
+    assert list(records) == [nb_2.as_posix()]
+    nb_2.unlink()
+    records, _ = refresh_index([], records, [tmp_path / "nbs_1"])
+    assert not records
+
+
+def test_app_index(tmp_path: Path):
+    """test `nbmetaclean index` command"""
+    write_nb(read_nb(example_nbs_path / "test_nb_2_clean.ipynb"), tmp_path / "nb.ipynb")
+
+    def run(*args: str) -> tuple[int, str]:
+        result = subprocess.run(
+            ["python", "-m", "nbmetaclean.app_clean", "index", *args],
+            capture_output=True,
+            check=False,
+            cwd=tmp_path,
+        )
+        return result.returncode, result.stdout.decode("utf-8")
+
+    assert run("refresh") == (0, "indexed: 1 notebooks, parsed: 1\n")
+    assert run("refresh", ".") == (0, "indexed: 1 notebooks, parsed: 0\n")
+    code, out = run("summary", "--by", "kernel")
+    assert code == 0
+    assert '"None"' in out  # clean notebook, no kernelspec
+    assert run("query", "--ec", "none") == (0, "nb.ipynb\n")
+    assert run("query", "--ec", "all") == (1, "")
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from nbmetaclean import clean
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.journal import Journal, file_stat, load_journal
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def test_journal(tmp_path: Path):
+    """test Journal: add, done, load, interrupted write, config change"""
+    journal_path = tmp_path / "journal.jsonl"
+    nb_path = tmp_path / "nb.ipynb"
+    nb_path.write_text("{}", encoding="utf-8")
+    journal = Journal(journal_path, "cfg")
+    assert journal.done(nb_path) is None
+    journal.add(nb_path, [nb_path], {}, [])
+    journal.add(
+        tmp_path / "missing.ipynb", [], {tmp_path / "missing.ipynb": "not found"}, []
+    )
+    journal.close()
+
+    config, entries, size = load_journal(journal_path)
+    assert config == "cfg"
+    assert size == journal_path.stat().st_size
+    assert entries[str(nb_path)].stat == file_stat(nb_path)
+    assert entries[str(nb_path)].cleaned == [str(nb_path)]
+
+    with open(journal_path, "ab") as fh:
+        fh.write(b'{"path": "x", "st')  # interrupted write
+    assert load_journal(journal_path)[2] == size
+
+    journal = Journal(journal_path, "cfg", resume=True)
+    assert journal.done(nb_path) is not None
+    assert journal.done(tmp_path / "missing.ipynb") is None  # no stat, processed again
+    journal.add(nb_path, [], {}, [])
+    journal.close()
+    config, entries, _ = load_journal(journal_path)
+    assert entries[str(nb_path)].cleaned == []  # last entry wins
+    assert len(journal_path.read_text(encoding="utf-8").splitlines()) == 4
+
+    nb_path.write_text('{"cells": []}', encoding="utf-8")
+    journal = Journal(journal_path, "cfg", resume=True)
+    assert journal.done(nb_path) is None  # changed
+    journal.close()
+
+    journal = Journal(journal_path, "other", resume=True)
+    assert journal.entries == {}
+    journal.close()
+    assert load_journal(journal_path) == ("other", {}, journal_path.stat().st_size)
+
+
+def test_clean_nb_file_resume(tmp_path: Path, monkeypatch):
+    """test clean_nb_file with journal and resume"""
+    nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nbs = [tmp_path / f"nb_{num}.ipynb" for num in range(3)]
+    for nb_path in nbs:
+        write_nb(nb, nb_path)
+    bad_nb = tmp_path / "bad.ipynb"
+    bad_nb.write_text("{", encoding="utf-8")
+    journal_path = tmp_path / "journal.jsonl"
+    cfg = CleanConfig(journal_path=journal_path)
+
+    # interrupted run: first two notebooks processed
+    cleaned, errors = clean_nb_file(nbs[:1] + [bad_nb], cfg)
+    assert cleaned == nbs[:1]
+    assert errors == [bad_nb]
+
+    processed: list[Path] = []
+    clean_file = clean._CleanRun.clean_file
+
+    def clean_file_spy(self, filename: Path) -> None:
+        processed.append(filename)
+        clean_file(self, filename)
+
+    monkeypatch.setattr(clean._CleanRun, "clean_file", clean_file_spy)
+    reasons: dict[Path, str] = {}
+    cfg_resume = CleanConfig(journal_path=journal_path, resume=True)
+    cleaned, errors = clean_nb_file(nbs + [bad_nb], cfg_resume, reasons=reasons)
+    assert processed == nbs[1:]
+    assert cleaned == nbs
+    assert errors == [bad_nb]
+    assert reasons == {bad_nb: "invalid json"}
+
+    # changed notebook processed again, other config - all processed
+    write_nb(nb, nbs[0])
+    processed.clear()
+    cleaned, errors = clean_nb_file(nbs, cfg_resume)
+    assert processed == nbs[:1]
+    assert cleaned == nbs
+    processed.clear()
+    clean_nb_file(
+        nbs, CleanConfig(journal_path=journal_path, resume=True, dry_run=True)
+    )
+    assert processed == nbs
+
+    # without resume journal started again
+    processed.clear()
+    cleaned, errors = clean_nb_file(nbs, cfg)
+    assert processed == nbs
+    assert cleaned == []
@@ -0,0 +1,20 @@
+from nbmetaclean.clean import CleanConfig
+from nbmetaclean.helpers import read_nb
+from nbmetaclean.jupyter_hook import make_pre_save_hook, pre_save_hook
+
+
+def test_pre_save_hook():
+    """test pre_save_hook"""
+    model = {
+        "type": "notebook",
+        "content": read_nb("tests/test_nbs/.test_nb_2_meta.ipynb"),
+    }
+    pre_save_hook(model=model, path="nb.ipynb", contents_manager=None)
+    assert model["content"] == read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+
+    model = {"type": "notebook", "content": read_nb("tests/test_nbs/test_nb_1.ipynb")}
+    hook = make_pre_save_hook(CleanConfig(clear_outputs=True))
+    hook(model=model, path="nb.ipynb", contents_manager=None)
+    for cell in model["content"]["cells"]:
+        if cell["cell_type"] == "code":
+            assert cell["outputs"] == []
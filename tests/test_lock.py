@@ -0,0 +1,50 @@
+import fcntl
+from pathlib import Path
+
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.lock import nb_lock
+
+
+def test_nb_lock(tmp_path: Path):
+    """test nb_lock"""
+    test_file = tmp_path / "test.ipynb"
+    test_file.write_text("{}")
+    with nb_lock(test_file) as locked:
+        assert locked
+        with nb_lock(test_file, timeout=0) as locked_again:
+            assert not locked_again
+        with nb_lock(test_file, timeout=0.1) as locked_again:
+            assert not locked_again
+    with nb_lock(test_file, timeout=0) as locked:
+        assert locked
+
+    # not exists - nothing to lock
+    with nb_lock(tmp_path / "not_exists.ipynb", timeout=0) as locked:
+        assert locked
+
+
+def test_clean_nb_file_locked(tmp_path: Path):
+    """test clean_nb_file with locked notebook"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    test_nb_path = write_nb(nb, tmp_path / "test_nb.ipynb")
+
+    with open(test_nb_path, "rb") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        cleaned, errors = clean_nb_file(
+            test_nb_path, CleanConfig(lock=True, lock_timeout=0)
+        )
+        assert not cleaned
+        assert errors == [test_nb_path]
+
+        cleaned, errors = clean_nb_file(
+            test_nb_path, CleanConfig(lock=True, lock_timeout=0, skip_locked=True)
+        )
+        assert not cleaned
+        assert not errors
+        assert read_nb(test_nb_path) == nb
+        fcntl.flock(fh, fcntl.LOCK_UN)
+
+    cleaned, errors = clean_nb_file(test_nb_path, CleanConfig(lock=True))
+    assert cleaned == [test_nb_path]
+    assert not errors
@@ -0,0 +1,78 @@
+import pickle
+
+from nbmetaclean.clean import CleanConfig, clean_nb, filter_metadata
+from nbmetaclean.helpers import read_nb
+from nbmetaclean.mask import MaskMatcher, compile_masks, is_pattern, parse_mask
+
+
+def test_parse_mask():
+    """test parse_mask, is_pattern"""
+    assert parse_mask("language_info.name") == ("language_info", "name")
+    assert parse_mask("*.tags") == ("*", "tags")
+    assert parse_mask("/^celltoolbar$/") == ("/^celltoolbar$/",)
+    assert parse_mask("/^a.b$/.c") == ("/^a.b$/", "c")
+    assert parse_mask("some key") == ("some key",)
+    assert is_pattern("*")
+    assert is_pattern("jupytext*")
+    assert is_pattern("/^tags$/")
+    assert not is_pattern("tags")
+    assert not is_pattern("/")
+
+
+def test_mask_matcher():
+    """test MaskMatcher"""
+    meta = {
+        "jupytext": {"formats": "ipynb,py", "version": 1},
+        "celltoolbar": "Tags",
+        "celltoolbar_2": "Tags",
+        "kernelspec": {"name": "python3", "tags": ["a"]},
+        "language_info": {"name": "python", "version": "3.11"},
+        "none_key": None,
+    }
+    matcher = MaskMatcher((("jupytext", "*"), ("/^celltoolbar$/",)))
+    assert matcher.filter(meta) == {
+        "jupytext": {"formats": "ipynb,py", "version": 1},
+        "celltoolbar": "Tags",
+    }
+    # regex searched at key, glob matches whole key
+    matcher = MaskMatcher((("/toolbar/",), ("jupy*",), ("text",)))
+    assert matcher.filter(meta) == {
+        "jupytext": {"formats": "ipynb,py", "version": 1},
+        "celltoolbar": "Tags",
+        "celltoolbar_2": "Tags",
+    }
+    assert MaskMatcher((("*text",),)).child("jupytext_x") is None
+    matcher = MaskMatcher((("*", "tags"), ("language_info", "name")))
+    assert matcher.filter(meta) == {
+        "kernelspec": {"tags": ["a"]},
+        # nothing preserved at value or not dict - keep whole value
+        "jupytext": {"formats": "ipynb,py", "version": 1},
+        "celltoolbar": "Tags",
+        "celltoolbar_2": "Tags",
+        "language_info": {"name": "python"},
+    }
+    # masks with same key merged
+    matcher = MaskMatcher((("language_info", "name"), ("language_info", "version")))
+    assert matcher.filter(meta) == {"language_info": meta["language_info"]}
+    assert MaskMatcher(((),)).filter(meta) is meta
+    # input not changed
+    assert meta["kernelspec"] == {"name": "python3", "tags": ["a"]}
+
+    assert compile_masks((("a",),)) is compile_masks((("a",),))
+    assert pickle.loads(pickle.dumps(matcher)) == matcher
+
+
+def test_clean_nb_pattern_mask():
+    """test clean with pattern masks"""
+    nb = read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    nb["metadata"]["jupytext"] = {"formats": "ipynb,py"}
+    nb["cells"][1]["metadata"] = {"tags": ["hide"], "collapsed": True}
+    cfg = CleanConfig(
+        clear_cell_metadata=True,
+        nb_metadata_preserve_mask=(("jupytext", "*"),),
+        cell_metadata_preserve_mask=(("/^ta.s$/",),),
+    )
+    assert clean_nb(nb, cfg)
+    assert nb["metadata"]["jupytext"] == {"formats": "ipynb,py"}
+    assert nb["cells"][1]["metadata"] == {"tags": ["hide"]}
+    assert filter_metadata({"a": 1, "b": 2}, (("[ab]",),)) == {"a": 1, "b": 2}
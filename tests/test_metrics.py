@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import subprocess
+import zipfile
+from pathlib import Path
+
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import nb_to_json, read_nb, write_nb
+from nbmetaclean.metrics import Histogram, RunMetrics
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def test_histogram():
+    """test Histogram"""
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert histogram.sum == 5.65
+    assert histogram.count == 4
+
+
+def test_run_metrics(tmp_path: Path):
+    """test RunMetrics text format and write"""
+    metrics = RunMetrics("nbcheck")
+    metrics.notebooks.update(scanned=3, errored=1)
+    metrics.bytes["read"] += 100
+    metrics.check_failures['my "check"'] += 2
+    with metrics.phase("parse"):
+        pass
+    metrics.observe("parse", 20)
+    text = metrics.to_text()
+    assert "# TYPE nbcheck_notebooks_total counter\n" in text
+    assert 'nbcheck_notebooks_total{outcome="scanned"} 3\n' in text
+    assert 'nbcheck_bytes_total{direction="read"} 100\n' in text
+    assert 'nbcheck_bytes_total{direction="written"} 0\n' in text
+    assert 'nbcheck_check_failures_total{check="my \\"check\\""} 2\n' in text
+    assert "# TYPE nbcheck_phase_duration_seconds histogram\n" in text
+    assert 'nbcheck_phase_duration_seconds_bucket{phase="parse",le="0.001"} 1\n' in text
+    assert 'nbcheck_phase_duration_seconds_bucket{phase="parse",le="10"} 1\n' in text
+    assert 'nbcheck_phase_duration_seconds_bucket{phase="parse",le="+Inf"} 2\n' in text
+    assert 'nbcheck_phase_duration_seconds_count{phase="parse"} 2\n' in text
+    assert "nbcheck_run_duration_seconds " in text
+
+    metrics_path = tmp_path / "nbcheck.prom"
+    metrics.write(metrics_path)
+    assert metrics_path.read_text(encoding="utf-8").startswith("# HELP")
+    assert [path.name for path in tmp_path.iterdir()] == ["nbcheck.prom"]
+
+
+def test_clean_nb_file_metrics(tmp_path: Path):
+    """test clean_nb_file with metrics"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+    bad_nb = tmp_path / "bad.ipynb"
+    bad_nb.write_text("{", encoding="utf-8")
+    size = nb_path.stat().st_size
+    metrics = RunMetrics()
+    clean_nb_file([nb_path, bad_nb], CleanConfig(), metrics=metrics)
+    assert metrics.notebooks == {"scanned": 2, "cleaned": 1, "errored": 1, "skipped": 0}
+    assert metrics.bytes["read"] == size + 1
+    assert metrics.bytes["written"] == nb_path.stat().st_size
+    assert {phase: hist.count for phase, hist in metrics.phases.items()} == {
+        "parse": 2,
+        "clean": 1,
+        "serialise": 1,
+        "write": 1,
+    }
+
+    # dedupe content
+    write_nb(test_nb, nb_path)
+    metrics = RunMetrics()
+    clean_nb_file([nb_path], CleanConfig(dedupe_content=True), metrics=metrics)
+    assert {phase: hist.count for phase, hist in metrics.phases.items()} == {
+        "parse": 1,
+        "clean": 1,
+        "serialise": 1,
+        "write": 1,
+    }
+
+
+def test_app_metrics(tmp_path: Path):
+    """test `--metrics` option for nbmetaclean and nbcheck"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nb_path = write_nb(test_nb, tmp_path / "nb.ipynb")
+    metrics_path = tmp_path / "metrics.prom"
+    subprocess.run(
+        ["python", "-m", "nbmetaclean.app_clean", nb_path, "--metrics", metrics_path],
+        check=False,
+    )
+    text = metrics_path.read_text(encoding="utf-8")
+    assert 'nbmetaclean_notebooks_total{outcome="cleaned"} 1\n' in text
+    assert 'nbmetaclean_phase_duration_seconds_count{phase="discovery"} 1\n' in text
+
+    subprocess.run(
+        [
+            "python",
+            "-m",
+            "nbmetaclean.app_check",
+            nb_path,
+            "--ec",
+            "--metrics",
+            metrics_path,
+        ],
+        check=False,
+    )
+    text = metrics_path.read_text(encoding="utf-8")
+    assert 'nbcheck_notebooks_total{outcome="scanned"} 1\n' in text
+    assert 'nbcheck_check_failures_total{check="wrong_ec"} 1\n' in text
+    assert 'nbcheck_check_failures_total{check="read_error"} 0\n' in text
+    assert 'nbcheck_phase_duration_seconds_count{phase="check"} 1\n' in text
+
+
+def test_archive_metrics(tmp_path: Path):
+    """archive members counted as scanned notebooks"""
+    archive = tmp_path / "nbs.zip"
+    test_nb = nb_to_json(read_nb(example_nbs_path / ".test_nb_2_meta.ipynb"))
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("nb_1.ipynb", test_nb)
+        zf.writestr("nb_2.ipynb", "{")
+        zf.writestr("data.txt", "some data")
+    metrics = RunMetrics()
+    clean_nb_file([archive], CleanConfig(dry_run=True), metrics=metrics)
+    assert metrics.notebooks == {"scanned": 2, "cleaned": 1, "errored": 1, "skipped": 0}
+
+    metrics_path = tmp_path / "metrics.prom"
+    subprocess.run(
+        [
+            "python",
+            "-m",
+            "nbmetaclean.app_check",
+            archive,
+            "--err",
+            "--archives",
+            "--metrics",
+            metrics_path,
+        ],
+        check=False,
+    )
+    text = metrics_path.read_text(encoding="utf-8")
+    assert 'nbcheck_notebooks_total{outcome="scanned"} 2\n' in text
+    assert 'nbcheck_notebooks_total{outcome="errored"} 1\n' in text
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import io
+import subprocess
+import threading
+from pathlib import Path
+
+from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.progress import Progress, format_duration
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+
+def test_format_duration():
+    """test format_duration"""
+    assert format_duration(0) == "0:00:00"
+    assert format_duration(3725.5) == "1:02:05"
+
+
+def test_progress_log():
+    """test Progress log lines, not terminal"""
+    stream = io.StringIO()
+    progress = Progress(4, stream, interval=0, tty=False)
+    progress.update(bytes_read=2**20, bytes_written=2**19)
+    progress.update(2)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("1/4 notebooks, ")
+    assert "nb/s, read " in lines[0]
+    assert "ETA " in lines[0]
+    assert lines[1].startswith("3/4 notebooks, ")
+    progress.update()
+    progress.close()
+    lines = stream.getvalue().splitlines()
+    assert lines[-1].startswith("4/4 notebooks, ")
+    assert "elapsed 0:00:00" in lines[-1]
+    assert progress.bytes_read == 2**20
+    assert progress.bytes_written == 2**19
+
+    # not shown before interval
+    stream = io.StringIO()
+    progress = Progress(4, stream, interval=60, tty=False)
+    progress.update()
+    assert stream.getvalue() == ""
+
+
+def test_progress_tty():
+    """test Progress at terminal: line redrawn inplace"""
+    stream = io.StringIO()
+    progress = Progress(2, stream, interval=0, tty=True)
+    progress.update()
+    progress.update()
+    progress.close()
+    output = stream.getvalue()
+    assert output.startswith("\r1/2 notebooks, ")
+    assert output.count("\r") == 3
+    assert output.endswith("\n")
+    assert output.count("\n") == 1
+
+
+def test_progress_threads():
+    """test Progress updated from threads"""
+    progress = Progress(4000, io.StringIO(), interval=0, tty=False)
+
+    def work() -> None:
+        for _ in range(1000):
+            progress.update(bytes_read=1)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert progress.done == 4000
+    assert progress.bytes_read == 4000
+
+
+def test_app_progress(tmp_path: Path):
+    """test `--progress` option for nbmetaclean and nbcheck"""
+    test_nb = read_nb(example_nbs_path / ".test_nb_2_meta.ipynb")
+    nb_1 = write_nb(test_nb, tmp_path / "nb_1.ipynb")
+    nb_2 = write_nb(test_nb, tmp_path / "nb_2.ipynb")
+    for app, args in (("app_clean", []), ("app_check", ["--ec"])):
+        res = subprocess.run(
+            ["python", "-m", f"nbmetaclean.{app}", nb_1, nb_2, *args, "--progress"],
+            capture_output=True,
+            check=False,
+        )
+        stderr = res.stderr.decode("utf-8")
+        assert stderr.startswith("2/2 notebooks, "), stderr
+        assert "elapsed" in stderr
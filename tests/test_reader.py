@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import read_nb_with_reason
+from nbmetaclean.reader import (
+    READ_INVALID_JSON,
+    READ_IS_DIR,
+    READ_NOT_FOUND,
+    READ_NOT_NOTEBOOK,
+    READ_NOT_UTF8,
+    READ_PERMISSION,
+    parse_nb,
+    read_nb_file,
+)
+
+
+def test_parse_nb():
+    """test parse_nb"""
+    nb, reason = parse_nb(b'{"cells": []}')
+    assert nb == {"cells": []}
+    assert reason is None
+    assert parse_nb(b"\xff").reason == READ_NOT_UTF8
+    assert parse_nb(b'{"cells": [').reason == READ_INVALID_JSON
+    assert parse_nb(b"[]").reason == READ_NOT_NOTEBOOK
+    assert parse_nb(b'{"cells": {}}').reason == READ_NOT_NOTEBOOK
+
+
+def test_read_nb_file(tmp_path: Path):
+    """test read_nb_file, read_nb_with_reason"""
+    nb_path = Path("tests/test_nbs/test_nb_1.ipynb")
+    nb, reason = read_nb_file(nb_path)
+    assert nb is not None
+    assert reason is None
+    assert read_nb_file(tmp_path / "not_exists.ipynb").reason == READ_NOT_FOUND
+    assert read_nb_file(tmp_path).reason == READ_IS_DIR
+    assert read_nb_with_reason(tmp_path / "nbs.zip/nb.ipynb").reason == READ_NOT_FOUND
+
+    # file descriptors are closed
+    truncated = tmp_path / "truncated.ipynb"
+    truncated.write_text('{"cells": [')
+    fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+    for _ in range(100):
+        assert read_nb_with_reason(truncated).reason == READ_INVALID_JSON
+    if fds:
+        assert len(os.listdir("/proc/self/fd")) == fds
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root can read any file")
+def test_read_nb_permission(tmp_path: Path):
+    """test permission denied"""
+    nb_path = tmp_path / "nb.ipynb"
+    nb_path.write_text("{}")
+    nb_path.chmod(0)
+    assert read_nb_file(nb_path).reason == READ_PERMISSION
+
+
+def test_clean_nb_file_reasons(tmp_path: Path):
+    """test failure reasons from clean_nb_file"""
+    (tmp_path / "wrong.ipynb").write_text('{"cells": [')
+    (tmp_path / "not_nb.ipynb").write_text("[]")
+    nb_paths = [
+        tmp_path / "wrong.ipynb",
+        tmp_path / "not_nb.ipynb",
+        tmp_path / "not_exists.ipynb",
+    ]
+    for cfg in (CleanConfig(), CleanConfig(dedupe_content=True)):
+        reasons: dict[Path, str] = {}
+        cleaned, errors = clean_nb_file(nb_paths, cfg, reasons=reasons)
+        assert not cleaned
+        assert errors == nb_paths
+        assert reasons == {
+            nb_paths[0]: READ_INVALID_JSON,
+            nb_paths[1]: READ_NOT_NOTEBOOK,
+            nb_paths[2]: READ_NOT_FOUND,
+        }
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean.clean import CleanConfig, clean_nb_bytes
+from nbmetaclean.client import (
+    NO_SERVER_ENV,
+    SOCKET_ENV,
+    forward,
+    is_trusted_socket,
+    request,
+    server_clean_nb_bytes,
+    socket_path,
+)
+from nbmetaclean.server import config_from_dict
+
+
+example_nbs_path = Path("tests/test_nbs")
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Unix socket not supported"
+)
+
+
+@pytest.fixture
+def server(tmp_path: Path):
+    """Run server at socket in tmp_path, yield socket path."""
+    path = str(tmp_path / "nbmetaclean.sock")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "nbmetaclean.app_clean", "server", "--socket", path],
+        stdout=subprocess.PIPE,
+    )
+    assert process.stdout is not None
+    assert process.stdout.readline().decode("utf-8").startswith("Server listening")
+    yield path
+    request({"cmd": "shutdown"}, path)
+    process.wait(timeout=10)
+
+
+def test_config_from_dict():
+    """test config_from_dict"""
+    cfg = CleanConfig(
+        nb_metadata_preserve_mask=(("kernelspec", "name"),),
+        store_path=Path("store"),
+    )
+    config = {
+        **cfg.__dict__,
+        "nb_metadata_preserve_mask": [["kernelspec", "name"]],
+        "store_path": "store",
+    }
+    assert config_from_dict(config) == cfg
+
+
+def test_server_clean(server: str):
+    """test clean bytes at server"""
+    data = (example_nbs_path / ".test_nb_2_meta.ipynb").read_bytes()
+    assert request({"cmd": "ping"}, server) is not None
+    assert server_clean_nb_bytes(data, path=server) == clean_nb_bytes(data)
+    cfg = CleanConfig(clear_execution_count=False)
+    assert server_clean_nb_bytes(data, cfg, server) == clean_nb_bytes(data, cfg)
+    clean = (example_nbs_path / "test_nb_2_clean.ipynb").read_bytes()
+    assert server_clean_nb_bytes(clean, path=server) is clean
+    with pytest.raises(ValueError):
+        server_clean_nb_bytes(b"{", path=server)
+
+
+def test_server_not_running(tmp_path: Path):
+    """test client fallback when server not running"""
+    path = str(tmp_path / "nbmetaclean.sock")
+    assert request({"cmd": "ping"}, path) is None
+    assert server_clean_nb_bytes(b"{}", path=path) is None
+
+
+def test_forward(server: str, tmp_path: Path, monkeypatch, capsys):
+    """test CLI forwarded to server, same result as in-process"""
+    data = (example_nbs_path / ".test_nb_2_meta.ipynb").read_bytes()
+    monkeypatch.setenv(SOCKET_ENV, server)
+    monkeypatch.chdir(tmp_path)
+    nb_path = tmp_path / "test_nb.ipynb"
+    nb_path.write_bytes(data)
+
+    assert forward("nbcheck", ["--ec", "test_nb.ipynb"]) == 0
+    assert forward("nbcheck", ["--bad_arg"]) == 2
+    assert "unrecognized arguments" in capsys.readouterr().err
+
+    assert forward("nbmetaclean", ["test_nb.ipynb"]) == 0
+    assert capsys.readouterr().out == "cleaned: test_nb.ipynb\n"
+    assert nb_path.read_bytes() == clean_nb_bytes(data)
+
+    assert forward("nbcheck", ["--ec", "--files_from", "-"]) is None  # reads stdin
+
+    monkeypatch.setenv(NO_SERVER_ENV, "1")
+    assert forward("nbmetaclean", ["test_nb.ipynb"]) is None
+
+    # CLI from command line, entry point
+    env = dict(os.environ)
+    del env[NO_SERVER_ENV]
+    cmd = "import sys; from nbmetaclean.cli import nbcheck; nbcheck(); print(sorted(sys.modules))"
+    res = subprocess.run(
+        [sys.executable, "-c", cmd, "--ec", "test_nb.ipynb"],
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+    assert res.returncode == 1
+    assert b"wrong execution_count" in res.stdout
+    assert b"nbmetaclean.app_check" not in res.stdout  # exit before app import
+
+    res = subprocess.run(
+        [sys.executable, "-m", "nbmetaclean.app_clean", "server", "--status"],
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+    assert res.returncode == 0
+    assert res.stdout.decode("utf-8").startswith("Server version")
+
+
+def test_socket_path(monkeypatch):
+    """test default socket path"""
+    monkeypatch.delenv(SOCKET_ENV, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert socket_path() == "/run/user/1000/nbmetaclean.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setenv("TMPDIR", "/tmp")
+    assert socket_path() == f"/tmp/nbmetaclean-{os.getuid()}/server.sock"
+    monkeypatch.setenv(SOCKET_ENV, "test.sock")
+    assert socket_path() == "test.sock"
+
+
+def test_trusted_socket(server: str, tmp_path: Path):
+    """test client not connects to socket accessible by other users"""
+    assert is_trusted_socket(server)
+    assert os.stat(server).st_mode & 0o077 == 0
+    assert not is_trusted_socket(str(tmp_path / "not_exists.sock"))
+    file = tmp_path / "file.sock"
+    file.touch()
+    assert not is_trusted_socket(str(file))
+
+    os.chmod(server, 0o777)
+    os.chmod(tmp_path, 0o755)
+    assert not is_trusted_socket(server)
+    assert request({"cmd": "ping"}, server) is None
+    os.chmod(tmp_path, 0o700)  # socket at private directory
+    assert is_trusted_socket(server)
+    assert request({"cmd": "ping"}, server) is not None
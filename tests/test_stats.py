@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from nbmetaclean.clean import CleanConfig, clean_nb_file
+from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.stats import CleanStats, nb_counts
+
+
+def test_nb_counts():
+    """test nb_counts"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    executed, keys, outputs = nb_counts(nb)
+    assert executed == 1
+    assert keys["nb.language_info.name"] == 1
+    assert "nb.kernelspec.name" in keys
+    assert outputs
+
+
+def test_clean_stats(tmp_path: Path):
+    """test stats from clean_nb_file"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    nb_path = write_nb(nb, tmp_path / "nb.ipynb")
+    size = nb_path.stat().st_size
+
+    stats = CleanStats()
+    cleaned, _ = clean_nb_file(
+        nb_path, CleanConfig(dry_run=True, clear_outputs=True), stats=stats
+    )
+    assert cleaned == [nb_path]
+    assert nb_path.stat().st_size == size
+    assert len(stats.notebooks) == 1
+    nb_stats = stats.notebooks[0]
+    assert nb_stats.path == nb_path
+    assert nb_stats.bytes_before == size
+    assert nb_stats.bytes_after < size
+    assert nb_stats.execution_counts == 1
+    assert "nb.kernelspec.name" in nb_stats.metadata_keys
+    assert "nb.language_info.name" not in nb_stats.metadata_keys
+    assert sum(nb_stats.outputs.values()) == sum(nb_counts(nb)[2].values())
+
+    total = stats.total()
+    assert total["notebooks"] == 1
+    assert total["bytes_saved"] == size - nb_stats.bytes_after
+    assert stats.report()[0].startswith("stats: 1 notebooks")
+    assert stats.to_dict()["notebooks"][0]["path"] == nb_path.as_posix()
+
+    # same stats with dedupe_content and at worker process
+    for cfg in (
+        CleanConfig(dry_run=True, clear_outputs=True, dedupe_content=True),
+        CleanConfig(dry_run=True, clear_outputs=True, max_nb_seconds=10),
+    ):
+        other = CleanStats()
+        clean_nb_file(nb_path, cfg, stats=other)
+        assert other == stats
+
+    # write, size after as written
+    stats = CleanStats()
+    clean_nb_file(nb_path, CleanConfig(), stats=stats)
+    assert stats.notebooks[0].bytes_after == nb_path.stat().st_size
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import copy
+import os
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean.clean import CleanConfig, clean_nb, clean_nb_file
+from nbmetaclean.helpers import read_nb, write_nb
+from nbmetaclean.store import (
+    STORE_REF_PREFIX,
+    extract_payloads,
+    is_store_ref,
+    rehydrate_nb,
+    rehydrate_nb_file,
+)
+
+
+example_nbs_path = Path("tests/test_nbs")
+image = "iVBORw0KGgo" * 200
+html = "<div>text</div>" * 200
+
+
+def make_nb():
+    """notebook with two same images at outputs and attachment"""
+    nb = read_nb(example_nbs_path / "test_nb_2_clean.ipynb")
+    nb["cells"][1]["outputs"][0]["data"]["image/png"] = image
+    nb["cells"][1]["outputs"][0]["data"]["text/html"] = html
+    nb["cells"][1]["outputs"].append(copy.deepcopy(nb["cells"][1]["outputs"][0]))
+    nb["cells"][0]["attachments"] = {"logo.png": {"image/png": image}}
+    return nb
+
+
+def test_extract_rehydrate(tmp_path: Path):
+    """test extract_payloads, rehydrate_nb"""
+    nb = make_nb()
+    nb_org = copy.deepcopy(nb)
+    store = tmp_path / "store"
+
+    # threshold more than payload
+    assert not extract_payloads(nb, store, threshold=len(image) + 1)
+    assert not store.exists()
+
+    assert extract_payloads(nb, store)
+    ref = nb["cells"][0]["attachments"]["logo.png"]["image/png"]
+    assert ref.startswith(STORE_REF_PREFIX)
+    assert is_store_ref(ref)
+    assert nb["cells"][1]["outputs"][0]["data"]["image/png"] == ref
+    assert nb["cells"][1]["outputs"][1]["data"]["image/png"] == ref
+    # text not moved
+    assert nb["cells"][1]["outputs"][0]["data"]["text/plain"] == ["2"]
+    assert nb["cells"][1]["outputs"][0]["data"]["text/html"] == html
+    # one file at store
+    assert len([item for item in store.rglob("*") if item.is_file()]) == 1
+    # second run - no changes
+    assert not extract_payloads(nb, store)
+
+    assert rehydrate_nb(nb, store)
+    assert nb == nb_org
+    assert not rehydrate_nb(nb, store)
+
+    # missing payload
+    extract_payloads(nb, tmp_path / "other_store", write=False)
+    with pytest.raises(FileNotFoundError):
+        rehydrate_nb(nb, store / "wrong")
+
+
+def test_clean_store_file(tmp_path: Path):
+    """test clean with store, rehydrate_nb_file"""
+    nb = make_nb()
+    nb_path = write_nb(nb, tmp_path / "nb.ipynb")
+    store = tmp_path / "store"
+    cfg = CleanConfig(store_path=store, dry_run=True)
+    assert clean_nb(copy.deepcopy(nb), cfg)
+    assert not store.exists()
+
+    cleaned, errors = clean_nb_file(nb_path, CleanConfig(store_path=store))
+    assert cleaned == [nb_path]
+    assert not errors
+    assert is_store_ref(read_nb(nb_path)["cells"][1]["outputs"][0]["data"]["image/png"])
+
+    rehydrated, errors = rehydrate_nb_file(nb_path, tmp_path / "wrong")
+    assert not rehydrated
+    assert errors == [nb_path]
+
+    rehydrated, errors = rehydrate_nb_file([nb_path], store)
+    assert rehydrated == [nb_path]
+    assert not errors
+    assert read_nb(nb_path) == nb
+
+    rehydrated, errors = rehydrate_nb_file([tmp_path / "wrong.ipynb"], store)
+    assert errors == [tmp_path / "wrong.ipynb"]
+
+
+def test_rehydrate_verify(tmp_path: Path):
+    """test rehydrate rejects wrong digests and changed payloads"""
+    store = tmp_path / "store"
+    for digest in ("/tmp/payload", "../" * 3 + "a" * 55, "A" * 64):
+        nb = make_nb()
+        nb["cells"][0]["attachments"]["logo.png"]["image/png"] = (
+            STORE_REF_PREFIX + digest
+        )
+        with pytest.raises(ValueError):
+            rehydrate_nb(nb, store)
+
+    nb = make_nb()
+    assert extract_payloads(nb, store)
+    payload = next(item for item in store.rglob("*") if item.is_file())
+    payload.write_text("changed", encoding="utf-8")
+    with pytest.raises(ValueError):
+        rehydrate_nb(nb, store)
+    nb_path = write_nb(nb, tmp_path / "nb.ipynb")
+    assert rehydrate_nb_file(nb_path, store) == ([], [nb_path])
+
+
+def test_extract_write_error(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """temp file removed if payload not saved"""
+    store = tmp_path / "store"
+
+    def replace(src: str, dst: str) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(OSError):
+        extract_payloads(make_nb(), store)
+    assert not [item for item in store.rglob("*") if item.is_file()]
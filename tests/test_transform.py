@@ -0,0 +1,94 @@
+import copy
+import pickle
+
+import pytest
+
+from nbmetaclean.clean import CleanConfig, clean_nb, compile_config, is_clean
+from nbmetaclean.helpers import read_nb
+from nbmetaclean.transform import (
+    DropExecuteTime,
+    NbTransform,
+    StripAnsi,
+    get_transform,
+    register_transform,
+)
+
+
+class CellIds(NbTransform):
+    name = "cell_ids"
+
+    def notebook(self, nb):
+        changed = False
+        for num, cell in enumerate(nb["cells"]):
+            if cell.get("id") != f"cell-{num}":
+                cell["id"] = f"cell-{num}"
+                changed = True
+        return changed
+
+
+def test_transforms():
+    """test transforms at clean_nb"""
+    register_transform(CellIds)
+    assert get_transform("cell_ids") is CellIds
+    with pytest.raises(KeyError):
+        get_transform("not_exists")
+
+    test_nb = read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    test_nb["cells"][0]["metadata"]["ExecuteTime"] = {"end_time": "2024"}
+    test_nb["cells"][1]["outputs"] = [
+        {"output_type": "stream", "name": "stdout", "text": ["\x1b[31mred\x1b[0m\n"]},
+        {"output_type": "error", "ename": "E", "evalue": "", "traceback": ["\x1b[1mE"]},
+    ]
+    cfg = CleanConfig(transforms=("cell_ids", "execute_time", "strip_ansi"))
+    plan = compile_config(cfg)
+    assert not plan.empty
+    assert plan.nb_transforms == (CellIds(),)
+    assert plan.cell_transforms == (DropExecuteTime(),)
+    assert plan.output_transforms == (StripAnsi(),)
+    assert pickle.loads(pickle.dumps(plan)) == plan
+
+    assert not is_clean(test_nb, plan)
+    assert clean_nb(test_nb, plan)
+    assert test_nb["cells"][0]["metadata"] == {}
+    assert [cell["id"] for cell in test_nb["cells"]] == ["cell-0", "cell-1"]
+    assert test_nb["cells"][1]["outputs"][0]["text"] == ["red\n"]
+    assert test_nb["cells"][1]["outputs"][1]["traceback"] == ["E"]
+    assert is_clean(test_nb, plan)
+    assert not clean_nb(test_nb, plan)
+
+    # only transforms
+    plan = compile_config(
+        CleanConfig(clear_nb_metadata=False, clear_execution_count=False),
+        [StripAnsi()],
+    )
+    assert not plan.empty
+    nb = copy.deepcopy(test_nb)
+    nb["cells"][1]["outputs"][0]["text"] = "\x1b[31mred"
+    assert clean_nb(nb, plan)
+    assert nb["cells"][1]["outputs"][0]["text"] == "red"
+
+
+def test_transforms_traversal():
+    """test transforms run at one traversal with clean steps"""
+    calls = []
+
+    class Calls(NbTransform):
+        def cell(self, cell):
+            calls.append(("cell", cell["cell_type"], cell.get("execution_count")))
+            return False
+
+        def output(self, output):
+            calls.append(("output", output.get("execution_count")))
+            return False
+
+    test_nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    test_nb["cells"][1]["outputs"] = [
+        {"output_type": "execute_result", "execution_count": 1, "metadata": {}}
+    ]
+    assert clean_nb(test_nb, compile_config(CleanConfig(), [Calls()]))
+    # transforms see cleaned cells and outputs
+    assert calls == [
+        ("cell", "markdown", None),
+        ("output", None),
+        ("cell", "code", None),
+    ]
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from nbmetaclean.verdicts import ROW_OVERHEAD, VerdictCache
+
+
+def test_verdict_cache(tmp_path: Path):
+    """test VerdictCache"""
+    cache_path = tmp_path / "verdicts.sqlite"
+    cache = VerdictCache(cache_path, {"ec": True})
+    key = cache.key(b"nb")
+    assert key == cache.key(b"nb")
+    assert key != cache.key(b"nb_2")
+    assert cache.get(key) is None
+    cache.put(key, {"ec": False})
+    assert cache.get(key) == {"ec": False}
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    # saved, same options
+    cache = VerdictCache(cache_path, {"ec": True})
+    assert cache.get(cache.key(b"nb")) == {"ec": False}
+    cache.close()
+
+    # other options - other keys
+    cache = VerdictCache(cache_path, {"ec": True, "no_exec": True})
+    assert cache.key(b"nb") != key
+    assert cache.get(cache.key(b"nb")) is None
+    cache.close()
+
+
+def test_verdict_cache_evict(tmp_path: Path):
+    """test VerdictCache eviction of least recently used entries"""
+    cache_path = tmp_path / "verdicts.sqlite"
+    row_size = 32 + len('{"ec": true}') + ROW_OVERHEAD
+    cache = VerdictCache(cache_path, {}, max_size=2 * row_size)
+    cache._now = 1
+    for num in range(3):
+        cache.put(cache.key(b"%d" % num), {"ec": True})
+    cache.close()
+
+    cache = VerdictCache(cache_path, {}, max_size=2 * row_size)
+    cache._now = 2
+    assert cache.get(cache.key(b"0")) is not None  # used at this run
+    cache.put(cache.key(b"3"), {"ec": True})
+    cache.close()
+
+    cache = VerdictCache(cache_path, {}, max_size=2 * row_size)
+    cached = [cache.get(cache.key(b"%d" % num)) is not None for num in range(4)]
+    assert cached == [True, False, False, True]
+    cache.close()
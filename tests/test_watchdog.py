@@ -0,0 +1,91 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from nbmetaclean.clean import CleanConfig, _read_clean_nb, clean_nb_file, compile_config
+from nbmetaclean.helpers import nb_to_json, read_nb, write_nb
+from nbmetaclean.watchdog import LimitExceeded, Watchdog
+
+
+def allocate(size: int) -> int:
+    return len(bytearray(size))
+
+
+def test_watchdog():
+    """test Watchdog"""
+    with Watchdog(max_seconds=5) as watchdog:
+        assert watchdog.run(sum, [1, 2]) == 3
+        with pytest.raises(LimitExceeded):
+            Watchdog(max_seconds=0.2).run(time.sleep, 5)
+        with pytest.raises(ZeroDivisionError):
+            watchdog.run(divmod, 1, 0)
+        # worker still works
+        assert watchdog.run(sum, [1, 2]) == 3
+
+    with Watchdog(max_seconds=0.2) as watchdog:
+        with pytest.raises(LimitExceeded):
+            watchdog.run(time.sleep, 5)
+        # new worker started
+        assert watchdog.run(sum, [1, 2]) == 3
+
+    with Watchdog(max_memory=100 * 2**20) as watchdog:
+        assert watchdog.run(allocate, 2**20) == 2**20
+        with pytest.raises(LimitExceeded):
+            watchdog.run(allocate, 2**30)
+        assert watchdog.run(allocate, 2**20) == 2**20
+
+
+def test_clean_nb_file_limits(tmp_path: Path):
+    """test clean_nb_file with limits"""
+    nb = read_nb("tests/test_nbs/.test_nb_2_meta.ipynb")
+    nb_path = write_nb(nb, tmp_path / "nb.ipynb")
+    size = nb_path.stat().st_size
+
+    skipped: list[Path] = []
+    cleaned, errors = clean_nb_file(
+        nb_path, CleanConfig(max_nb_bytes=size - 1), skipped
+    )
+    assert not cleaned
+    assert not errors
+    assert skipped == [nb_path]
+    assert read_nb(nb_path) == nb
+
+    skipped = []
+    cleaned, errors = clean_nb_file(
+        [nb_path, tmp_path / "not_exists.ipynb"],
+        CleanConfig(max_nb_bytes=size, max_nb_seconds=10, max_nb_memory=2**30),
+        skipped,
+    )
+    assert cleaned == [nb_path]
+    assert errors == [tmp_path / "not_exists.ipynb"]
+    assert not skipped
+    assert read_nb(nb_path) == read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+
+
+def test_read_clean_nb(tmp_path: Path):
+    """test worker task returns serialized notebook, not parsed one"""
+    nb_path = write_nb(
+        read_nb("tests/test_nbs/.test_nb_2_meta.ipynb"), tmp_path / "nb.ipynb"
+    )
+    clean = read_nb("tests/test_nbs/test_nb_2_clean.ipynb")
+    plan = compile_config(CleanConfig())
+    reason, changed, text, nb_stats, durations = _read_clean_nb(nb_path, plan, True)
+    assert reason is None
+    assert changed
+    assert text == nb_to_json(clean)
+    assert nb_stats is not None and nb_stats.bytes_after == len(text.encode("utf-8"))
+    assert set(durations) == {"parse", "clean", "serialise"}
+
+    # dry run - not serialized
+    assert _read_clean_nb(nb_path, plan, serialize=False)[:4] == (
+        None,
+        True,
+        None,
+        None,
+    )
+    assert _read_clean_nb(tmp_path / "wrong.ipynb", plan)[:3] == (
+        "not found",
+        False,
+        None,
+    )